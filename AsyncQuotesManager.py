@@ -0,0 +1,262 @@
+"""Asyncio facade over QuotesManager.
+
+Reads run on a small thread pool with one SQLite connection per thread.
+Writes are queued to a single writer task that drains whatever has piled up
+and commits it as one transaction, so thousands of concurrent coroutines
+cost a handful of commits instead of one fsync each. The database is in WAL
+mode (see QuotesManager.setup_database), so readers never wait for the writer.
+
+    async with AsyncQuotesManager("quotes.db") as aqm:
+        quote_id = await aqm.add_quote("...", "Seneca", "Stoicism")
+        async for row in aqm.iter_search("time"):
+            ...
+"""
+import asyncio
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from QuotesManager import QuotesManager
+
+
+class AsyncQuotesManager:
+    def __init__(self, db_name: str = "quotes.db", readers: int = None, max_batch: int = 512):
+        """Open the database (running setup_database once) and start the executors"""
+        self.db_name = db_name
+        self.max_batch = max_batch
+        # setup_database also puts the database in WAL mode
+        self._qm = QuotesManager(db_name)
+
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        # Same default size as asyncio.to_thread's pool: SQLite releases the GIL while stepping
+        readers = readers or min(32, (os.cpu_count() or 1) + 4)
+        self._readers = ThreadPoolExecutor(max_workers=readers, thread_name_prefix='quotes-reader')
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='quotes-writer')
+        self._queue = None
+        self._writer_task = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    # ------------------------------------------------------------------
+    # plumbing
+
+    def _connection(self) -> sqlite3.Connection:
+        """Per-thread connection; autocommit so the writer controls transactions"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # check_same_thread is off only so close() can close every connection
+            conn = sqlite3.connect(self.db_name, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA busy_timeout = 5000')
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    async def _read(self, func, *args):
+        """Run func(cursor, *args) on a reader thread"""
+        def call():
+            return func(self._connection().cursor(), *args)
+        return await asyncio.get_running_loop().run_in_executor(self._readers, call)
+
+    def _write(self, func, *args) -> asyncio.Future:
+        """Queue func(cursor, *args) for the writer; resolves when its batch commits"""
+        loop = asyncio.get_running_loop()
+        if self._writer_task is None:
+            self._queue = asyncio.Queue()
+            self._writer_task = loop.create_task(self._writer_loop())
+        future = loop.create_future()
+        self._queue.put_nowait((func, args, future))
+        return future
+
+    async def _writer_loop(self):
+        """Drain the queue into batches and commit each batch in one transaction"""
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            while len(batch) < self.max_batch and not self._queue.empty():
+                item = self._queue.get_nowait()
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            try:
+                results = await loop.run_in_executor(self._writer, self._run_batch, batch)
+            except Exception as e:  # the COMMIT itself failed: the whole batch is lost
+                results = [(False, e)] * len(batch)
+            for (_, _, future), (ok, value) in zip(batch, results):
+                if future.done():
+                    continue
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(value)
+
+    def _run_batch(self, batch) -> List[Tuple[bool, object]]:
+        """Writer thread: run every queued write inside one transaction.
+
+        Each write gets its own savepoint, so a duplicate quote only rolls
+        back itself and not the rest of the batch.
+        """
+        cursor = self._connection().cursor()
+        results = []
+        cursor.execute('BEGIN IMMEDIATE')
+        try:
+            for func, args, _ in batch:
+                cursor.execute('SAVEPOINT write_op')
+                try:
+                    results.append((True, func(cursor, *args)))
+                except Exception as e:
+                    cursor.execute('ROLLBACK TO write_op')
+                    results.append((False, e))
+                cursor.execute('RELEASE write_op')
+            cursor.execute('COMMIT')
+        except Exception:
+            cursor.execute('ROLLBACK')
+            raise
+        return results
+
+    async def close(self):
+        """Flush pending writes, then shut the executors down and close connections"""
+        if self._qm._pending_views:
+            # View events still queued by _record_view go out with the last batch
+            await self._write(self._qm._flush_views)
+        if self._writer_task is not None:
+            self._queue.put_nowait(None)
+            await self._writer_task
+            self._writer_task = None
+        self._readers.shutdown(wait=True)
+        self._writer.shutdown(wait=True)
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        # The facade's own connections: this thread's, opened by setup_database, and those
+        # its reads (complete, write_export, ...) opened on the reader threads
+        self._qm.close_all()
+
+    # ------------------------------------------------------------------
+    # writes
+
+    async def add_quote(self, quote: str, author: str = "Unknown",
+                        category: str = "General", tags: str = "",
+                        source: str = "", year: int = None) -> Optional[int]:
+        """Add a quote; returns its id, or None if it already exists"""
+        try:
+            return await self._write(self._qm._insert_quote, quote, author, category, tags, source, year)
+        except sqlite3.IntegrityError:
+            return None
+
+    async def set_favorite(self, quote_id: int, action: str = "toggle") -> Optional[int]:
+        """Add, remove or toggle a favorite; returns the new status, or None if not found"""
+        if action not in ("toggle", "add", "remove"):
+            raise ValueError(f"Invalid action: {action}")
+        result = await self._write(self._qm._set_favorite, quote_id, action)
+        return result[1] if result else None
+
+    async def delete_quote(self, quote_id: int) -> bool:
+        """Delete a quote without confirmation; returns False if it did not exist"""
+        return await self._write(self._qm._delete, quote_id)
+
+    async def import_quotes(self, filename: str) -> Tuple[int, int]:
+        """Import a JSON, CSV or qcol export; returns (imported, skipped).
+
+        Rows are read and queued max_batch at a time, each chunk awaited
+        before the next is read, so a large file never sits in memory.
+        """
+        rows = await self._read(lambda cursor: self._qm.read_import_rows(filename))
+        imported = skipped = 0
+        try:
+            while True:
+                chunk = await self._read(lambda cursor: list(islice(rows, self.max_batch)))
+                if not chunk:
+                    break
+                outcomes = await asyncio.gather(*(self.add_quote(*row) for row in chunk))
+                added = sum(1 for quote_id in outcomes if quote_id)
+                imported += added
+                skipped += len(outcomes) - added
+        finally:
+            rows.close()
+        return imported, skipped
+
+    # ------------------------------------------------------------------
+    # reads
+
+    async def search_quotes(self, search_term: str, search_in: str = "all") -> List[Tuple]:
+        """Search quotes by text, author, category, or tags"""
+        return await self._read(lambda cursor: self._qm._search(cursor, search_term, search_in).fetchall())
+
+    async def random_quote(self, category: str = None) -> Optional[Tuple]:
+        """Return a random (id, quote_text, author, category); the view is counted in the background"""
+        quote = await self._read(self._qm._fetch_random, category)
+        if quote:
+            future = self._write(self._qm._record_view, quote[0])
+            # Nobody awaits this write; retrieve its outcome so failures are not reported as unhandled
+            future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        return quote
+
+    async def statistics(self) -> Dict:
+        """Return the figures shown by QuotesManager.get_statistics"""
+        def query(cursor):
+            # One read transaction so the figures agree with each other
+            cursor.execute('BEGIN')
+            try:
+                return self._qm._query_statistics(cursor)
+            finally:
+                cursor.execute('COMMIT')
+        return await self._read(query)
+
+    async def complete(self, field: str, prefix: str, k: int = 10) -> List[Tuple[str, int]]:
+        """Top k (name, quote count) authors, categories or tags starting with `prefix`"""
+        return await self._read(lambda cursor: self._qm.complete(field, prefix, k))
+
+    async def export_quotes(self, format: str = "json", filename: str = None, **options) -> int:
+        """Export the quotes matching the filters (default: all) to JSON, CSV or qcol; returns the
+        number written. Options are those of QuotesManager.write_export."""
+        return await self._read(lambda cursor: self._qm.write_export(format, filename, **options))
+
+    async def iter_search(self, search_term: str, search_in: str = "all",
+                          chunk_size: int = 500) -> AsyncIterator[Tuple]:
+        """Stream search results without materialising them all at once"""
+        async for row in self._stream(lambda cursor: self._qm._search(cursor, search_term, search_in),
+                                      chunk_size):
+            yield row
+
+    async def iter_quotes(self, chunk_size: int = 500) -> AsyncIterator[Tuple]:
+        """Stream (id, quote_text, author, category, favorite) for every quote"""
+        def query(cursor):
+            return cursor.execute('SELECT id, quote_text, author, category, favorite FROM quotes ORDER BY id')
+        async for row in self._stream(query, chunk_size):
+            yield row
+
+    async def _stream(self, execute, chunk_size: int) -> AsyncIterator[Tuple]:
+        """Fetch a query in chunks on reader threads.
+
+        The cursor uses its own connection: a pooled reader connection could be
+        picked up by another coroutine between chunks.
+        """
+        loop = asyncio.get_running_loop()
+        conn = sqlite3.connect(self.db_name, check_same_thread=False)
+        try:
+            cursor = await loop.run_in_executor(self._readers, execute, conn.cursor())
+            while True:
+                rows = await loop.run_in_executor(self._readers, cursor.fetchmany, chunk_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield row
+        finally:
+            conn.close()
@@ -10,6 +10,11 @@ def initialize_database(mode):
     
     print("Initializing Quotes Database...")
     
+    # QuotesManager.py normalize turns quotes into a view over quote_rows
+    cursor.execute("SELECT type FROM sqlite_master WHERE name = 'quotes'")
+    kind = cursor.fetchone()
+    normalized = bool(kind) and kind[0] == 'view'
+
     # Create table with all fields
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS quotes (
@@ -27,10 +32,12 @@ def initialize_database(mode):
         )
     ''')
     
-    # Create indexes
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_author ON quotes(author)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_category ON quotes(category)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_favorite ON quotes(favorite)')
+    # Create indexes (a normalized database already has its own)
+    if not normalized:
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_author ON quotes(author)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_category ON quotes(category)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_favorite ON quotes(favorite) WHERE favorite = 1')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_times_viewed ON quotes(times_viewed) WHERE times_viewed > 0')
     
     # For option 1, create empty database structure only
     if mode == 1:
@@ -47,14 +54,16 @@ def initialize_database(mode):
         print("="*60)
         return 0
     
-    # For option 2, clear ALL existing quotes and reset the auto-increment
+    # For option 2, replace ALL existing quotes. The new table is filled next to
+    # the old one and swapped in with a single transaction at the end, so an
+    # interrupted run leaves the old quotes untouched.
+    target = 'quotes'
     if mode == 2:
-        cursor.execute('DROP TABLE IF EXISTS quotes')
-        conn.commit()
-        
-        # Recreate the table fresh
+        target = 'quotes_rebuild'
+        # Left over from an interrupted run
+        cursor.execute('DROP TABLE IF EXISTS quotes_rebuild')
         cursor.execute('''
-            CREATE TABLE quotes (
+            CREATE TABLE quotes_rebuild (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 quote_text TEXT NOT NULL UNIQUE,
                 author TEXT DEFAULT 'Unknown',
@@ -69,12 +78,7 @@ def initialize_database(mode):
             )
         ''')
         
-        # Recreate indexes
-        cursor.execute('CREATE INDEX idx_author ON quotes(author)')
-        cursor.execute('CREATE INDEX idx_category ON quotes(category)')
-        cursor.execute('CREATE INDEX idx_favorite ON quotes(favorite)')
-        
-        print("Cleared ALL existing quotes. Adding only your quotes...")
+        print("Building a fresh table with only your quotes...")
     # All quotes collection
     quotes_data = [
         # Original Dark/Personal Collection
@@ -275,8 +279,8 @@ def initialize_database(mode):
     if mode != 1:
         for quote_data in quotes_data:
             try:
-                cursor.execute('''
-                    INSERT INTO quotes (quote_text, author, category, tags)
+                cursor.execute(f'''
+                    INSERT INTO {target} (quote_text, author, category, tags)
                     VALUES (?, ?, ?, ?)
                 ''', quote_data)
                 inserted += 1
@@ -289,6 +293,30 @@ def initialize_database(mode):
     
     conn.commit()
     
+    # Option 2: swap the fresh table in for the old quotes, all or nothing
+    if mode == 2:
+        cursor.execute('BEGIN IMMEDIATE')
+        try:
+            if normalized:
+                # Normalized layout (QuotesManager.py normalize): go back to the flat table
+                cursor.execute('DROP VIEW quotes')
+                cursor.execute('DROP TABLE quote_rows')
+                cursor.execute('DROP TABLE authors')
+                cursor.execute('DROP TABLE categories')
+            cursor.execute('DROP TABLE IF EXISTS quotes')
+            cursor.execute('ALTER TABLE quotes_rebuild RENAME TO quotes')
+            cursor.execute('CREATE INDEX idx_author ON quotes(author)')
+            cursor.execute('CREATE INDEX idx_category ON quotes(category)')
+            cursor.execute('CREATE INDEX idx_favorite ON quotes(favorite) WHERE favorite = 1')
+            cursor.execute('CREATE INDEX idx_times_viewed ON quotes(times_viewed) WHERE times_viewed > 0')
+            # Dropping the old table also dropped its triggers; make QuotesManager re-run its setup
+            cursor.execute('PRAGMA user_version = 0')
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        print("Replaced ALL existing quotes with your quotes.")
+    
     # Show summary
     cursor.execute('SELECT COUNT(*) FROM quotes')
     total = cursor.fetchone()[0]
@@ -336,7 +364,10 @@ def main():
         choice = input("\nChoose (1/2/3): ").strip()
         
         if choice == '1':
-            os.remove('quotes.db')
+            # With the WAL files, which would otherwise be replayed into the new database
+            for path in ('quotes.db', 'quotes.db-wal', 'quotes.db-shm'):
+                if os.path.exists(path):
+                    os.remove(path)
             print("Old database deleted. Creating empty database...")
             mode = 1
         elif choice == '2':
@@ -0,0 +1,110 @@
+"""In-memory prefix completion for author, category and tag names.
+
+Names are kept in a sorted array of (case-folded key, name) pairs, so a
+prefix is two bisects away from the block of names that start with it.
+Ranking that block by quote count is cached per (prefix, k) in a bounded
+LRU until the next change. The empty and one-character prefixes match too
+many names to rank on every keystroke; their top TOP_COMPLETIONS are kept
+ranked and updated as counts change.
+"""
+import heapq
+import threading
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Tuple
+
+# Sorts after every character a name can contain
+PREFIX_END = '\U0010ffff'
+# Completions kept ranked for the empty and one-character prefixes (the most ask_name asks for)
+TOP_COMPLETIONS = 20
+# (prefix, k) rankings of longer prefixes kept between changes
+CACHE_SIZE = 1024
+
+
+class CompletionIndex:
+    def __init__(self, counts: Iterable[Tuple[str, int]] = ()):
+        """Build the index from (name, quote count) pairs"""
+        self._lock = threading.Lock()
+        self.counts: Dict[str, int] = {}
+        for name, count in counts:
+            if name and count > 0:
+                self.counts[name] = self.counts.get(name, 0) + count
+        self._entries = sorted((name.casefold(), name) for name in self.counts)
+        self._cache: 'OrderedDict[Tuple[str, int], List[Tuple[str, int]]]' = OrderedDict()
+        # Short prefix -> its best (-count, name) keys, best first; filled on first use
+        self._top: Dict[str, List[Tuple[int, str]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def complete(self, prefix: str, k: int = 10) -> List[Tuple[str, int]]:
+        """Up to k (name, count) pairs starting with `prefix` (any case), most quotes first"""
+        prefix = prefix.casefold()
+        with self._lock:
+            if len(prefix) <= 1 and k <= TOP_COMPLETIONS:
+                top = self._top.get(prefix)
+                if top is None:
+                    top = self._top[prefix] = self._rank(prefix, TOP_COMPLETIONS)
+                return [(name, -count) for count, name in top[:k]]
+            result = self._cache.get((prefix, k))
+            if result is not None:
+                self._cache.move_to_end((prefix, k))
+                return result
+            result = [(name, -count) for count, name in self._rank(prefix, k)]
+            self._cache[(prefix, k)] = result
+            if len(self._cache) > CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return result
+
+    def _rank(self, prefix: str, k: int) -> List[Tuple[int, str]]:
+        """The best k (-count, name) keys of the names starting with `prefix`, best first"""
+        low = bisect_left(self._entries, (prefix,))
+        high = bisect_left(self._entries, (prefix + PREFIX_END,), low)
+        counts = self.counts
+        return heapq.nsmallest(k, ((-counts[name], name) for _, name in self._entries[low:high]))
+
+    def lookup(self, text: str) -> str:
+        """The stored name equal to `text`, else the top completion of it, else ''"""
+        if text in self.counts:
+            return text
+        matches = self.complete(text, 1)
+        return matches[0][0] if matches else ''
+
+    def adjust(self, name: str, delta: int):
+        """Change the quote count of a name, adding or dropping it as needed"""
+        if not name or not delta:
+            return
+        with self._lock:
+            self._cache.clear()
+            before = self.counts.get(name, 0)
+            count = before + delta
+            entry = (name.casefold(), name)
+            if count > 0:
+                if name not in self.counts:
+                    insort(self._entries, entry)
+                self.counts[name] = count
+            elif name in self.counts:
+                del self.counts[name]
+                del self._entries[bisect_left(self._entries, entry)]
+            self._rerank(name, before, count)
+
+    def _rerank(self, name: str, before: int, count: int):
+        """Move a name whose count changed within the kept short-prefix rankings"""
+        for prefix in {'', name.casefold()[:1]}:
+            top = self._top.get(prefix)
+            if top is None:
+                continue
+            old = (-before, name)
+            position = bisect_left(top, old)
+            listed = position < len(top) and top[position] == old
+            if count < before:
+                if listed:
+                    # A name left out of the ranking may now belong in it: rank again on next use
+                    del self._top[prefix]
+                continue
+            if listed:
+                del top[position]
+            elif len(top) == TOP_COMPLETIONS and (-count, name) > top[-1]:
+                continue
+            insort(top, (-count, name))
+            del top[TOP_COMPLETIONS:]
@@ -0,0 +1,978 @@
+"""Benchmarks for Quotes Manager.
+
+Usage: python QuotesBenchmark.py <benchmark> [--rows N] [--seed S]
+
+Every benchmark runs against a throw-away database in a temporary directory,
+filled from a seeded synthetic corpus, so quotes.db is never touched.
+The benchmarks only measure; the checks are in the tests package.
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from typing import Iterator, Tuple
+
+from QuotesManager import QuotesManager
+
+WORDS = ('life', 'love', 'death', 'time', 'truth', 'pain', 'rain', 'light', 'dark',
+         'heart', 'soul', 'fear', 'hope', 'silence', 'storm', 'memory', 'freedom',
+         'wisdom', 'change', 'night', 'fire', 'dream', 'mind', 'path', 'world')
+AUTHORS = ['Unknown'] + [f'Author {i}' for i in range(1, 500)]
+CATEGORIES = ['General', 'Philosophy', 'Love', 'Death', 'Time', 'Wisdom', 'Stoicism',
+              'Resilience', 'Loss', 'Purpose', 'Truth', 'Solitude'] + [f'Topic {i}' for i in range(40)]
+
+
+def synthetic_quotes(count: int, seed: int = 42) -> Iterator[Tuple]:
+    """Yield `count` unique (quote_text, author, category, tags, source, year) rows"""
+    rng = random.Random(seed)
+    for i in range(count):
+        words = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(6, 18)))
+        text = f"{words.capitalize()} ({i})."
+        # Skewed authors so "Unknown" and a few prolific authors dominate, like real collections
+        author = AUTHORS[min(int(rng.paretovariate(1.2)) - 1, len(AUTHORS) - 1)]
+        category = rng.choice(CATEGORIES)
+        tags = ','.join(rng.sample(WORDS, rng.randint(0, 3)))
+        year = rng.randint(1800, 2024) if rng.random() < 0.3 else None
+        yield (text, author, category, tags, '', year)
+
+
+def build_corpus(db_name: str, count: int, seed: int = 42) -> QuotesManager:
+    """Create a database at `db_name` holding `count` synthetic quotes"""
+    qm = QuotesManager(db_name)
+    with sqlite3.connect(db_name) as conn:
+        conn.executemany('''
+            INSERT INTO quotes (quote_text, author, category, tags, source, year)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', synthetic_quotes(count, seed))
+        conn.commit()
+    return qm
+
+
+def timed(func, *args, **kwargs):
+    """Run func once and return (result, elapsed seconds)"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def report(label: str, seconds: float, rows: int = None):
+    """Print one benchmark line"""
+    line = f"  {label:<44} {seconds * 1000:10.2f} ms"
+    if rows:
+        line += f"  ({rows / seconds:,.0f} rows/s)" if seconds else ''
+    print(line)
+
+
+def bench_changes(args, workdir: str):
+    """Delta sync after a small change vs. a full JSON export"""
+    source_db = os.path.join(workdir, 'source.db')
+    replica_db = os.path.join(workdir, 'replica.db')
+    print(f"Building {args.rows:,} row corpus...")
+    source = build_corpus(source_db, args.rows, args.seed)
+    source.pause = lambda *a, **k: None
+
+    # Initial replica bootstrap from watermark 0
+    feed = os.path.join(workdir, 'initial.ndjson')
+    watermark, elapsed = timed(source.export_changes, 0, feed)
+    report('initial export-changes (full table)', elapsed, args.rows)
+    replica = QuotesManager(replica_db)
+    with open(feed, encoding='utf-8') as f:
+        _, elapsed = timed(replica.apply_changes, f)
+    report('initial apply-changes (full table)', elapsed, args.rows)
+
+    # Touch 100 rows, then sync only the delta
+    rng = random.Random(args.seed)
+    with sqlite3.connect(source_db) as conn:
+        for quote_id in rng.sample(range(1, args.rows + 1), min(100, args.rows)):
+            conn.execute('UPDATE quotes SET favorite = 1 - favorite WHERE id = ?', (quote_id,))
+        conn.commit()
+
+    delta = os.path.join(workdir, 'delta.ndjson')
+    _, elapsed = timed(source.export_changes, watermark, delta)
+    report('delta export-changes (100 changed rows)', elapsed)
+    with open(delta, encoding='utf-8') as f:
+        _, elapsed = timed(replica.apply_changes, f)
+    report('delta apply-changes (100 changed rows)', elapsed)
+
+    _, elapsed = timed(source.export_quotes, 'json', os.path.join(workdir, 'full.json'))
+    report('full export_quotes json (baseline)', elapsed, args.rows)
+
+
+def quiet(qm: QuotesManager):
+    """Silence the interactive pauses of a manager used for timing"""
+    qm.pause = lambda *a, **k: None
+    qm.clear_screen = lambda: None
+    return qm
+
+
+def run_silently(func, *args, **kwargs):
+    """Call func with stdout discarded and return elapsed seconds"""
+    with open(os.devnull, 'w') as devnull:
+        saved, sys.stdout = sys.stdout, devnull
+        try:
+            return timed(func, *args, **kwargs)[1]
+        finally:
+            sys.stdout = saved
+
+
+def best_of(repeat: int, func, *args, **kwargs) -> float:
+    """Best wall time of `repeat` silent runs"""
+    return min(run_silently(func, *args, **kwargs) for _ in range(repeat))
+
+
+# Query shapes issued before the index tuning, for the "before" column
+LEGACY_QUERIES = {
+    'show_favorites': ["SELECT id, quote_text, author, category FROM quotes WHERE favorite = 1 ORDER BY id"],
+    'get_statistics': [
+        "SELECT COUNT(*) FROM quotes",
+        "SELECT COUNT(*) FROM quotes WHERE favorite = 1",
+        "SELECT id, quote_text, author, times_viewed FROM quotes ORDER BY times_viewed DESC LIMIT 1",
+        "SELECT author, COUNT(*) as count FROM quotes GROUP BY author ORDER BY count DESC, author",
+    ],
+    "get_random_quote('Love')": ["SELECT id, quote_text, author, category FROM quotes "
+                                 "WHERE category = 'Love' ORDER BY RANDOM() LIMIT 1"],
+    'get_random_quote()': ["SELECT id, quote_text, author, category FROM quotes ORDER BY RANDOM() LIMIT 1"],
+}
+
+# The same reports as issued after the migration (random selection goes through _pick_random_id)
+CURRENT_QUERIES = {
+    'show_favorites': LEGACY_QUERIES['show_favorites'],
+    'get_statistics': [
+        "SELECT COUNT(*) FROM quotes",
+        "SELECT COUNT(*) FROM quotes WHERE favorite = 1",
+        "SELECT id, quote_text, author, times_viewed FROM quotes "
+        "WHERE times_viewed > 0 ORDER BY times_viewed DESC LIMIT 1",
+        "SELECT author, COUNT(*) as count FROM quotes GROUP BY author ORDER BY count DESC, author",
+    ],
+}
+
+
+def bench_indexes(args, workdir: str):
+    """Query plans before and after the tuned index migration"""
+    db_name = os.path.join(workdir, 'indexes.db')
+    print(f"Building {args.rows:,} row corpus...")
+    qm = quiet(build_corpus(db_name, args.rows, args.seed))
+    with sqlite3.connect(db_name) as conn:
+        conn.execute('UPDATE quotes SET favorite = 1 WHERE id % 50 = 0')
+        conn.execute('UPDATE quotes SET times_viewed = id % 7 WHERE id % 20 = 0')
+        # Put the database back on the original single-column index set
+        conn.execute('DROP INDEX idx_favorite')
+        conn.execute('DROP INDEX idx_times_viewed')
+        conn.execute('CREATE INDEX idx_favorite ON quotes(favorite)')
+        conn.commit()
+
+    def legacy(statements):
+        with sqlite3.connect(db_name) as conn:
+            for sql in statements:
+                conn.execute(sql).fetchall()
+
+    def current(name):
+        with sqlite3.connect(db_name) as conn:
+            cursor = conn.cursor()
+            if name.startswith('get_random_quote'):
+                category = 'Love' if 'Love' in name else None
+                quote_id = qm._pick_random_id(cursor, category)
+                cursor.execute('SELECT id, quote_text, author, category FROM quotes WHERE id = ?', (quote_id,))
+                cursor.fetchall()
+                return
+            for sql in CURRENT_QUERIES[name]:
+                cursor.execute(sql).fetchall()
+
+    before = {name: best_of(5, legacy, sql) for name, sql in LEGACY_QUERIES.items()}
+    qm.setup_database()  # runs the index migration
+    after = {name: best_of(5, current, name) for name in LEGACY_QUERIES}
+    print(f"  {'method':<28} {'before':>12} {'after':>12}")
+    for name in LEGACY_QUERIES:
+        print(f"  {name:<28} {before[name] * 1000:9.2f} ms {after[name] * 1000:9.2f} ms")
+
+
+def bench_async(args, workdir: str):
+    """Thousands of concurrent coroutine clients: AsyncQuotesManager vs. to_thread on the sync API"""
+    import asyncio
+    from AsyncQuotesManager import AsyncQuotesManager
+
+    db_name = os.path.join(workdir, 'async.db')
+    print(f"Building {args.rows:,} row corpus...")
+    qm = build_corpus(db_name, args.rows, args.seed)
+
+    async def client(n, ops, latencies):
+        rng = random.Random(n)
+        for step in range(4):
+            start = time.perf_counter()
+            kind = (n + step) % 4
+            if kind == 0:
+                await ops['random']()
+            elif kind == 1:
+                await ops['add'](f"Async client {n} step {step} says hello.", f"Client {n % 50}")
+            elif kind == 2:
+                await ops['favorite'](rng.randint(1, args.rows))
+            else:
+                await ops['search']('Topic 7', 'category')
+            latencies.append(time.perf_counter() - start)
+
+    async def drive(ops):
+        latencies = []
+        start = time.perf_counter()
+        results = await asyncio.gather(*(client(n, ops, latencies) for n in range(args.clients)),
+                                       return_exceptions=True)
+        elapsed = time.perf_counter() - start
+        errors = sum(1 for r in results if isinstance(r, Exception))
+        latencies.sort()
+        p50 = latencies[len(latencies) // 2] if latencies else 0
+        p99 = latencies[int(len(latencies) * 0.99)] if latencies else 0
+        return elapsed, len(latencies), errors, p50, p99
+
+    async def facade():
+        async with AsyncQuotesManager(db_name) as aqm:
+            return await drive({
+                'random': aqm.random_quote,
+                'add': aqm.add_quote,
+                'favorite': aqm.set_favorite,
+                'search': aqm.search_quotes,
+            })
+
+    async def threaded():
+        def add(text, author):
+            return qm.add_quote(text + ' (threaded)', author)
+        return await drive({
+            'random': lambda: asyncio.to_thread(qm.fetch_random_quote),
+            'add': lambda text, author: asyncio.to_thread(add, text, author),
+            'favorite': lambda quote_id: asyncio.to_thread(qm.add_remove_favorite, quote_id, 'toggle'),
+            'search': lambda term, field: asyncio.to_thread(qm.search_quotes, term, field),
+        })
+
+    # The sync favorite path sleeps 2 s to show its message; benchmark the database work only
+    import QuotesManager as module
+    module.time.sleep, real_sleep = (lambda seconds: None), module.time.sleep
+    try:
+        for label, runner in (('to_thread + sync QuotesManager', threaded),
+                              ('AsyncQuotesManager', facade)):
+            with open(os.devnull, 'w') as devnull:
+                saved, sys.stdout = sys.stdout, devnull
+                try:
+                    elapsed, ops, errors, p50, p99 = asyncio.run(runner())
+                finally:
+                    sys.stdout = saved
+            print(f"  {label:<32} {ops / elapsed:9,.0f} ops/s   p50 {p50 * 1000:8.1f} ms"
+                  f"   p99 {p99 * 1000:8.1f} ms   failed clients {errors}")
+    finally:
+        module.time.sleep = real_sleep
+
+
+def bench_startup(args, workdir: str):
+    """Import time and time-to-first-menu of QuotesManager.py"""
+    import subprocess
+    here = os.path.dirname(os.path.abspath(__file__))
+    script = os.path.join(here, 'QuotesManager.py')
+    print(f"Building {args.rows:,} row corpus...")
+    build_corpus(os.path.join(workdir, 'quotes.db'), args.rows, args.seed)
+
+    def median_run(command, **kwargs):
+        samples = []
+        for _ in range(7):
+            start = time.perf_counter()
+            subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, **kwargs)
+            samples.append(time.perf_counter() - start)
+        return sorted(samples)[len(samples) // 2]
+
+    # Same output as `python -X importtime`: self and cumulative microseconds per module
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import QuotesManager'],
+                            cwd=here, capture_output=True, text=True)
+    lines = [line for line in result.stderr.splitlines() if line.startswith('import time:')]
+    modules = [(int(cumulative), name.rstrip()) for _, cumulative, name in
+               (line[len('import time:'):].split('|') for line in lines[1:])]
+    total, root = next((cumulative, name) for cumulative, name in modules if name.strip() == 'QuotesManager')
+    depth = len(root) - len(root.lstrip()) + 2
+    print(f"  import QuotesManager (-X importtime){total / 1000:28.2f} ms")
+    # Direct imports of the module, largest first
+    children = [(cumulative, name) for cumulative, name in modules if len(name) - len(name.lstrip()) == depth]
+    for cumulative, name in sorted(children, reverse=True)[:5]:
+        print(f"      {name.strip():<40} {cumulative / 1000:8.2f} ms")
+
+    interpreter = median_run([sys.executable, '-c', 'pass'])
+    # '14' exits from the main menu, so this is launch -> first menu -> exit
+    menu = median_run([sys.executable, script], input=b'14\n', cwd=workdir)
+    report('python -c pass (interpreter start)', interpreter)
+    report('QuotesManager.py to first menu and exit', menu)
+    report('  of which Quotes Manager', menu - interpreter)
+
+
+def bench_normalize(args, workdir: str):
+    """Database size and aggregate queries before and after normalize_schema"""
+    db_name = os.path.join(workdir, 'normalize.db')
+    print(f"Building {args.rows:,} row corpus...")
+    qm = quiet(build_corpus(db_name, args.rows, args.seed))
+
+    def sizes():
+        """Total file size after VACUUM, and bytes per table/index from dbstat"""
+        qm.close()
+        with sqlite3.connect(db_name) as conn:
+            conn.execute('VACUUM')
+            rows = conn.execute('SELECT name, SUM(pgsize) FROM dbstat GROUP BY name ORDER BY 2 DESC').fetchall()
+        return os.path.getsize(db_name), rows
+
+    def workload():
+        qm.collect_statistics()
+        qm.search_quotes('Author 7', 'author')
+        for _ in range(200):
+            qm.fetch_random_quote('Love')
+
+    flat_size, flat_objects = sizes()
+    flat_stats = best_of(5, qm.collect_statistics)
+    flat_workload = best_of(3, workload)
+    _, elapsed = timed(run_silently, qm.normalize_schema)
+    report('normalize_schema', elapsed, args.rows)
+    norm_size, norm_objects = sizes()
+    norm_stats = best_of(5, qm.collect_statistics)
+    norm_workload = best_of(3, workload)
+
+    print(f"  {'':<28} {'flat':>12} {'normalized':>12}")
+    print(f"  {'database size':<28} {flat_size / 2**20:9.2f} MB {norm_size / 2**20:9.2f} MB")
+    print(f"  {'collect_statistics':<28} {flat_stats * 1000:9.2f} ms {norm_stats * 1000:9.2f} ms")
+    print(f"  {'stats+search+200 random':<28} {flat_workload * 1000:9.2f} ms {norm_workload * 1000:9.2f} ms")
+    for label, objects in (('flat', flat_objects), ('normalized', norm_objects)):
+        print(f"  {label} layout, bytes per object:")
+        for name, size in objects[:8]:
+            print(f"      {name:<40} {size / 2**10:10.0f} KiB")
+
+
+def bench_batch(args, workdir: str):
+    """Batch ingestion of a mixed plain / "quote — author" / TSV file vs add_quote per line"""
+    source = os.path.join(workdir, 'batch.txt')
+    with open(source, 'w', encoding='utf-8') as f:
+        for i, (text, author, category, tags, _, year) in enumerate(synthetic_quotes(args.rows, args.seed)):
+            if i % 3 == 0:
+                f.write(f"{text}\n")
+            elif i % 3 == 1:
+                f.write(f"{text} \u2014 {author}\n")
+            else:
+                f.write(f"{text}\t{author}\t{category}\t{tags}\t\t{year or ''}\n")
+    print(f"  input: {args.rows:,} lines, {os.path.getsize(source) / 2**20:.1f} MB")
+
+    qm = quiet(QuotesManager(os.path.join(workdir, 'batch.db')))
+    (added, skipped), elapsed = timed(qm.add_quotes_from_file, source)
+    report(f'add_quotes_from_file ({added:,} added)', elapsed, args.rows)
+    (added, skipped), elapsed = timed(qm.add_quotes_from_file, source)
+    report(f'same file again ({skipped:,} duplicates)', elapsed, args.rows)
+
+    # The old path: one add_quote (and one commit) per line
+    sample = min(args.rows, 2000)
+    legacy = quiet(QuotesManager(os.path.join(workdir, 'legacy.db')))
+    with open(source, encoding='utf-8') as f:
+        rows = list(qm.parse_batch_lines(f.readlines()[:sample]))
+    elapsed = run_silently(lambda: [legacy.add_quote(*row) for row in rows])
+    report(f'add_quote per line ({sample:,} lines)', elapsed, sample)
+
+
+def bench_readonly(args, workdir: str):
+    """Random and search throughput: default mode vs read-only memory-mapped mode"""
+    db_name = os.path.join(workdir, 'readonly.db')
+    print(f"Building {args.rows:,} row corpus...")
+    build_corpus(db_name, args.rows, args.seed).close()
+    terms = [('wisdom', 'all'), ('Author 42', 'author'), ('Topic 7', 'category'), ('silence storm', 'text')]
+    lookups = 2000
+
+    def randoms(qm):
+        for _ in range(lookups):
+            qm.fetch_random_quote()
+        for _ in range(lookups // 4):
+            qm.fetch_random_quote('Love')
+
+    def searches(qm):
+        for term, search_in in terms:
+            qm.search_quotes(term, search_in)
+
+    def open_and_read(read_only):
+        qm = QuotesManager(db_name, read_only=read_only)
+        qm.search_quotes('Author 42', 'author')
+        qm.close()
+
+    print(f"  {'':<32} {'default':>12} {'read-only':>12}")
+    results = {}
+    for read_only in (False, True):
+        qm = quiet(QuotesManager(db_name, read_only=read_only))
+        searches(qm)  # warm the page cache
+        results[read_only] = (best_of(3, open_and_read, read_only),
+                              best_of(3, randoms, qm),
+                              best_of(3, searches, qm))
+        qm.close()
+    rows = [('open + first query', 1), (f'{lookups * 5 // 4:,} random quotes', lookups * 5 // 4),
+            (f'{len(terms)} LIKE searches', len(terms))]
+    for i, (label, count) in enumerate(rows):
+        default, read_only = results[False][i], results[True][i]
+        print(f"  {label:<32} {default * 1000:9.2f} ms {read_only * 1000:9.2f} ms"
+              f"  ({count / default:,.0f} vs {count / read_only:,.0f} /s)")
+
+
+def bench_shards(args, workdir: str):
+    """Write throughput and fan-out reads for 1, 2, 4 and 8 shards"""
+    from ShardedQuotesManager import ShardedQuotesManager
+    print(f"  {'shards':>6} {'batch insert':>16} {'rows/s':>10} {'search':>10} {'stats':>10} {'random':>10}")
+    for count in (1, 2, 4, 8):
+        with ShardedQuotesManager(os.path.join(workdir, f'shards-{count}'), shards=count) as sqm:
+            for shard in sqm.shards:
+                quiet(shard)
+            _, insert = timed(sqm.add_quotes_batch, synthetic_quotes(args.rows, args.seed))
+            search = best_of(3, sqm.search_quotes, 'wisdom')
+            stats = best_of(3, sqm.collect_statistics)
+            random_pick = best_of(3, sqm.fetch_random_quote)
+        print(f"  {count:>6} {insert * 1000:13.0f} ms {args.rows / insert:10,.0f} "
+              f"{search * 1000:7.1f} ms {stats * 1000:7.1f} ms {random_pick * 1000:7.2f} ms")
+    print(f"  ({os.cpu_count()} CPUs; shards only write in parallel while SQLite runs without the GIL)")
+
+
+def bench_columnar(args, workdir: str):
+    """Export size and save/load time: JSON, CSV and the columnar qcol format"""
+    from QuotesColumnar import ColumnarReader
+    db_name = os.path.join(workdir, 'columnar.db')
+    print(f"Building {args.rows:,} row corpus...")
+    qm = quiet(build_corpus(db_name, args.rows, args.seed))
+    with sqlite3.connect(db_name) as conn:
+        conn.execute('UPDATE quotes SET favorite = 1, times_viewed = id % 13 WHERE id % 9 = 0')
+
+    def scan_columns(filename):
+        with open(filename, 'rb') as f:
+            for chunk in ColumnarReader(f).chunks():
+                pass
+
+    print(f"  {'format':<14} {'size':>10} {'save':>12} {'load':>12} {'import':>12}")
+    for label, format, codec in (('json', 'json', None), ('csv', 'csv', None),
+                                 ('qcol (none)', 'qcol', 'none'), ('qcol (zlib)', 'qcol', 'zlib'),
+                                 ('qcol (lzma)', 'qcol', 'lzma')):
+        filename = os.path.join(workdir, f'export-{codec or format}.{format}')
+        save = best_of(3, qm.write_export, format, filename, codec or 'zlib')
+        # load = parse into import rows; import = load + batch insert into an empty database
+        load = best_of(3, lambda: sum(1 for _ in qm.read_import_rows(filename)))
+        target = quiet(QuotesManager(os.path.join(workdir, f'import-{codec or format}.db')))
+        _, insert = timed(target.add_quotes_batch, qm.read_import_rows(filename))
+        target.close()
+        print(f"  {label:<14} {os.path.getsize(filename) / 2**20:7.2f} MB {save * 1000:9.0f} ms "
+              f"{load * 1000:9.0f} ms {insert * 1000:9.0f} ms")
+    scan = best_of(3, scan_columns, os.path.join(workdir, 'export-zlib.qcol'))
+    report('qcol (zlib) chunk scan, columns only', scan, args.rows)
+
+
+def bench_autocomplete(args, workdir: str):
+    """Prefix completion: in-memory index vs a GROUP BY ... LIKE query per keystroke"""
+    db_name = os.path.join(workdir, 'autocomplete.db')
+    print(f"Building {args.rows:,} row corpus...")
+    qm = quiet(build_corpus(db_name, args.rows, args.seed))
+    _, elapsed = timed(qm.complete, 'author', '')
+    report('first use: build author/category/tag index', elapsed, args.rows)
+
+    def like_query(prefix):
+        with sqlite3.connect(db_name) as conn:
+            conn.execute('SELECT author, COUNT(*) AS count FROM quotes WHERE author LIKE ? '
+                         'GROUP BY author ORDER BY count DESC LIMIT 10', (prefix + '%',)).fetchall()
+
+    repeat = 2000
+    for field, prefix in (('author', 'A'), ('author', 'Author 4'), ('category', 'T'), ('tag', 'l')):
+        index = best_of(3, lambda: [qm.complete(field, prefix) for _ in range(repeat)]) / repeat
+        label = f"complete({field!r}, {prefix!r})"
+        print(f"  {label:<44} {index * 1e6:10.1f} us")
+    like = best_of(3, lambda: [like_query('Author 4') for _ in range(20)]) / 20
+    print(f"  {'GROUP BY author LIKE Author 4%':<44} {like * 1e6:10.1f} us")
+    _, elapsed = timed(run_silently, qm.add_quote, 'A brand new author arrives.', 'Zed Newcomer', 'Love', 'fresh')
+    report('add_quote with the index kept current', elapsed)
+    print(f"  after the write: {qm.complete('author', 'Zed')}")
+
+
+def bench_bulk(args, workdir: str):
+    """Set-based bulk operations on the whole corpus vs one add_remove_favorite per id"""
+    db_name = os.path.join(workdir, 'bulk.db')
+    print(f"Building {args.rows:,} row corpus...")
+    qm = quiet(build_corpus(db_name, args.rows, args.seed))
+    everything = {'id_range': (1, args.rows)}
+
+    for label, action, value, filters in (
+            ('favorite every quote', 'favorite', None, everything),
+            ('unfavorite by favorites filter', 'unfavorite', None, {'favorite': True}),
+            ("recategorize category 'Love'", 'set_category', 'Romance', {'category': 'Love'}),
+            ('add tag to every quote', 'add_tag', 'curated', everything),
+            ('remove that tag again', 'remove_tag', 'curated', {'tag': 'curated'}),
+            ("change author of search 'storm'", 'set_author', 'Stormy', {'search': 'storm', 'search_in': 'text'}),
+            ('delete half by id range', 'delete', None, {'id_range': (1, args.rows // 2)})):
+        count, dry = timed(qm.bulk_update, action, value, True, **filters)
+        changed, elapsed = timed(qm.bulk_update, action, value, **filters)
+        report(f'{label} ({changed:,})', elapsed, changed)
+        print(f"  {'  dry run count':<44} {dry * 1000:10.2f} ms")
+    restored, elapsed = timed(qm.undo_bulk)
+    report(f'undo the delete ({restored:,} quotes)', elapsed, restored)
+
+    # The old way: one call (and one commit) per quote
+    sample = min(args.rows, 1000)
+    # add_remove_favorite sleeps 2 s to show its message; time the database work only
+    import QuotesManager as module
+    module.time.sleep, real_sleep = (lambda seconds: None), module.time.sleep
+    try:
+        elapsed = run_silently(lambda: [qm.add_remove_favorite(quote_id, 'add')
+                                        for quote_id in range(1, sample + 1)])
+    finally:
+        module.time.sleep = real_sleep
+    report(f'add_remove_favorite per id ({sample:,} ids)', elapsed, sample)
+
+
+def bench_maintenance(args, workdir: str):
+    """Probe latency and file size of a churned database before and after run_maintenance"""
+    db_name = os.path.join(workdir, 'maintenance.db')
+    print(f"Building {args.rows:,} row corpus...")
+    qm = quiet(build_corpus(db_name, args.rows, args.seed))
+    # Churn: delete two thirds of the quotes, then add new ones into the holes
+    conn = qm._connect()
+    conn.execute('DELETE FROM quotes WHERE id % 3 != 0')
+    conn.commit()
+    qm.add_quotes_batch([(f'{text} (again)', *row) for text, *row in synthetic_quotes(args.rows // 3, args.seed + 1)])
+
+    before = qm.storage_report()
+    elapsed = timed(qm.maintenance_due)[1]
+    print(f"  {'maintenance_due check':<44} {elapsed * 1000:10.2f} ms")
+    summary, elapsed = timed(qm.run_maintenance)
+    after = summary['after']
+    print(f"  {'run_maintenance':<44} {elapsed * 1000:10.2f} ms  ({'; '.join(summary['actions'])})")
+    print(f"  {'file size':<44} {before['file_size'] / 2**20:7.2f} -> {after['file_size'] / 2**20:.2f} MB")
+    print(f"  {'free pages':<44} {before['free_ratio']:7.1%} -> {after['free_ratio']:.1%}")
+    print(f"  {'fragmentation':<44} {before['fragmentation']:7.1%} -> {after['fragmentation']:.1%}")
+    for method, latency in summary['latency_before'].items():
+        print(f"  {method:<44} {latency:7.2f} -> {summary['latency_after'][method]:.2f} ms")
+
+
+def bench_sketches(args, workdir: str):
+    """Exact statistics queries vs the sketch-based approximate statistics, with their errors"""
+    db_name = os.path.join(workdir, 'sketches.db')
+    print(f"Building {args.rows:,} row corpus...")
+    qm = quiet(build_corpus(db_name, args.rows, args.seed))
+    exact, elapsed = timed(qm.collect_statistics)
+    report('collect_statistics (exact)', elapsed)
+    elapsed = timed(qm.refresh_sketches, True)[1]
+    report('build sketches from the table', elapsed)
+    approximate = best_of(3, qm.approximate_statistics)
+    report('approximate_statistics', approximate)
+    added = args.rows // 100
+    rows = [(f'{text} (new)', *row) for text, *row in synthetic_quotes(added, args.seed + 1)]
+    report(f'add_quotes_batch incl. sketch update ({added:,})', timed(qm.add_quotes_batch, rows)[1], added)
+    elapsed = timed(qm.approximate_statistics)[1]
+    report('approximate_statistics after the insert', elapsed)
+
+    exact = qm.collect_statistics()
+    stats = qm.approximate_statistics()
+    distinct_exact = {'author': exact['known_authors'] + (1 if exact['unknown_authors'] else 0),
+                      'category': exact['categories']}
+    for field, actual in distinct_exact.items():
+        estimate, error = stats['distinct'][field]
+        print(f"  distinct {field:<35} {estimate:>10,} ±{error:<6,} (exact {actual:,})")
+    top = stats['top']['author']
+    worst = max(abs(count - dict(exact['all_authors'])[name]) for name, count in top['counts'])
+    print(f"  top {len(top['counts'])} authors: largest overcount {worst:,} (bound {top['overcount']:,})")
+
+
+def bench_embeddings(args, workdir: str):
+    """Semantic search: embedding the corpus, query latency, recall of reworded quotes, incremental updates"""
+    import QuotesEmbeddings
+    db_name = os.path.join(workdir, 'embeddings.db')
+    print(f"Building {args.rows:,} row corpus...")
+    qm = quiet(build_corpus(db_name, args.rows, args.seed))
+    rng = random.Random(args.seed)
+    print(f"  vector index: {'NumPy' if QuotesEmbeddings.numpy is not None else 'array module (NumPy not installed)'}")
+
+    embedded, elapsed = timed(qm.build_embeddings, 'hash')
+    report('build_embeddings (hash-256)', elapsed, embedded)
+    with qm._connect() as conn:
+        size = conn.execute('SELECT SUM(LENGTH(vector)) FROM quote_embeddings').fetchone()[0]
+        sample = rng.sample(conn.execute('SELECT id, quote_text FROM quotes').fetchall(), 100)
+    print(f"    {size / 2**20:.1f} MiB of float32 vectors")
+    _, elapsed = timed(qm.semantic_search, 'warm up the index')
+    report('first query (loads the index)', elapsed)
+
+    # Reworded quotes: the "(n)." suffix and a third of the words dropped, the rest shuffled
+    queries = []
+    for quote_id, text in sample:
+        kept = [word for word in text.split()[:-1] if rng.random() > 0.33]
+        rng.shuffle(kept)
+        queries.append((quote_id, ' '.join(kept)))
+    latencies, hits, keyword_hits = [], 0, 0
+    for quote_id, query in queries:
+        results, elapsed = timed(qm.semantic_search, query, 10)
+        latencies.append(elapsed)
+        hits += any(row[0] == quote_id for row in results)
+        keyword_hits += any(row[0] == quote_id for row in qm.search_quotes(query, 'text'))
+    latencies.sort()
+    report('semantic_search, median of 100 queries', latencies[len(latencies) // 2], None)
+    report('semantic_search, p99', latencies[98], None)
+    print(f"    reworded quote in the top 10: {hits}% (keyword search finds {keyword_hits}%)")
+
+    with open(os.devnull, 'w') as devnull:
+        saved, sys.stdout = sys.stdout, devnull
+        try:
+            for n in range(100):
+                qm.add_quote(f'Benchmark grief and farewell number {n}.', 'Bench', 'Loss')
+            with qm._connect() as conn:
+                for quote_id, _ in sample:
+                    qm._delete(conn.cursor(), quote_id)
+        finally:
+            sys.stdout = saved
+    _, elapsed = timed(qm.semantic_search, 'grief and farewell', 10)
+    report('query after 100 adds and 100 deletes', elapsed)
+    _, elapsed = timed(qm.build_embeddings, None, True)
+    report('full rebuild, for comparison', elapsed, args.rows)
+    qm.close()
+
+
+def bench_fuzzy(args, workdir: str):
+    """LIKE search vs fuzzy_search (full-text index + trigram matching) on misspelled terms"""
+    db_name = os.path.join(workdir, 'fuzzy.db')
+    print(f"Building {args.rows:,} row corpus...")
+    qm = quiet(build_corpus(db_name, args.rows, args.seed))
+    elapsed = timed(qm.build_fuzzy_index)[1]
+    report('build_fuzzy_index', elapsed, args.rows)
+    elapsed = timed(qm.fuzzy_search, 'warm up')[1]
+    report('first fuzzy_search (builds trigram indexes)', elapsed)
+
+    for term, search_in in (('Autor 42', 'author'), ('Stoicsm', 'category'), ('Nietzche', 'all'),
+                            ('wisdon', 'text'), ('silense of the storm', 'text'), ('memry freedm', 'all')):
+        like = best_of(3, qm.search_quotes, term, search_in)
+        fuzzy = best_of(3, qm.fuzzy_search, term, search_in)
+        results, suggestion = qm.fuzzy_search(term, search_in)
+        print(f"  {term + ' (' + search_in + ')':<30} LIKE {like * 1000:8.2f} ms | fuzzy {fuzzy * 1000:7.2f} ms, "
+              f"{len(results)} results, did you mean {suggestion!r}")
+
+
+def bench_render(args, workdir: str):
+    """Listing throughput: four prints per quote vs QuoteRenderer in each output format"""
+    import contextlib
+    from QuotesRenderer import QuoteRenderer
+    rows = [(i + 1, text, author, category, i % 7 == 0)
+            for i, (text, author, category, *_) in enumerate(synthetic_quotes(args.rows, args.seed))]
+
+    def legacy(stream):
+        with contextlib.redirect_stdout(stream):
+            for quote_id, text, author, category, favorite in rows:
+                fav = "[*]" if favorite else "   "
+                print(f"{fav} #{quote_id} {text}")
+                print(f"      Author: {author}")
+                print(f"      Category: {category}")
+                print()
+
+    def rendered(stream, format):
+        with QuoteRenderer(stream, format, width=100, pager=False) as out:
+            out.quotes(rows)
+
+    # Write to a pseudo-terminal (drained by a thread) where there is one, so
+    # the per-write cost of a real terminal is included; else to os.devnull
+    try:
+        master, slave = os.openpty()
+    except (AttributeError, OSError):
+        master, slave = None, os.open(os.devnull, os.O_WRONLY)
+    if master is not None:
+        def drain():
+            try:
+                while os.read(master, 1 << 16):
+                    pass
+            except OSError:
+                pass
+        threading.Thread(target=drain, daemon=True).start()
+    with open(slave, 'w', buffering=1, encoding='utf-8') as terminal:
+        print(f"  writing to {'a pseudo-terminal' if master is not None else os.devnull}")
+        report('print() per line', best_of(3, legacy, terminal), args.rows)
+        for format in ('pretty', 'plain', 'ndjson'):
+            report(f'QuoteRenderer {format}', best_of(3, rendered, terminal, format), args.rows)
+    if master is not None:
+        os.close(master)
+
+
+def bench_import(args, workdir: str):
+    """Import pipeline (parse, normalize, validate, dedupe) on CSV and JSON with 1% bad records"""
+    import csv
+    import json
+    from QuotesImport import FIELDS, ImportPipeline
+    rng = random.Random(args.seed)
+    records = []
+    for text, author, category, tags, source, year in synthetic_quotes(args.rows, args.seed):
+        spoil = rng.random()
+        if spoil < 0.0025:
+            text = '   '
+        elif spoil < 0.005:
+            year = 'c. 1900'
+        elif spoil < 0.0075 and records:
+            text = records[-1][0]
+        elif spoil < 0.01:
+            text = f'\u201c{text}\u201d  '
+        records.append((text, author, category, tags, source, year))
+
+    files = {'csv': os.path.join(workdir, 'import.csv'), 'json': os.path.join(workdir, 'import.json')}
+    with open(files['csv'], 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(FIELDS)
+        writer.writerows(records)
+    with open(files['json'], 'w', encoding='utf-8') as f:
+        json.dump([dict(zip(FIELDS, record)) for record in records], f, ensure_ascii=False)
+
+    for format, filename in files.items():
+        pipeline = ImportPipeline(filename + '.rejected.ndjson')
+        passed, elapsed = timed(lambda: sum(1 for _ in pipeline.rows(filename)))
+        pipeline.close()
+        report(f'{format}: pipeline only', elapsed, args.rows)
+        print(f"    {passed:,} passed, {sum(pipeline.rejected.values()):,} quarantined; "
+              + ', '.join(f"{stage} {seconds * 1000:.0f} ms" for stage, seconds in pipeline.timings.items()
+                          if stage != 'write'))
+        if args.rows / elapsed < 50_000:
+            print(f"  [!] below the 50,000 records/s target")
+
+        qm = quiet(QuotesManager(os.path.join(workdir, f'import-{format}.db')))
+        result = qm.import_file(filename)
+        qm.close()
+        report(f'{format}: import_file into an empty database', result['seconds'], args.rows)
+        print("    " + ', '.join(f"{stage} {seconds * 1000:.0f} ms" for stage, seconds in result['timings'].items()))
+
+
+def bench_resume(args, workdir: str):
+    """Journaled imports: checkpoint cost, and resuming after a crash vs importing again from the start"""
+    import csv
+    import shutil
+    import QuotesImport
+    from QuotesImport import FIELDS
+    filename = os.path.join(workdir, 'resume.csv')
+    with open(filename, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(FIELDS)
+        writer.writerows(synthetic_quotes(args.rows, args.seed))
+
+    for batches in (1, 10, 1000):
+        qm = quiet(QuotesManager(os.path.join(workdir, f'checkpoint-{batches}.db')))
+        result = qm.import_file(filename, checkpoint_batches=batches)
+        qm.close()
+        report(f'import_file, checkpoint every {batches} batch(es)', result['seconds'], args.rows)
+
+    # Crash 80% of the way through: the transaction in progress is lost, the checkpoints are not
+    crash_at = int(args.rows * 0.8)
+    normalize = QuotesImport.ImportPipeline.normalize
+
+    def crashing(self, records):
+        for number, row in normalize(self, records):
+            if number > crash_at:
+                raise KeyboardInterrupt
+            yield number, row
+
+    crashed = os.path.join(workdir, 'crashed.db')
+    qm = quiet(QuotesManager(crashed))
+    QuotesImport.ImportPipeline.normalize = crashing
+    try:
+        qm.import_file(filename, checkpoint_batches=1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        QuotesImport.ImportPipeline.normalize = normalize
+    print(f"    crashed at record {crash_at:,}; last checkpoint at record {qm.list_import_jobs(1)[0][3]:,}")
+    qm.close()
+
+    for label, restart in (('resume from the last checkpoint', False), ('start over (UNIQUE skips the rest)', True)):
+        copy = os.path.join(workdir, f'crashed-{restart}.db')
+        shutil.copy(crashed, copy)
+        qm = quiet(QuotesManager(copy))
+        result = qm.import_file(filename, restart=restart, checkpoint_batches=1)
+        total = qm._connect().execute('SELECT COUNT(*) FROM quotes').fetchone()[0]
+        qm.close()
+        report(label, result['seconds'], result['read'])
+        print(f"    {result['added']:,} added, {result['duplicates']:,} duplicates, {total:,} quotes in all")
+
+
+def bench_views(args, workdir: str):
+    """View history: batched event writes, incremental rollups, reports from rollups vs raw events"""
+    import QuotesManager as manager
+    db_name = os.path.join(workdir, 'views.db')
+    print(f"Building {args.rows:,} row corpus...")
+    qm = quiet(build_corpus(db_name, args.rows, args.seed))
+    rng = random.Random(args.seed)
+
+    views = 2000
+    batch_size = manager.VIEW_BATCH_SIZE
+    for size in (1, batch_size):
+        manager.VIEW_BATCH_SIZE = size
+        _, elapsed = timed(lambda: [qm.fetch_random_quote() for _ in range(views)])
+        report(f'fetch_random_quote, events in batches of {size}', elapsed, views)
+    manager.VIEW_BATCH_SIZE = batch_size
+    qm.flush_views()
+
+    # 90 days of history, popularity drifting from one end of the collection to the other
+    events = args.rows * 5
+    now = int(time.time())
+    start = now - 90 * 86400
+    history = []
+    for i in range(events):
+        viewed_at = start + i * 90 * 86400 // events
+        centre = (viewed_at - start) / (90 * 86400) * args.rows
+        history.append((max(1, min(args.rows, int(rng.gauss(centre, args.rows / 20)))), viewed_at))
+    conn = sqlite3.connect(db_name)
+    conn.execute('DELETE FROM view_events')
+    conn.executemany('INSERT INTO view_events (quote_id, viewed_at) VALUES (?, ?)', history)
+    conn.commit()
+    rolled, elapsed = timed(qm.rollup_views)
+    report(f'first rollup ({rolled:,} events)', elapsed, rolled)
+    kept = conn.execute('SELECT COUNT(*) FROM view_events').fetchone()[0]
+    print(f"    {kept:,} raw events kept after retention")
+
+    conn.executemany('INSERT INTO view_events (quote_id, viewed_at) VALUES (?, ?)',
+                     ((rng.randint(1, args.rows), now) for _ in range(views)))
+    conn.commit()
+    rolled, elapsed = timed(qm.rollup_views)
+    report(f'incremental rollup ({rolled:,} new events)', elapsed, rolled)
+
+    # The same reports straight from the full, untrimmed event history
+    conn.execute('CREATE TEMP TABLE raw_events (quote_id INTEGER, viewed_at INTEGER)')
+    conn.executemany('INSERT INTO raw_events VALUES (?, ?)', history)
+    day = manager.VIEW_PERIODS['day']
+    recent = now - now % day - 6 * day
+
+    def raw_trend(column):
+        conn.execute(f'''
+            SELECT {column}, SUM(e.viewed_at >= ?) AS recent, SUM(e.viewed_at < ?) AS previous
+            FROM raw_events e JOIN quotes q ON q.id = e.quote_id
+            WHERE e.viewed_at >= ? GROUP BY {column} HAVING recent > 0
+            ORDER BY recent - previous DESC, recent DESC LIMIT 10
+        ''', (recent, recent, recent - 7 * day)).fetchall()
+
+    def raw_cold():
+        conn.execute('''
+            SELECT quote_id, COUNT(*) AS views, MAX(viewed_at) AS last FROM raw_events
+            GROUP BY quote_id HAVING last >= ? AND last < ? ORDER BY views DESC LIMIT 10
+        ''', (now - manager.COLD_LOOKBACK_DAYS * day, now - manager.COLD_AFTER_DAYS * day)).fetchall()
+
+    print(f"  {'report':<30} {'rollups':>12} {'raw events':>12}")
+    for label, rolled_up, raw in (('category trend', lambda: qm.view_trends('category'), lambda: raw_trend('q.category')),
+                                  ('quote trend', lambda: qm.view_trends('quote'), lambda: raw_trend('q.id')),
+                                  ('cold quotes', qm.cold_quotes, raw_cold)):
+        print(f"  {label:<30} {best_of(3, rolled_up) * 1000:9.2f} ms {best_of(3, raw) * 1000:9.2f} ms")
+    conn.close()
+
+
+def bench_collections(args, workdir: str):
+    """Hundreds of named collections in one process: LRU-bounded managers, ATTACH search across all"""
+    from QuotesCollections import CollectionRegistry
+    count = 200
+    per_collection = max(args.rows // count, 10)
+    directory = os.path.join(workdir, 'collections')
+    print(f"Building {count} collections of {per_collection:,} quotes...")
+    with CollectionRegistry(directory, max_open=8) as registry:
+        for index in range(count):
+            registry.create(f'team-{index:03d}').add_quotes_batch(
+                synthetic_quotes(per_collection, args.seed + index))
+
+    def open_files():
+        try:
+            return len(os.listdir('/proc/self/fd'))
+        except OSError:
+            return None
+
+    rng = random.Random(args.seed)
+    requests = [f'team-{min(int(rng.paretovariate(0.8)) - 1, count - 1):03d}' for _ in range(5000)]
+    baseline = open_files()
+    for max_open in (16, count):
+        with CollectionRegistry(directory, max_open=max_open) as registry:
+            def serve():
+                for name in requests:
+                    registry.get(name).search_quotes('storm', 'text')
+            _, elapsed = timed(serve)
+            opened = sum(usage['opened'] for usage in registry.usage().values())
+            files = open_files()
+            report(f'max_open={max_open}: {len(requests)} searches', elapsed, len(requests))
+            print(f"    {opened} opens, {len(registry._open)} open now"
+                  + (f", {files - baseline} more file descriptors than before" if files is not None else ''))
+
+    with CollectionRegistry(directory, max_open=16) as registry:
+        names = registry.names()
+
+        def one_manager_each():
+            rows = []
+            for name in names:
+                rows.extend((name,) + row for row in registry.get(name).search_quotes('storm', 'text'))
+            return rows
+
+        expected = sorted(one_manager_each())
+        assert sorted(registry.search('storm', 'text')) == expected
+        report(f'search {count} collections, a manager each', best_of(3, one_manager_each), None)
+        report(f'search {count} collections, ATTACHed in groups', best_of(3, registry.search, 'storm', 'text'), None)
+        _, elapsed = timed(registry.copy, names[0], 'merged')
+        report(f'copy {per_collection:,} quotes via ATTACH', elapsed, per_collection)
+
+
+def bench_export(args, workdir: str):
+    """A filtered export of a 1% date slice vs exporting everything (try --rows 1000000)"""
+    db_name = os.path.join(workdir, 'export.db')
+    print(f"Building {args.rows:,} row corpus...")
+    qm = build_corpus(db_name, args.rows, args.seed)
+    # Spread the quotes over 100 days, so one day holds 1% of them
+    with sqlite3.connect(db_name) as conn:
+        conn.execute("UPDATE quotes SET date_added = datetime('2024-01-01', '+' || (id % 100) || ' days', "
+                     "'+' || (id % 86400) || ' seconds')")
+    day = {'since': '2024-02-10', 'until': '2024-02-10'}
+
+    print(f"  {'export':<30} {'rows':>10} {'size':>10} {'time':>12}")
+    for format in ('json', 'csv', 'qcol'):
+        for label, options in (('everything', {}), ('one day (1%)', day),
+                               ('one day, id + quote_text', dict(day, columns=['id', 'quote_text'])),
+                               ("category 'Stoicism'", {'category': 'Stoicism'})):
+            filename = os.path.join(workdir, f'export.{format}')
+            count, elapsed = timed(qm.write_export, format, filename, **options)
+            print(f"  {f'{format}: {label}':<30} {count:>10,} {os.path.getsize(filename) / 2**20:7.2f} MB "
+                  f"{elapsed * 1000:9.0f} ms")
+            os.remove(filename)
+
+    # Without the filters: export everything, then pick the day out of the file
+    def export_then_filter():
+        import json
+        filename = os.path.join(workdir, 'everything.json')
+        qm.write_export('json', filename)
+        with open(filename, encoding='utf-8') as f:
+            return [item for item in json.load(f) if item['date_added'].startswith(day['since'])]
+
+    found, elapsed = timed(export_then_filter)
+    report(f'json: export all, filter in Python ({len(found):,})', elapsed, args.rows)
+    qm.close()
+
+
+BENCHMARKS = {
+    'async': bench_async,
+    'autocomplete': bench_autocomplete,
+    'batch': bench_batch,
+    'bulk': bench_bulk,
+    'changes': bench_changes,
+    'collections': bench_collections,
+    'columnar': bench_columnar,
+    'embeddings': bench_embeddings,
+    'export': bench_export,
+    'fuzzy': bench_fuzzy,
+    'import': bench_import,
+    'indexes': bench_indexes,
+    'maintenance': bench_maintenance,
+    'normalize': bench_normalize,
+    'readonly': bench_readonly,
+    'render': bench_render,
+    'resume': bench_resume,
+    'shards': bench_shards,
+    'sketches': bench_sketches,
+    'startup': bench_startup,
+    'views': bench_views,
+}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('benchmark', choices=sorted(BENCHMARKS) + ['all'])
+    parser.add_argument('--rows', type=int, default=100_000, help='synthetic corpus size')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--clients', type=int, default=2000, help='concurrent clients (async benchmark)')
+    args = parser.parse_args(argv)
+
+    names = sorted(BENCHMARKS) if args.benchmark == 'all' else [args.benchmark]
+    for name in names:
+        print(f"\n[{name}] {BENCHMARKS[name].__doc__}")
+        with tempfile.TemporaryDirectory() as workdir:
+            BENCHMARKS[name](args, workdir)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
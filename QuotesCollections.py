@@ -0,0 +1,198 @@
+"""Many named quote collections served from one process.
+
+A CollectionRegistry keeps each collection in its own database file,
+<directory>/<name>.db, managed by an ordinary QuotesManager. Managers are
+opened on first use and kept in least-recently-used order; once more than
+`max_open` are open, the least recently used one is closed (its pending view
+events are written first). Closing a manager drops its connection and its
+caches (autocomplete, fuzzy and sketch indexes), so memory and file
+descriptors stay bounded however many collections there are.
+
+Cross-collection search and copy ATTACH the other databases to a single
+connection instead of opening a manager for each, a few at a time (SQLite
+allows 10 attached databases by default).
+
+    with CollectionRegistry("collections") as registry:
+        registry.create("team-a").add_quotes_batch(rows)
+        registry.search("time")                 # [(collection, id, text, ...), ...]
+        registry.copy("team-a", "team-b", category="Stoicism")
+"""
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from QuotesManager import QuotesManager
+
+DEFAULT_MAX_OPEN = 32
+NAME_PATTERN = re.compile(r'[A-Za-z0-9][A-Za-z0-9_.-]{0,63}')
+SEARCH_FIELDS = {'text': ('quote_text',), 'author': ('author',), 'category': ('category',),
+                 'all': ('quote_text', 'author', 'category', 'tags')}
+
+
+class CollectionRegistry:
+    def __init__(self, directory: str = "collections", max_open: int = DEFAULT_MAX_OPEN,
+                 read_only: bool = False):
+        """Serve the collections in `directory` (created if missing, unless read-only)"""
+        if max_open < 1:
+            raise ValueError("max_open must be at least 1")
+        if read_only and not os.path.isdir(directory):
+            raise FileNotFoundError(f"Collections directory {directory} not found")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_open = max_open
+        self.read_only = read_only
+        self._open: 'OrderedDict[str, QuotesManager]' = OrderedDict()
+        self._usage: Dict[str, Dict] = {}
+        self._lock = threading.RLock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __contains__(self, name: str) -> bool:
+        return self._valid(name) and os.path.exists(self.path(name))
+
+    def close(self):
+        """Close every open collection"""
+        with self._lock:
+            while self._open:
+                self._evict()
+
+    # ------------------------------------------------------------------
+    # registry
+
+    @staticmethod
+    def _valid(name: str) -> bool:
+        return isinstance(name, str) and NAME_PATTERN.fullmatch(name) is not None
+
+    def path(self, name: str) -> str:
+        """Database file of collection `name`"""
+        if not self._valid(name):
+            raise ValueError(f"Invalid collection name: {name!r} (letters, digits, '_', '.', '-')")
+        return os.path.join(self.directory, f'{name}.db')
+
+    def names(self) -> List[str]:
+        """Every collection in the directory, open or not"""
+        return sorted(entry[:-3] for entry in os.listdir(self.directory)
+                      if entry.endswith('.db') and self._valid(entry[:-3]))
+
+    def get(self, name: str, create: bool = False) -> QuotesManager:
+        """The manager of collection `name`, opening it (and closing the least recently used) if needed"""
+        path = self.path(name)
+        with self._lock:
+            usage = self._usage.setdefault(name, {'opened': 0, 'requests': 0, 'evicted': 0, 'last_used': None})
+            usage['requests'] += 1
+            usage['last_used'] = time.time()
+            manager = self._open.get(name)
+            if manager is not None:
+                self._open.move_to_end(name)
+                return manager
+            if not os.path.exists(path) and (self.read_only or not create):
+                raise FileNotFoundError(f"Collection {name} not found")
+            while len(self._open) >= self.max_open:
+                self._evict()
+            manager = QuotesManager(path, read_only=self.read_only)
+            self._open[name] = manager
+            usage['opened'] += 1
+            return manager
+
+    def create(self, name: str) -> QuotesManager:
+        """Open collection `name`, creating an empty one if it does not exist"""
+        return self.get(name, create=True)
+
+    def __getitem__(self, name: str) -> QuotesManager:
+        return self.get(name)
+
+    def _evict(self):
+        """Close the least recently used open collection"""
+        name, manager = self._open.popitem(last=False)
+        self._usage[name]['evicted'] += 1
+        # Connections other threads opened on it close once the manager is dropped
+        manager.close()
+
+    def usage(self) -> Dict[str, Dict]:
+        """Per-collection counters: times opened, requests, evictions, last use, and whether it is open now"""
+        with self._lock:
+            return {name: dict(usage, open=name in self._open) for name, usage in self._usage.items()}
+
+    # ------------------------------------------------------------------
+    # across collections
+
+    def _attach_limit(self, conn: sqlite3.Connection) -> int:
+        getlimit = getattr(conn, 'getlimit', None)  # Python 3.11+
+        return getlimit(sqlite3.SQLITE_LIMIT_ATTACHED) if getlimit else 10
+
+    @staticmethod
+    def _uri(path: str) -> str:
+        return Path(path).resolve().as_uri() + '?mode=ro'
+
+    def search(self, search_term: str, search_in: str = "all", names: List[str] = None) -> List[Tuple]:
+        """Search several collections (default: all) with one query per group of attached databases.
+
+        Returns (collection, id, quote_text, author, category, favorite) rows
+        ordered by collection, then id.
+        """
+        if search_in not in SEARCH_FIELDS:
+            raise ValueError(f"Unknown search field: {search_in}")
+        names = self.names() if names is None else names
+        fields = SEARCH_FIELDS[search_in]
+        where = ' OR '.join(f'{field} LIKE ?' for field in fields)
+        pattern = f'%{search_term}%'
+        results = []
+        conn = sqlite3.connect('file::memory:', uri=True)
+        try:
+            limit = self._attach_limit(conn)
+            for start in range(0, len(names), limit):
+                group = names[start:start + limit]
+                attached = 0
+                try:
+                    for index, name in enumerate(group):
+                        conn.execute(f'ATTACH DATABASE ? AS c{index}', (self._uri(self.path(name)),))
+                        attached += 1
+                    selects, params = [], []
+                    for index, name in enumerate(group):
+                        selects.append(f'SELECT ? AS collection, id, quote_text, author, category, favorite '
+                                       f'FROM c{index}.quotes WHERE {where}')
+                        params.append(name)
+                        params.extend([pattern] * len(fields))
+                    results.extend(conn.execute(' UNION ALL '.join(selects) + ' ORDER BY 1, 2', params))
+                finally:
+                    for index in range(attached):
+                        conn.execute(f'DETACH DATABASE c{index}')
+        finally:
+            conn.close()
+        return results
+
+    def copy(self, source: str, target: str, **filters) -> Tuple[int, int]:
+        """Copy the quotes of `source` matching bulk_update-style filters (ids, id_range,
+        search, search_in, category, author, tag, favorite) into `target`.
+
+        `source` is attached to the target's connection and read in the same
+        transaction as the insert. Quotes already in `target` are skipped.
+        Returns (added, duplicates).
+        """
+        if source == target:
+            raise ValueError("Source and target are the same collection")
+        source_path = self.path(source)
+        if source not in self:
+            raise FileNotFoundError(f"Collection {source} not found")
+        manager = self.get(target, create=True)
+        where, params = manager._filter_clause(**filters, view=True)
+        conn = manager._connect()
+        conn.commit()
+        conn.execute('ATTACH DATABASE ? AS copy_source', (self._uri(source_path),))
+        try:
+            rows = conn.execute(f'''
+                SELECT quote_text, author, category, tags, source, year FROM copy_source.quotes
+                {'WHERE ' + where if where else ''} ORDER BY id
+            ''', params)
+            return manager.add_quotes_batch(rows)
+        finally:
+            conn.execute('DETACH DATABASE copy_source')
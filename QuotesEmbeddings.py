@@ -0,0 +1,226 @@
+"""Search by meaning: quote embeddings and a vector index.
+
+An embedder turns texts into unit-length float32 vectors, so the dot product
+of two vectors is their cosine similarity:
+
+    model:<name>   a sentence-transformers model run on the CPU, if the
+                   package and the model files are installed locally
+    hash-<dim>     the fallback: words, word pairs and character trigrams,
+                   each hashed to one of <dim> dimensions with a hash-chosen
+                   sign. It finds quotes sharing words and word parts with
+                   the query, not synonyms.
+
+A VectorIndex holds the vectors of a collection in memory and returns the
+top k by dot product: one matrix product with NumPy, or column by column
+with the array module when NumPy is not installed. Vectors are stored as
+little-endian float32 blobs (see QuotesManager.build_embeddings).
+"""
+import heapq
+import math
+import sys
+import zlib
+from array import array
+from itertools import repeat
+from operator import add, mul
+from typing import Iterable, List, Sequence, Tuple
+
+from QuotesFuzzy import words
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+DEFAULT_MODEL = 'all-MiniLM-L6-v2'
+HASH_DIM = 256
+BIGRAM_WEIGHT = 0.7
+TRIGRAM_WEIGHT = 0.35
+WORD_CACHE_SIZE = 100_000
+STOPWORDS = frozenset('''
+    a an and are as at be been but by can do for from had has have he her him his i if in into is it its
+    me my no not of on or our she so than that the their them then there they this to was we were what
+    when which who will with would you your
+'''.split())
+
+
+def to_blob(vector: array) -> bytes:
+    if sys.byteorder == 'big':
+        vector = array('f', vector)
+        vector.byteswap()
+    return vector.tobytes()
+
+
+def from_blobs(blobs: Iterable[bytes]) -> array:
+    """The vectors of several blobs, one after another in one array"""
+    vectors = array('f')
+    vectors.frombytes(b''.join(blobs))
+    if sys.byteorder == 'big':
+        vectors.byteswap()
+    return vectors
+
+
+def unit(values: Sequence[float]) -> array:
+    norm = math.sqrt(sum(value * value for value in values))
+    return array('f', (value / norm for value in values) if norm else values)
+
+
+class HashingEmbedder:
+    """Hashed n-gram vectors (the hashing trick); needs nothing beyond the standard library"""
+
+    def __init__(self, dim: int = HASH_DIM):
+        self.dim = dim
+        self.name = f'hash-{dim}'
+        self._words = {}
+
+    def _slot(self, feature: str, weight: float) -> Tuple[int, float]:
+        # crc32 rather than hash(), which changes from run to run
+        code = zlib.crc32(feature.encode('utf-8'))
+        return code % self.dim, weight if code & 0x80000000 else -weight
+
+    def _word_features(self, word: str) -> List[Tuple[int, float]]:
+        features = self._words.get(word)
+        if features is None:
+            padded = f' {word} '
+            features = [self._slot('w:' + word, 1.0)]
+            features.extend(self._slot(padded[i:i + 3], TRIGRAM_WEIGHT) for i in range(len(padded) - 2))
+            if len(self._words) < WORD_CACHE_SIZE:
+                self._words[word] = features
+        return features
+
+    def embed(self, texts: Iterable[str]) -> List[array]:
+        vectors = []
+        for text in texts:
+            found = words(text)
+            found = [word for word in found if word not in STOPWORDS] or found
+            values = [0.0] * self.dim
+            for word in found:
+                for index, weight in self._word_features(word):
+                    values[index] += weight
+            for first, second in zip(found, found[1:]):
+                index, weight = self._slot(f'b:{first} {second}', BIGRAM_WEIGHT)
+                values[index] += weight
+            vectors.append(unit(values))
+        return vectors
+
+
+class ModelEmbedder:
+    """A sentence-transformers model, loaded from the local cache only"""
+
+    def __init__(self, model: str = DEFAULT_MODEL):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model, device='cpu', local_files_only=True)
+        self.dim = self.model.get_sentence_embedding_dimension()
+        self.name = f'model:{model}'
+
+    def embed(self, texts: Iterable[str]) -> List[array]:
+        matrix = self.model.encode(list(texts), batch_size=64, normalize_embeddings=True, convert_to_numpy=True)
+        return [array('f', row.tolist()) for row in matrix]
+
+
+def load_embedder(name: str = 'auto'):
+    """'auto' (a local model if available, else hashing), 'hash', 'hash-<dim>', or 'model:<name>' / a model name"""
+    if name == 'hash':
+        return HashingEmbedder()
+    if name.startswith('hash-'):
+        return HashingEmbedder(int(name[len('hash-'):]))
+    if name == 'auto':
+        try:
+            return ModelEmbedder(DEFAULT_MODEL)
+        except Exception:
+            # Not installed, or the model is not in the local cache
+            return HashingEmbedder()
+    return ModelEmbedder(name[len('model:'):] if name.startswith('model:') else name)
+
+
+class VectorIndex:
+    """Quote ids and their vectors, searched by dot product.
+
+    Removed quotes leave a dead slot until more than a quarter of the slots
+    are dead, then the index is compacted.
+    """
+
+    def __init__(self, dim: int, ids: Iterable[int] = (), vectors: array = None):
+        """`vectors` holds the vectors of `ids` one after another (see from_blobs)"""
+        self.dim = dim
+        self.ids = array('q', ids)
+        self.positions = {quote_id: position for position, quote_id in enumerate(self.ids)}
+        self.dead = 0
+        vectors = vectors if vectors is not None else array('f')
+        if numpy is not None:
+            self._matrix = numpy.frombuffer(vectors, dtype=numpy.float32).reshape(-1, dim).copy()
+            self._pending = []
+        else:
+            # Column-major, so a query costs one pass per dimension it uses
+            self._columns = [vectors[d::dim] for d in range(dim)]
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def add(self, ids: Sequence[int], vectors: Sequence[array]):
+        """Add (or replace) the vectors of `ids`"""
+        self.remove([quote_id for quote_id in ids if quote_id in self.positions])
+        for quote_id, vector in zip(ids, vectors):
+            self.positions[quote_id] = len(self.ids)
+            self.ids.append(quote_id)
+            if numpy is not None:
+                self._pending.append(vector)
+            else:
+                for column, value in zip(self._columns, vector):
+                    column.append(value)
+
+    def remove(self, ids: Iterable[int]):
+        for quote_id in ids:
+            position = self.positions.pop(quote_id, None)
+            if position is None:
+                continue
+            self.ids[position] = 0
+            self.dead += 1
+            if numpy is not None:
+                self._flush()
+                self._matrix[position] = 0.0
+            else:
+                for column in self._columns:
+                    column[position] = 0.0
+        if self.dead > max(len(self.ids) // 4, 64):
+            self._compact()
+
+    def _flush(self):
+        if self._pending:
+            self._matrix = numpy.vstack([self._matrix, numpy.array(self._pending, dtype=numpy.float32)])
+            self._pending = []
+
+    def _compact(self):
+        alive = [position for position, quote_id in enumerate(self.ids) if quote_id]
+        if numpy is not None:
+            self._flush()
+            self._matrix = self._matrix[alive]
+        else:
+            self._columns = [array('f', map(column.__getitem__, alive)) for column in self._columns]
+        self.ids = array('q', (self.ids[position] for position in alive))
+        self.positions = {quote_id: position for position, quote_id in enumerate(self.ids)}
+        self.dead = 0
+
+    def search(self, query: Sequence[float], k: int = 10) -> List[Tuple[int, float]]:
+        """Up to k (quote id, similarity) pairs, most similar first"""
+        count = len(self.ids)
+        if not count or k <= 0:
+            return []
+        wanted = min(k + self.dead, count)
+        if numpy is not None:
+            self._flush()
+            scores = self._matrix @ numpy.asarray(query, dtype=numpy.float32)
+            top = numpy.argpartition(-scores, wanted - 1)[:wanted] if wanted < count else numpy.arange(count)
+            best = sorted(((float(scores[position]), int(position)) for position in top), reverse=True)
+        else:
+            scores = None
+            for column, weight in zip(self._columns, query):
+                if weight:
+                    if scores is None:
+                        scores = list(map(mul, column, repeat(weight, count)))
+                    else:
+                        scores = list(map(add, scores, map(mul, column, repeat(weight, count))))
+            if scores is None:
+                return []
+            best = [(scores[position], position)
+                    for position in heapq.nlargest(wanted, range(count), key=scores.__getitem__)]
+        return [(self.ids[position], score) for score, position in best if self.ids[position]][:k]
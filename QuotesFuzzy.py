@@ -0,0 +1,125 @@
+"""Typo-tolerant matching of words and names by trigram similarity.
+
+Strings are compared the way PostgreSQL's pg_trgm does: each word is padded
+("  word ") and cut into three-character pieces, and two strings are as
+similar as the share of trigrams they have in common. A TrigramIndex keeps a
+posting list per trigram, so finding the close matches of a word only
+touches the entries that share at least one trigram with it. Matches are
+then ordered by edit distance.
+"""
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict, FrozenSet, Iterable, List, Tuple
+
+SIMILARITY_THRESHOLD = 0.3
+WORD = re.compile(r'\w+')
+
+
+def fold(text: str) -> str:
+    """Case-fold and strip accents, as the unicode61 tokenizer (remove_diacritics 2) does"""
+    decomposed = unicodedata.normalize('NFKD', text.casefold())
+    return ''.join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def words(text: str) -> List[str]:
+    """The folded words of a string"""
+    return WORD.findall(fold(text or ''))
+
+
+def trigrams(text: str) -> FrozenSet[str]:
+    result = set()
+    for word in words(text):
+        padded = f'  {word} '
+        result.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(result)
+
+
+def similarity(a: str, b: str) -> float:
+    """Shared trigrams / all trigrams of the two strings (1.0 = same words)"""
+    first, second = trigrams(a), trigrams(b)
+    if not first or not second:
+        return 0.0
+    shared = len(first & second)
+    return shared / (len(first) + len(second) - shared)
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Levenshtein distance between the folded strings"""
+    a, b = fold(a), fold(b)
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char in enumerate(a, 1):
+        current = [i]
+        for j, other in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char != other)))
+        previous = current
+    return previous[-1]
+
+
+def typo_budget(word: str) -> int:
+    """Edits tolerated in a word of this length"""
+    return 1 if len(word) <= 4 else 2 if len(word) <= 8 else 3
+
+
+class TrigramIndex:
+    """Names (or words) with a count each, searchable by trigram similarity"""
+
+    def __init__(self, counts: Iterable[Tuple[str, int]] = ()):
+        self.names: List[str] = []
+        self.counts: List[int] = []
+        self.sizes: List[int] = []
+        self.postings: Dict[str, List[int]] = {}
+        self.positions: Dict[str, int] = {}
+        for name, count in counts:
+            grams = trigrams(name)
+            if not grams:
+                continue
+            position = len(self.names)
+            self.positions[name] = position
+            self.names.append(name)
+            self.counts.append(count)
+            self.sizes.append(len(grams))
+            for gram in grams:
+                self.postings.setdefault(gram, []).append(position)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def count(self, name: str):
+        """The count of an indexed name, None if it is not indexed"""
+        position = self.positions.get(name)
+        return None if position is None else self.counts[position]
+
+    def lookup(self, text: str, k: int = 5, threshold: float = SIMILARITY_THRESHOLD,
+               max_distance: int = None) -> List[Tuple[str, float, int]]:
+        """Up to k (name, similarity, edit distance) matches of `text`.
+
+        Only names at least `threshold` similar (and, if given, at most
+        max_distance edits away) qualify; they come closest first, then most
+        similar, then most used.
+        """
+        grams = trigrams(text)
+        if not grams:
+            return []
+        shared = Counter()
+        for gram in grams:
+            shared.update(self.postings.get(gram, ()))
+        size = len(grams)
+        sizes = self.sizes
+        candidates = []
+        for position, common in shared.items():
+            score = common / (size + sizes[position] - common)
+            if score >= threshold:
+                candidates.append((score, position))
+        # Edit distances only for the most similar few
+        candidates.sort(reverse=True)
+        matches = []
+        for score, position in candidates[:max(4 * k, 20)]:
+            name = self.names[position]
+            distance = edit_distance(text, name)
+            if max_distance is None or distance <= max_distance:
+                matches.append((distance, -score, -self.counts[position], name))
+        matches.sort()
+        return [(name, -score, distance) for distance, score, _, name in matches[:k]]
@@ -0,0 +1,318 @@
+"""Staged import of JSON, CSV and qcol files.
+
+Records flow through generator stages, one record at a time:
+
+    parse -> normalize -> validate -> dedupe -> (write)
+
+parse turns the file into numbered field tuples, normalize applies Unicode
+NFC, collapses whitespace and straightens typographic quote marks,
+validate checks each field and fills in defaults, and dedupe drops texts
+seen earlier in the same file. A record that fails a stage is written to
+the quarantine file (NDJSON, one {"record", "stage", "reason", "data"}
+object per line) and the run carries on. The writer is the caller's:
+QuotesManager.import_file feeds rows() to add_quotes_batch, journals the
+pipeline's `position` with each checkpoint and passes it back to rows() to
+resume an interrupted run.
+"""
+import hashlib
+import json
+import os
+import time
+import unicodedata
+from datetime import datetime
+from typing import Dict, Iterator, Tuple
+
+FIELDS = ('quote_text', 'author', 'category', 'tags', 'source', 'year')
+DEFAULTS = {'quote_text': '', 'author': 'Unknown', 'category': 'General', 'tags': '', 'source': '', 'year': None}
+STAGES = ('parse', 'normalize', 'validate', 'dedupe', 'write')
+MAX_QUOTE_LENGTH = 10000
+MAX_NAME_LENGTH = 200
+YEAR_RANGE = (-5000, datetime.now().year + 1)
+
+# Typographic quote marks and primes, straightened
+QUOTE_MARKS = str.maketrans({
+    '“': '"', '”': '"', '„': '"', '‟': '"', '«': '"', '»': '"', '″': '"',
+    '‘': "'", '’': "'", '‚': "'", '‛': "'", '‹': "'", '›': "'", '′': "'",
+})
+
+
+def file_digest(filename: str) -> str:
+    """SHA-256 of a file's contents, which identifies an import job"""
+    digest = hashlib.sha256()
+    with open(filename, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class Rejected(Exception):
+    """Raised inside a stage to quarantine the current record"""
+
+
+def normalize_text(value: str) -> str:
+    """NFC, single spaces, straight quote marks, and no quote marks around the whole text"""
+    if not value.isascii():
+        value = unicodedata.normalize('NFC', value).translate(QUOTE_MARKS)
+    value = ' '.join(value.split())
+    if len(value) >= 2 and value[0] == value[-1] == '"' and '"' not in value[1:-1]:
+        value = value[1:-1].strip()
+    return value
+
+
+def normalize_name(value: str) -> str:
+    if not value.isascii():
+        value = unicodedata.normalize('NFC', value).translate(QUOTE_MARKS)
+    return ' '.join(value.split())
+
+
+class ImportPipeline:
+    """One import run: the stages, their timings and the quarantine file.
+
+        pipeline = ImportPipeline(quarantine="quotes.csv.rejected.ndjson")
+        for row in pipeline.rows("quotes.csv"):   # clean 6-tuples
+            ...
+        pipeline.close()
+        print(pipeline.report())
+    """
+
+    def __init__(self, quarantine: str = None, append: bool = False):
+        self.quarantine = quarantine
+        self._quarantine_mode = 'a' if append else 'w'
+        self._quarantine_file = None
+        self.timings = {stage: 0.0 for stage in STAGES}
+        self.read = 0
+        self.passed = 0
+        self.rejected: Dict[str, int] = {}
+        # (record number, byte offset of the next record or None) of the last record parsed
+        self.position = (0, None)
+
+    def rows(self, filename: str, start: Tuple[int, int] = (0, None)) -> Iterator[Tuple]:
+        """Clean (quote_text, author, category, tags, source, year) rows of a file.
+
+        `start` is a `position` saved by an earlier run: records up to it are
+        skipped (CSV files are seeked to the byte offset, so they are not even read).
+        """
+        self.position = start
+        stream = self.parse(filename, *start)
+        inclusive = []
+        for stage in (None, self.normalize, self.validate, self.dedupe):
+            if stage is not None:
+                stream = stage(stream)
+            timer = [0.0]
+            inclusive.append(timer)
+            stream = self._timed(stream, timer)
+        for _, row in stream:
+            self.passed += 1
+            yield row
+        # Each timer includes the stages before it; keep each stage's own share
+        for stage, timer, previous in zip(STAGES, inclusive, [[0.0]] + inclusive):
+            self.timings[stage] += timer[0] - previous[0]
+
+    @staticmethod
+    def _timed(stream: Iterator, timer: list) -> Iterator:
+        clock = time.perf_counter
+        while True:
+            start = clock()
+            try:
+                item = next(stream)
+            except StopIteration:
+                timer[0] += clock() - start
+                return
+            timer[0] += clock() - start
+            yield item
+
+    def reject(self, number: int, stage: str, reason: str, data):
+        """Send a record to the quarantine file"""
+        self.rejected[stage] = self.rejected.get(stage, 0) + 1
+        if self.quarantine is None:
+            return
+        if self._quarantine_file is None:
+            self._quarantine_file = open(self.quarantine, self._quarantine_mode, encoding='utf-8')
+        if isinstance(data, tuple):
+            data = dict(zip(FIELDS, data))
+        self._quarantine_file.write(json.dumps({'record': number, 'stage': stage, 'reason': reason, 'data': data},
+                                               ensure_ascii=False, default=str) + '\n')
+
+    def quarantine_size(self) -> int:
+        """Bytes written to the quarantine file so far (flushed), so a checkpoint can record them"""
+        if self._quarantine_file is None:
+            return os.path.getsize(self.quarantine) if self.quarantine and os.path.exists(self.quarantine) else 0
+        self._quarantine_file.flush()
+        return self._quarantine_file.tell()
+
+    def close(self):
+        if self._quarantine_file is not None:
+            self._quarantine_file.close()
+            self._quarantine_file = None
+
+    def report(self) -> Dict:
+        """Counts and per-stage seconds of the run so far ('write' is filled in by the caller)"""
+        return {'read': self.read, 'passed': self.passed, 'rejected': dict(self.rejected),
+                'timings': dict(self.timings),
+                'quarantine': self.quarantine if self.rejected and self.quarantine else None}
+
+    # ------------------------------------------------------------------
+    # stages
+
+    def parse(self, filename: str, start_record: int = 0, start_offset: int = None) -> Iterator[Tuple[int, Tuple]]:
+        """(record number, raw field tuple) for every record of a .json, .csv or .qcol file after `start_record`"""
+        if filename.endswith('.qcol'):
+            from QuotesColumnar import ColumnarReader
+            number = 0
+            with open(filename, 'rb') as f:
+                reader = ColumnarReader(f)
+                for chunk in reader.chunks():
+                    size = len(chunk[reader.columns[0]])
+                    if number + size <= start_record:
+                        number += size
+                        continue
+                    columns = [chunk.get(name, [DEFAULTS[name]] * size) for name in FIELDS]
+                    for row in zip(*columns):
+                        number += 1
+                        if number <= start_record:
+                            continue
+                        self.read += 1
+                        self.position = (number, None)
+                        yield number, row
+
+        elif filename.endswith('.json'):
+            with open(filename, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if not isinstance(data, list):
+                raise ValueError("A JSON import must be a list of quote objects")
+            for number, item in enumerate(data[start_record:], start_record + 1):
+                self.read += 1
+                self.position = (number, None)
+                if not isinstance(item, dict):
+                    self.reject(number, 'parse', 'not a JSON object', item)
+                    continue
+                yield number, tuple(item.get(name, DEFAULTS[name]) for name in FIELDS)
+
+        elif filename.endswith('.csv'):
+            import csv
+            with open(filename, 'rb') as f:
+                offset = 0
+
+                def lines():
+                    # Decoded here rather than by a text file, so the byte offset of each record is known
+                    nonlocal offset
+                    while True:
+                        line = f.readline()
+                        if not line:
+                            return
+                        offset += len(line)
+                        yield line.decode('utf-8', errors='replace')
+
+                reader = csv.reader(lines())
+                try:
+                    header = next(reader, None)
+                except csv.Error as e:
+                    raise ValueError(f"Unreadable CSV header: {e}") from None
+                if not header:
+                    return
+                positions = [header.index(name) if name in header else None for name in FIELDS]
+                if positions[0] is None:
+                    raise ValueError("CSV import needs a quote_text column")
+                width = len(header)
+                # Record numbers are line numbers; on resume, continue from the saved one
+                base = 0
+                if start_offset:
+                    f.seek(start_offset)
+                    offset = start_offset
+                    base = start_record - reader.line_num
+                while True:
+                    try:
+                        values = next(reader)
+                    except StopIteration:
+                        return
+                    except csv.Error as e:
+                        self.read += 1
+                        self.position = (base + reader.line_num, offset)
+                        self.reject(base + reader.line_num, 'parse', f'CSV error: {e}', None)
+                        continue
+                    number = base + reader.line_num
+                    self.position = (number, offset)
+                    self.read += 1
+                    if len(values) != width:
+                        if not values:
+                            continue
+                        self.reject(number, 'parse', f'{len(values)} fields, expected {width}', values)
+                        continue
+                    yield number, tuple(DEFAULTS[name] if position is None else values[position]
+                                        for name, position in zip(FIELDS, positions))
+        else:
+            raise ValueError(f"Unsupported import format: {filename}")
+
+    def normalize(self, records: Iterator[Tuple[int, Tuple]]) -> Iterator[Tuple[int, Tuple]]:
+        for number, (text, author, category, tags, source, year) in records:
+            if isinstance(text, str):
+                text = normalize_text(text)
+            if isinstance(author, str):
+                author = normalize_name(author)
+            if isinstance(category, str):
+                category = normalize_name(category)
+            if isinstance(tags, str) and tags:
+                tags = ', '.join(tag for tag in (normalize_name(tag) for tag in tags.split(',')) if tag)
+            if isinstance(source, str):
+                source = ' '.join(source.split())
+            if isinstance(year, str):
+                year = year.strip()
+            yield number, (text, author, category, tags, source, year)
+
+    def validate(self, records: Iterator[Tuple[int, Tuple]]) -> Iterator[Tuple[int, Tuple]]:
+        for number, row in records:
+            try:
+                yield number, self._check(row)
+            except Rejected as e:
+                self.reject(number, 'validate', str(e), row)
+
+    @staticmethod
+    def _check(row: Tuple) -> Tuple:
+        text, author, category, tags, source, year = row
+        if not isinstance(text, str):
+            raise Rejected('quote_text is not text')
+        if not text:
+            raise Rejected('empty quote_text')
+        if len(text) > MAX_QUOTE_LENGTH:
+            raise Rejected(f'quote_text longer than {MAX_QUOTE_LENGTH} characters')
+        names = []
+        for field, value in (('author', author), ('category', category)):
+            if value is None or value == '':
+                value = DEFAULTS[field]
+            elif not isinstance(value, str):
+                raise Rejected(f'{field} is not text')
+            elif len(value) > MAX_NAME_LENGTH:
+                raise Rejected(f'{field} longer than {MAX_NAME_LENGTH} characters')
+            names.append(value)
+        if tags is None:
+            tags = ''
+        elif not isinstance(tags, str):
+            raise Rejected('tags is not text')
+        if source is None:
+            source = ''
+        elif not isinstance(source, str):
+            source = str(source)
+        if year == '' or year is None:
+            year = None
+        else:
+            if isinstance(year, float) and year.is_integer():
+                year = int(year)
+            elif isinstance(year, str):
+                try:
+                    year = int(year)
+                except ValueError:
+                    raise Rejected(f'year {year!r} is not a whole number') from None
+            if not isinstance(year, int) or isinstance(year, bool):
+                raise Rejected(f'year {year!r} is not a whole number')
+            if not YEAR_RANGE[0] <= year <= YEAR_RANGE[1]:
+                raise Rejected(f'year {year} is out of range')
+        return text, names[0], names[1], tags, source, year
+
+    def dedupe(self, records: Iterator[Tuple[int, Tuple]]) -> Iterator[Tuple[int, Tuple]]:
+        seen: Dict[str, int] = {}
+        for number, row in records:
+            first = seen.setdefault(row[0], number)
+            if first != number:
+                self.reject(number, 'dedupe', f'same quote_text as record {first}', row)
+                continue
+            yield number, row
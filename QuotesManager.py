@@ -1,34 +1,516 @@
 import sqlite3
+import math
 import os
 import sys
-import json
-import csv
-from datetime import datetime
-from typing import List, Tuple, Optional, Dict
-import random
-import textwrap
-import shutil
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import List, Tuple, Optional, Dict, Iterable, Iterator, Callable
 import time
 
-# For cross-platform non-echoing input
-if os.name == 'nt':  # Windows
-    import msvcrt
-else:  # Unix/Linux/Mac
-    import termios
-    import tty
+# Feature modules (json, csv, random, shutil and the terminal modules) are
+# imported where they are used, so launching the menu only pays for what it runs.
+
+# Bump when setup_database gains new DDL; databases at this version skip it entirely
+SCHEMA_VERSION = 4
+
+# Secondary indexes on quotes, tuned to the queries the manager issues.
+# Favorites and viewed quotes are a small minority, so partial indexes keep
+# those lookups cheap without indexing every row.
+TUNED_INDEXES = {
+    'idx_author': 'CREATE INDEX idx_author ON quotes(author)',
+    'idx_category': 'CREATE INDEX idx_category ON quotes(category)',
+    'idx_favorite': 'CREATE INDEX idx_favorite ON quotes(favorite) WHERE favorite = 1',
+    'idx_times_viewed': 'CREATE INDEX idx_times_viewed ON quotes(times_viewed) WHERE times_viewed > 0',
+    'idx_date_added': 'CREATE INDEX idx_date_added ON quotes(date_added)',
+}
+
+# The same indexes for the normalized layout (see normalize_schema), on integer keys
+NORMALIZED_INDEXES = {
+    'idx_author': 'CREATE INDEX idx_author ON quote_rows(author_id)',
+    'idx_category': 'CREATE INDEX idx_category ON quote_rows(category_id)',
+    'idx_favorite': 'CREATE INDEX idx_favorite ON quote_rows(favorite) WHERE favorite = 1',
+    'idx_times_viewed': 'CREATE INDEX idx_times_viewed ON quote_rows(times_viewed) WHERE times_viewed > 0',
+    'idx_date_added': 'CREATE INDEX idx_date_added ON quote_rows(date_added)',
+}
+
+# Normalized layout: authors and categories are stored once and referenced by
+# integer keys. `quotes` becomes a view with INSTEAD OF triggers, so every
+# existing query, import and export keeps working unchanged.
+NORMALIZED_SCHEMA = [
+    '''CREATE TABLE authors (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE
+    )''',
+    '''CREATE TABLE categories (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE
+    )''',
+    '''CREATE TABLE quote_rows (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        quote_text TEXT NOT NULL UNIQUE,
+        author_id INTEGER NOT NULL REFERENCES authors(id),
+        category_id INTEGER NOT NULL REFERENCES categories(id),
+        tags TEXT DEFAULT '',
+        source TEXT DEFAULT '',
+        year INTEGER DEFAULT NULL,
+        favorite BOOLEAN DEFAULT 0,
+        times_viewed INTEGER DEFAULT 0,
+        date_added DATETIME DEFAULT CURRENT_TIMESTAMP,
+        last_viewed DATETIME DEFAULT NULL
+    )''',
+    # LEFT JOINs on primary keys let SQLite drop a join whose columns a query never reads
+    '''CREATE VIEW quotes AS
+        SELECT q.id, q.quote_text, a.name AS author, c.name AS category, q.tags, q.source,
+               q.year, q.favorite, q.times_viewed, q.date_added, q.last_viewed
+        FROM quote_rows q
+        LEFT JOIN authors a ON a.id = q.author_id
+        LEFT JOIN categories c ON c.id = q.category_id''',
+    # A view has no column defaults, hence the COALESCEs
+    '''CREATE TRIGGER quotes_view_insert INSTEAD OF INSERT ON quotes
+    BEGIN
+        INSERT OR IGNORE INTO authors (name) VALUES (COALESCE(NEW.author, 'Unknown'));
+        INSERT OR IGNORE INTO categories (name) VALUES (COALESCE(NEW.category, 'General'));
+        INSERT INTO quote_rows (id, quote_text, author_id, category_id, tags, source, year,
+                                favorite, times_viewed, date_added, last_viewed)
+        VALUES (NEW.id, NEW.quote_text,
+                (SELECT id FROM authors WHERE name = COALESCE(NEW.author, 'Unknown')),
+                (SELECT id FROM categories WHERE name = COALESCE(NEW.category, 'General')),
+                COALESCE(NEW.tags, ''), COALESCE(NEW.source, ''), NEW.year,
+                COALESCE(NEW.favorite, 0), COALESCE(NEW.times_viewed, 0),
+                COALESCE(NEW.date_added, CURRENT_TIMESTAMP), NEW.last_viewed);
+    END''',
+    '''CREATE TRIGGER quotes_view_update INSTEAD OF UPDATE ON quotes
+    BEGIN
+        INSERT OR IGNORE INTO authors (name) VALUES (COALESCE(NEW.author, 'Unknown'));
+        INSERT OR IGNORE INTO categories (name) VALUES (COALESCE(NEW.category, 'General'));
+        UPDATE quote_rows SET
+            id = NEW.id,
+            quote_text = NEW.quote_text,
+            author_id = (SELECT id FROM authors WHERE name = COALESCE(NEW.author, 'Unknown')),
+            category_id = (SELECT id FROM categories WHERE name = COALESCE(NEW.category, 'General')),
+            tags = NEW.tags, source = NEW.source, year = NEW.year, favorite = NEW.favorite,
+            times_viewed = NEW.times_viewed, date_added = NEW.date_added, last_viewed = NEW.last_viewed
+        WHERE id = OLD.id;
+    END''',
+    '''CREATE TRIGGER quotes_view_delete INSTEAD OF DELETE ON quotes
+    BEGIN
+        DELETE FROM quote_rows WHERE id = OLD.id;
+    END''',
+]
+
+# Representative form of every query the manager issues, for the index advisor:
+# (method, sql, params, reason a scan or sort is expected or None)
+ADVISOR_QUERIES = [
+    ('search_quotes', 'SELECT id, quote_text, author, category, favorite FROM quotes '
+     'WHERE quote_text LIKE ? OR author LIKE ? OR category LIKE ? OR tags LIKE ? ORDER BY id',
+     ('%a%',) * 4, "substring LIKE '%...%' cannot use a B-tree index"),
+    ('search_quotes(author)', 'SELECT id, quote_text, author, category, favorite FROM quotes '
+     'WHERE author LIKE ? ORDER BY id', ('%a%',), "substring LIKE '%...%' cannot use a B-tree index"),
+    ('show_all_quotes', 'SELECT id, quote_text, author, category, favorite FROM quotes ORDER BY id',
+     (), 'lists every quote'),
+    ('show_all_quotes(limit)', 'SELECT id, quote_text, author, category, favorite FROM quotes '
+     'ORDER BY id DESC LIMIT ?', (50,), 'walks the primary key backwards and stops after LIMIT rows'),
+    ('show_favorites', 'SELECT id, quote_text, author, category FROM quotes WHERE favorite = 1 ORDER BY id',
+     (), None),
+    ('get_random_quote', 'SELECT (SELECT MIN(id) FROM quotes), (SELECT MAX(id) FROM quotes)', (), None),
+    ('get_random_quote', 'SELECT id, quote_text, author, category FROM quotes WHERE id = ?', (1,), None),
+    ('get_random_quote(category)', 'SELECT COUNT(*) FROM quotes WHERE category = ?', ('General',), None),
+    ('get_random_quote(category)', 'SELECT id FROM quotes WHERE category = ? LIMIT 1 OFFSET ?',
+     ('General', 0), None),
+    ('add_remove_favorite', 'SELECT favorite, quote_text FROM quotes WHERE id = ?', (1,), None),
+    ('delete_quote', 'SELECT quote_text, author FROM quotes WHERE id = ?', (1,), None),
+    ('export_quotes', 'SELECT * FROM quotes ORDER BY id', (), 'exports every quote'),
+    ('export_quotes(since)', 'SELECT * FROM quotes WHERE date_added >= ? AND date_added < ? ORDER BY id',
+     ('2024-01-01', '2024-02-01'), 'rows found through idx_date_added are sorted by id'),
+    ('get_statistics', 'SELECT COUNT(*) FROM quotes', (), None),
+    ('get_statistics', 'SELECT COUNT(DISTINCT author) FROM quotes WHERE author != \'Unknown\'', (), None),
+    ('get_statistics', 'SELECT COUNT(*) FROM quotes WHERE author = \'Unknown\'', (), None),
+    ('get_statistics', 'SELECT COUNT(DISTINCT category) FROM quotes', (), None),
+    ('get_statistics', 'SELECT COUNT(*) FROM quotes WHERE favorite = 1', (), None),
+    ('get_statistics', 'SELECT id, quote_text, author, times_viewed FROM quotes '
+     'WHERE times_viewed > 0 ORDER BY times_viewed DESC LIMIT 1', (), None),
+    ('get_statistics', 'SELECT author, COUNT(*) as count FROM quotes GROUP BY author ORDER BY count DESC, author',
+     (), 'sorting by an aggregate always needs a temporary B-tree'),
+    ('get_statistics', 'SELECT category, COUNT(*) as count FROM quotes GROUP BY category '
+     'ORDER BY count DESC, category', (), 'sorting by an aggregate always needs a temporary B-tree'),
+    ('get_changes', 'SELECT quote_id, MAX(seq) FROM quote_changes NOT INDEXED WHERE seq > ? GROUP BY quote_id',
+     (0,), 'the net change per quote is grouped in a temporary B-tree'),
+]
+
+# Statements that differ on the normalized layout; they replace the entries
+# of the same methods in ADVISOR_QUERIES
+NORMALIZED_ADVISOR_QUERIES = [
+    ('get_random_quote', 'SELECT (SELECT MIN(id) FROM quote_rows), (SELECT MAX(id) FROM quote_rows)', (), None),
+    ('get_random_quote', 'SELECT id, quote_text, author, category FROM quotes WHERE id = ?', (1,), None),
+    ('get_random_quote(category)', 'SELECT COUNT(*) FROM quote_rows '
+     'WHERE category_id = (SELECT id FROM categories WHERE name = ?)', ('General',), None),
+    ('get_random_quote(category)', 'SELECT id FROM quote_rows '
+     'WHERE category_id = (SELECT id FROM categories WHERE name = ?) LIMIT 1 OFFSET ?', ('General', 0), None),
+    ('get_statistics', 'SELECT COUNT(*) FROM quote_rows', (), None),
+    ('get_statistics', 'SELECT COUNT(DISTINCT author_id) FROM quote_rows WHERE author_id IS NOT ?', (1,), None),
+    ('get_statistics', 'SELECT COUNT(*) FROM quote_rows WHERE author_id = ?', (1,), None),
+    ('get_statistics', 'SELECT COUNT(DISTINCT category_id) FROM quote_rows', (), None),
+    ('get_statistics', 'SELECT COUNT(*) FROM quote_rows WHERE favorite = 1', (), None),
+    ('get_statistics', 'SELECT id, quote_text, author, times_viewed FROM quotes '
+     'WHERE times_viewed > 0 ORDER BY times_viewed DESC LIMIT 1', (), None),
+    ('get_statistics', 'SELECT a.name, g.count FROM (SELECT author_id, COUNT(*) AS count FROM quote_rows '
+     'GROUP BY author_id) g JOIN authors a ON a.id = g.author_id ORDER BY g.count DESC, a.name',
+     (), 'sorting by an aggregate always needs a temporary B-tree'),
+    ('get_statistics', 'SELECT c.name, g.count FROM (SELECT category_id, COUNT(*) AS count FROM quote_rows '
+     'GROUP BY category_id) g JOIN categories c ON c.id = g.category_id ORDER BY g.count DESC, c.name',
+     (), 'sorting by an aggregate always needs a temporary B-tree'),
+]
+
+# Advisor statements left out of the maintenance latency probe: they read everything
+LATENCY_PROBE_SKIP = {'show_all_quotes', 'export_quotes', 'get_changes'}
+
+# Maintenance thresholds (see maintenance_due / run_maintenance)
+MAINTENANCE_FREE_RATIO = 0.10        # free pages worth reclaiming
+MAINTENANCE_FRAGMENTATION = 0.30     # out-of-order leaf pages that call for a full VACUUM
+MAINTENANCE_CHANGE_RATIO = 0.10      # share of quotes changed since the last ANALYZE
+MAINTENANCE_MIN_CHANGES = 1000
+MAINTENANCE_INTERVAL_DAYS = 30
+
+MAINTENANCE_LOG_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS maintenance_log (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        ran_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        actions TEXT NOT NULL,
+        change_seq INTEGER NOT NULL,
+        free_ratio_before REAL,
+        free_ratio_after REAL,
+        latency_before_ms REAL,
+        latency_after_ms REAL
+    )
+'''
+
+# Column order of the quotes table, used by the change feed
+QUOTE_COLUMNS = ('id', 'quote_text', 'author', 'category', 'tags', 'source', 'year',
+                 'favorite', 'times_viewed', 'date_added', 'last_viewed')
+
+# Formats write_export can write, and the rows it formats per write
+EXPORT_FORMATS = ('json', 'csv', 'qcol')
+EXPORT_CHUNK_ROWS = 1000
+
+# The WAL grows while a long snapshot keeps it from being checkpointed (see snapshot);
+# once it has been checkpointed, it is cut back to this size
+WAL_SIZE_LIMIT = 64 * 2**20
+
+# Memory map this much of the database in read-only mode, so reads come
+# straight from the page cache without copying into SQLite's own cache
+READ_ONLY_MMAP_SIZE = 256 * 2**20
+
+# Name tables of the normalized layout
+NAME_TABLES = {'author': 'authors', 'category': 'categories'}
+
+# Operations accepted by bulk_update; the set_*/tag ones take a value
+BULK_ACTIONS = ('favorite', 'unfavorite', 'set_category', 'set_author', 'add_tag', 'remove_tag', 'delete')
+
+# tags as ',a,b,' so a whole tag can be matched with instr(TAG_LIST, ',tag,')
+TAG_LIST = "',' || REPLACE(COALESCE(tags, ''), ', ', ',') || ','"
+
+# Undo journal of bulk operations, created by the first bulk_update
+BULK_JOURNAL_SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS bulk_operations (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        action TEXT NOT NULL,
+        value TEXT,
+        filter TEXT NOT NULL,
+        affected INTEGER NOT NULL DEFAULT 0,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        undone_at DATETIME DEFAULT NULL
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS bulk_undo (
+        operation_id INTEGER NOT NULL,
+        id INTEGER NOT NULL,
+        quote_text TEXT,
+        author TEXT,
+        category TEXT,
+        tags TEXT,
+        source TEXT,
+        year INTEGER,
+        favorite BOOLEAN,
+        times_viewed INTEGER,
+        date_added DATETIME,
+        last_viewed DATETIME,
+        PRIMARY KEY (operation_id, id)
+    )
+    ''',
+]
+
+# Name fields offered by the autocomplete index
+COMPLETION_FIELDS = ('author', 'category', 'tag')
+
+# Fuzzy search: a word-level full-text index over quote text (created on first
+# use) plus the fts5vocab view of its words, which QuotesFuzzy indexes by trigram
+FUZZY_SCHEMA = [
+    '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS quotes_fts USING fts5(
+        quote_text, content='quotes', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )
+    ''',
+    "CREATE VIRTUAL TABLE IF NOT EXISTS quotes_fts_terms USING fts5vocab(quotes_fts, 'row')",
+]
+FUZZY_CANDIDATES = 200       # quotes scored per word query or name
+FUZZY_ALTERNATIVES = 3       # close words / names tried per misspelling
+FUZZY_COMMON_WORD = 0.05     # words in more than this share of quotes do not narrow a search
+
+# Approximate statistics (QuotesSketches): used by default from this many quotes up,
+# and rebuilt once this share of the counted quotes has been edited or deleted
+APPROX_STATS_ROWS = 500000
+APPROX_DRIFT_RATIO = 0.05
+APPROX_DRIFT_MIN = 1000
+
+# View history: every counted view is appended to view_events (in batches of
+# VIEW_BATCH_SIZE, or after VIEW_FLUSH_SECONDS), and rollup_views() sums the
+# events into hourly and daily view counts per quote, author and category,
+# plus a running total and latest view per quote. Rolled-up events are
+# trimmed after VIEW_EVENT_RETENTION_DAYS and hourly rollups after
+# VIEW_HOURLY_RETENTION_DAYS; daily rollups and totals are kept.
+VIEW_EVENTS_SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS view_events (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        quote_id INTEGER NOT NULL,
+        viewed_at INTEGER NOT NULL
+    )
+    ''',
+    # bucket: start of the hour or day (unix time, UTC); key: quote id, author or category name
+    '''
+    CREATE TABLE IF NOT EXISTS view_rollups (
+        period TEXT NOT NULL,
+        dimension TEXT NOT NULL,
+        bucket INTEGER NOT NULL,
+        key NOT NULL,
+        views INTEGER NOT NULL,
+        PRIMARY KEY (period, dimension, bucket, key)
+    ) WITHOUT ROWID
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS view_totals (
+        quote_id INTEGER PRIMARY KEY,
+        views INTEGER NOT NULL,
+        last_viewed INTEGER NOT NULL
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_view_totals_last ON view_totals(last_viewed)',
+    '''
+    CREATE TABLE IF NOT EXISTS view_rollup_state (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        last_event INTEGER NOT NULL,
+        rolled_at INTEGER NOT NULL
+    )
+    ''',
+]
+VIEW_TABLES = ('view_events', 'view_rollups', 'view_totals', 'view_rollup_state')
+VIEW_PERIODS = {'hour': 3600, 'day': 86400}
+VIEW_DIMENSIONS = ('quote', 'author', 'category')
+VIEW_BATCH_SIZE = 256
+VIEW_FLUSH_SECONDS = 60
+VIEW_EVENT_RETENTION_DAYS = 30
+VIEW_HOURLY_RETENTION_DAYS = 14
+COLD_LOOKBACK_DAYS = 90      # cold quotes: last viewed within this many days ...
+COLD_AFTER_DAYS = 30         # ... but not within this many
+
+# Import journal: one row per import_file run, keyed by the SHA-256 of the
+# file. Every IMPORT_CHECKPOINT_BATCHES batches the position reached (record
+# number, and byte offset for CSV) is written in the same transaction as the
+# quotes, so an interrupted import resumes from its last checkpoint.
+IMPORT_JOURNAL_SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS import_jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        source TEXT NOT NULL,
+        file_hash TEXT NOT NULL,
+        file_size INTEGER NOT NULL,
+        record INTEGER NOT NULL DEFAULT 0,
+        byte_offset INTEGER,
+        quarantine_size INTEGER NOT NULL DEFAULT 0,
+        added INTEGER NOT NULL DEFAULT 0,
+        duplicates INTEGER NOT NULL DEFAULT 0,
+        rejected INTEGER NOT NULL DEFAULT 0,
+        status TEXT NOT NULL DEFAULT 'running',
+        started_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_import_jobs_hash ON import_jobs(file_hash, status)',
+]
+IMPORT_BATCH_SIZE = 10000
+IMPORT_CHECKPOINT_BATCHES = 10
+
+# Semantic search: one float32 vector per quote (see QuotesEmbeddings), with the
+# crc32 of the text it was made from so an edit that leaves the text alone is
+# not embedded again. embedding_state records the embedder and how far into
+# the change log the vectors are current.
+EMBEDDING_SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS quote_embeddings (
+        quote_id INTEGER PRIMARY KEY,
+        text_crc INTEGER NOT NULL,
+        vector BLOB NOT NULL
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS embedding_state (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        model TEXT NOT NULL,
+        dim INTEGER NOT NULL,
+        change_seq INTEGER NOT NULL
+    )
+    ''',
+]
+EMBED_BATCH_SIZE = 256
+
+# Separators between a quote and its author in batch input ("quote — author")
+BATCH_AUTHOR_SEPARATORS = (' \u2014 ', ' \u2013 ', ' -- ')
+
+class ReadOnlyError(sqlite3.OperationalError):
+    """A write was attempted through a QuotesManager opened with read_only=True"""
+
 
 class QuotesManager:
-    def __init__(self, db_name: str = "quotes.db"):
-        """Initialize the quote database with enhanced features"""
+    def __init__(self, db_name: str = "quotes.db", read_only: bool = False):
+        """Initialize the quote database with enhanced features.
+
+        With read_only=True the file is opened immutable and memory-mapped:
+        no DDL runs, views are not counted and write methods raise ReadOnlyError.
+        The file must not be modified while it is open this way. If a non-empty
+        -wal file sits next to it, it is opened plainly read-only instead.
+        """
         self.db_name = db_name
+        self.read_only = read_only
+        if read_only and not os.path.exists(db_name):
+            raise FileNotFoundError(f"Database {db_name} not found")
+        self._local = threading.local()
+        # Every thread's connection, so close_all() can reach those opened by worker threads
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        # Autocomplete index, built on first use (see complete())
+        self._completions = None
+        self._completion_versions = {}
+        # Format of listings (see QuotesRenderer); run_cli sets it from --format
+        self.output_format = 'auto'
+        # Trigram indexes of fuzzy_search, built on first use (see _fuzzy_index())
+        self._fuzzy = None
+        # Approximate-statistics sketches, loaded on first use (see refresh_sketches())
+        self._sketches = None
+        # Embedder and in-memory vector index of semantic_search, loaded on first use
+        self._embedder = None
+        self._vectors = None
+        # Views not yet written to view_events (see _record_view())
+        self._pending_views = []
+        self._views_lock = threading.Lock()
+        self._view_tables = False
         self.setup_database()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use.
+
+        Use it as `with self._connect() as conn:`; the block commits or rolls
+        back but leaves the connection open for the next call.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            if self.read_only:
+                from pathlib import Path
+                uri = Path(self.db_name).resolve().as_uri() + '?mode=ro'
+                wal = self.db_name + '-wal'
+                # immutable=1 also skips file locking and change detection, so it
+                # would ignore commits still in the WAL; read through it instead
+                if not (os.path.exists(wal) and os.path.getsize(wal) > 0):
+                    uri += '&immutable=1'
+                # check_same_thread is off only so close_all() can close every connection
+                conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+                conn.execute(f'PRAGMA mmap_size = {READ_ONLY_MMAP_SIZE}')
+            else:
+                conn = sqlite3.connect(self.db_name, check_same_thread=False)
+                conn.execute(f'PRAGMA journal_size_limit = {WAL_SIZE_LIMIT}')
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def connection(self) -> sqlite3.Connection:
+        """This thread's connection, for code that runs its own SQL on the database.
+
+        Use it as `with qm.connection() as conn:` (see _connect).
+        """
+        return self._connect()
+
+    @contextmanager
+    def snapshot(self) -> Iterator[sqlite3.Cursor]:
+        """A cursor whose reads all see one state of the database, for reports and exports
+        that take several queries or a long time.
+
+        The block is one read transaction. The database is in WAL mode (see
+        setup_database), so writers keep committing meanwhile; their changes
+        show up after the block. Inside a transaction already open on this
+        connection, the block simply joins it.
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+        if conn.in_transaction:
+            yield cursor
+            return
+        cursor.execute('BEGIN')
+        try:
+            yield cursor
+        finally:
+            # Nothing was written; ending the transaction releases the snapshot
+            cursor.execute('COMMIT')
+
+    def _check_writable(self):
+        """Raise ReadOnlyError if this manager was opened read-only"""
+        if self.read_only:
+            raise ReadOnlyError(f"{self.db_name} is open read-only")
+
+    def close(self):
+        """Write pending view events, then close this thread's connection (it is reopened on the next call)"""
+        if self._pending_views:
+            self.flush_views()
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            with self._connections_lock:
+                if conn in self._connections:    # not already closed by close_all()
+                    self._connections.remove(conn)
+            conn.close()
+            self._local.conn = None
+
+    def close_all(self):
+        """close(), then close the connections other threads opened (a thread pool's workers).
+
+        Call it once those threads are done with this manager.
+        """
+        self.close()
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
     
     def setup_database(self):
         """Create enhanced quotes table with additional fields"""
-        with sqlite3.connect(self.db_name) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
+
+            # Up-to-date databases need no DDL at all: one query and done
+            cursor.execute("SELECT user_version, (SELECT type FROM sqlite_master WHERE name = 'quotes') "
+                           "FROM pragma_user_version")
+            version, kind = cursor.fetchone()
+            self._set_layout(kind == 'view')
+            self._view_tables = False
+            if version >= SCHEMA_VERSION or self.read_only:
+                return
+
+            # Readers work from a snapshot and writers append to the log, so neither waits
+            # for the other (see snapshot). The mode is kept in the file.
+            cursor.execute('PRAGMA journal_mode = WAL')
             
-            # Enhanced quotes table with more fields
+            # Enhanced quotes table with more fields (already present as a view when normalized)
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS quotes (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -46,21 +528,185 @@ class QuotesManager:
             ''')
             
             # Create indexes for better performance
+            self.migrate_indexes(cursor)
+            self.setup_change_log(cursor)
+            # A baseline for maintenance_due: a new or upgraded database is not due
+            # for maintenance until it has changed enough, or MAINTENANCE_INTERVAL_DAYS pass
+            cursor.execute(MAINTENANCE_LOG_SCHEMA)
             cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_author ON quotes(author)
+                INSERT INTO maintenance_log (actions, change_seq)
+                SELECT 'baseline', COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'quote_changes'), 0)
+                WHERE NOT EXISTS (SELECT 1 FROM maintenance_log)
+            ''')
+            cursor.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+            conn.commit()
+
+    def _set_layout(self, normalized: bool):
+        """Record whether quotes is the flat table or the normalized view"""
+        self.normalized = normalized
+        # Single-table writes (favorite, views, delete) go straight to the base table
+        self.base_table = 'quote_rows' if normalized else 'quotes'
+
+    def is_empty(self) -> bool:
+        """True if the collection holds no quotes"""
+        with self._connect() as conn:
+            return conn.execute('SELECT NOT EXISTS (SELECT 1 FROM quotes)').fetchone()[0] == 1
+
+    def migrate_indexes(self, cursor):
+        """Bring the index set in line with TUNED_INDEXES (see advise_indexes)"""
+        cursor.execute("SELECT name, sql FROM sqlite_master WHERE type='index' AND tbl_name = ?",
+                       (self.base_table,))
+        existing = dict(cursor.fetchall())
+
+        indexes = NORMALIZED_INDEXES if self.normalized else TUNED_INDEXES
+        for name, ddl in indexes.items():
+            # Older databases have a plain idx_favorite; rebuild it as the partial index
+            if name in existing and ' '.join(existing[name].split()) != ddl:
+                cursor.execute(f'DROP INDEX {name}')
+            cursor.execute(ddl.replace('CREATE INDEX', 'CREATE INDEX IF NOT EXISTS', 1))
+
+    def setup_change_log(self, cursor, resync: bool = True):
+        """Create the append-only change log and the triggers that feed it"""
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='quote_changes'")
+        log_exists = cursor.fetchone() is not None
+        cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE type='trigger' AND name LIKE 'trg_quotes_%'")
+        triggers_exist = cursor.fetchone()[0] == 3
+
+        # seq is AUTOINCREMENT so sequence numbers are never reused, even after pruning
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS quote_changes (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                quote_id INTEGER NOT NULL,
+                op TEXT NOT NULL,
+                changed_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_changes_quote ON quote_changes(quote_id, seq)
+        ''')
+
+        # Before version 4 every update was logged as 'U'. Those rows may have
+        # renamed something, so they keep counting as drift for the sketches.
+        cursor.execute("SELECT sql FROM sqlite_master WHERE type='trigger' AND name='trg_quotes_update'")
+        update_trigger = cursor.fetchone()
+        if update_trigger is not None and "'N'" not in update_trigger[0]:
+            cursor.execute('DROP TRIGGER trg_quotes_update')
+            cursor.execute("UPDATE quote_changes SET op = 'N' WHERE op = 'U'")
+
+        table = self.base_table
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_quotes_insert AFTER INSERT ON {table}
+            BEGIN
+                INSERT INTO quote_changes (quote_id, op) VALUES (NEW.id, 'I');
+            END
+        ''')
+        # View counters are bumped on every random quote, so they are not logged.
+        # Updates that change the author, category or tags are logged as 'N': only
+        # those make the sketches drift (see refresh_sketches).
+        names = ('author_id', 'category_id', 'tags') if self.normalized else ('author', 'category', 'tags')
+        op = "CASE WHEN {} THEN 'N' ELSE 'U' END".format(
+            ' OR '.join(f'OLD.{column} IS NOT NEW.{column}' for column in names))
+        if self.normalized:
+            # Updates through the compatibility view rewrite every column, so
+            # compare values instead of relying on UPDATE OF
+            columns = ('quote_text', 'author_id', 'category_id', 'tags', 'source', 'year', 'favorite')
+            changed = ' OR '.join(f'OLD.{column} IS NOT NEW.{column}' for column in columns)
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_quotes_update AFTER UPDATE ON quote_rows
+                WHEN {changed}
+                BEGIN
+                    INSERT INTO quote_changes (quote_id, op) VALUES (NEW.id, {op});
+                END
+            ''')
+        else:
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_quotes_update
+                AFTER UPDATE OF quote_text, author, category, tags, source, year, favorite ON quotes
+                BEGIN
+                    INSERT INTO quote_changes (quote_id, op) VALUES (NEW.id, {op});
+                END
             ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_quotes_delete AFTER DELETE ON {table}
+            BEGIN
+                INSERT INTO quote_changes (quote_id, op) VALUES (OLD.id, 'D');
+            END
+        ''')
+
+        if not log_exists:
+            # First run on an existing collection: log every row so a replica
+            # syncing from watermark 0 receives the full table
+            cursor.execute("INSERT INTO quote_changes (quote_id, op) SELECT id, 'I' FROM quotes ORDER BY id")
+        elif not triggers_exist and resync:
+            # The quotes table was rebuilt outside the manager (e.g. MYQuotes.py
+            # mode 2), so nothing was logged; record the net effect now
             cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_category ON quotes(category)
+                INSERT INTO quote_changes (quote_id, op)
+                SELECT DISTINCT quote_id, 'D' FROM quote_changes
+                WHERE quote_id NOT IN (SELECT id FROM quotes)
             ''')
+            cursor.execute("INSERT INTO quote_changes (quote_id, op) SELECT id, 'N' FROM quotes ORDER BY id")
+
+    def normalize_schema(self) -> bool:
+        """Migrate the flat quotes table to authors/categories tables with integer keys.
+
+        Quote ids, the AUTOINCREMENT sequence and the change log are preserved;
+        `quotes` is replaced by a view with the same columns. Returns False if
+        the database was already normalized.
+        """
+        if self.normalized:
+            return False
+        self._check_writable()
+
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('BEGIN IMMEDIATE')
+        try:
+            for ddl in NORMALIZED_SCHEMA[:3]:
+                cursor.execute(ddl)
+            cursor.execute("INSERT INTO authors (name) SELECT DISTINCT COALESCE(author, 'Unknown') FROM quotes ORDER BY 1")
+            cursor.execute("INSERT INTO categories (name) SELECT DISTINCT COALESCE(category, 'General') FROM quotes ORDER BY 1")
             cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_favorite ON quotes(favorite)
+                INSERT INTO quote_rows (id, quote_text, author_id, category_id, tags, source, year,
+                                        favorite, times_viewed, date_added, last_viewed)
+                SELECT q.id, q.quote_text, a.id, c.id, q.tags, q.source, q.year,
+                       q.favorite, q.times_viewed, q.date_added, q.last_viewed
+                FROM quotes q
+                JOIN authors a ON a.name = COALESCE(q.author, 'Unknown')
+                JOIN categories c ON c.name = COALESCE(q.category, 'General')
+                ORDER BY q.id
             ''')
-            
-            conn.commit()
-    
+            # Ids of deleted quotes above the current maximum must stay retired
+            cursor.execute('''
+                UPDATE sqlite_sequence
+                SET seq = MAX(seq, COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'quotes'), 0))
+                WHERE name = 'quote_rows'
+            ''')
+            cursor.execute('''
+                INSERT INTO sqlite_sequence (name, seq)
+                SELECT 'quote_rows', seq FROM sqlite_sequence
+                WHERE name = 'quotes' AND NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = 'quote_rows')
+            ''')
+            # Takes the old indexes and change log triggers with it
+            cursor.execute('DROP TABLE quotes')
+            for ddl in NORMALIZED_SCHEMA[3:]:
+                cursor.execute(ddl)
+
+            self._set_layout(True)
+            self.migrate_indexes(cursor)
+            # Rows kept their ids and values, so there is nothing to log
+            self.setup_change_log(cursor, resync=False)
+            cursor.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+            cursor.execute('COMMIT')
+        except Exception:
+            cursor.execute('ROLLBACK')
+            self._set_layout(False)
+            raise
+        return True
+
     def clear_screen(self):
         """Clear the console screen"""
-        os.system('cls' if os.name == 'nt' else 'clear')
+        clear_screen()
     
     def pause(self, message="Press Enter to continue..."):
         """Pause execution with optional message - non-echoing input"""
@@ -70,8 +716,11 @@ class QuotesManager:
     def _getch(self):
         """Get a single character without echoing - cross-platform"""
         if os.name == 'nt':  # Windows
+            import msvcrt
             msvcrt.getch()
         else:  # Unix
+            import termios
+            import tty
             fd = sys.stdin.fileno()
             old_settings = termios.tcgetattr(fd)
             try:
@@ -85,9 +734,12 @@ class QuotesManager:
         try:
             if os.path.exists('MYQuotes.py'):
                 print("Running MYQuotes.py...")
-                # Run MYQuotes.py interactively and wait for it to end
+                # Run MYQuotes.py interactively and wait for it to end.
+                # It may delete or rebuild quotes.db, so let go of our connection first.
                 import subprocess
+                self.close()
                 subprocess.call([sys.executable, 'MYQuotes.py'])
+                self.setup_database()
                 print("\nMYQuotes.py finished. Database should now be populated.")
                 return True
             else:
@@ -103,16 +755,9 @@ class QuotesManager:
                   source: str = "", year: int = None) -> Optional[int]:
         """Add a new quote with enhanced metadata"""
         try:
-            with sqlite3.connect(self.db_name) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT INTO quotes (quote_text, author, category, tags, source, year)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (quote.strip(), author, category, tags, source, year))
-                
-                quote_id = cursor.lastrowid
-                print(f"[OK] Quote #{quote_id} saved successfully!")
-                return quote_id
+            quote_id = self.insert_quote(quote, author, category, tags, source, year)
+            print(f"[OK] Quote #{quote_id} saved successfully!")
+            return quote_id
         except sqlite3.IntegrityError:
             print(f"[!] This quote already exists in the database!")
             return None
@@ -120,114 +765,636 @@ class QuotesManager:
             print(f"[X] Error adding quote: {e}")
             return None
     
+    def insert_quote(self, quote: str, author: str = "Unknown",
+                     category: str = "General", tags: str = "",
+                     source: str = "", year: int = None) -> int:
+        """Add a quote without any output; returns its id, raises sqlite3.IntegrityError for duplicates"""
+        with self._connect() as conn:
+            quote_id = self._insert_quote(conn.cursor(), quote, author, category, tags, source, year)
+        self._follow_writes()
+        return quote_id
+
+    def _insert_quote(self, cursor, quote: str, author: str = "Unknown",
+                      category: str = "General", tags: str = "",
+                      source: str = "", year: int = None) -> int:
+        """INSERT one quote on an open cursor; raises sqlite3.IntegrityError for duplicates"""
+        self._check_writable()
+        if self.normalized:
+            # Write the base table directly: cheaper than the view trigger, and
+            # lastrowid is not reported for rows inserted by a trigger
+            cursor.execute('INSERT OR IGNORE INTO authors (name) VALUES (?)', (author,))
+            cursor.execute('INSERT OR IGNORE INTO categories (name) VALUES (?)', (category,))
+            cursor.execute('''
+                INSERT INTO quote_rows (quote_text, author_id, category_id, tags, source, year)
+                VALUES (?, (SELECT id FROM authors WHERE name = ?), (SELECT id FROM categories WHERE name = ?), ?, ?, ?)
+            ''', (quote.strip(), author, category, tags, source, year))
+        else:
+            cursor.execute('''
+                INSERT INTO quotes (quote_text, author, category, tags, source, year)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (quote.strip(), author, category, tags, source, year))
+        self._note_completions(author, category, tags, 1)
+        return cursor.lastrowid
+
+    def _follow_writes(self):
+        """Bring the sketches and embeddings in use by this process up to date after a commit.
+
+        Only the sketches in memory are updated; the file catches up (incrementally)
+        the next time it is loaded or saved. Quotes are embedded once the embedder
+        is loaded, so a search after the writes has nothing left to embed.
+        """
+        if self._sketches is not None:
+            self.refresh_sketches(save=False)
+        if self._embedder is not None and not self.read_only:
+            self.build_embeddings()
+
+    def parse_batch_lines(self, lines: Iterable[str], author: str = "Unknown",
+                          category: str = "General", tags: str = "") -> Iterator[Tuple]:
+        """Turn plain, `quote — author` or TSV lines into add_quote argument tuples.
+
+        TSV lines carry quote, author, category, tags, source and year columns
+        (trailing ones may be left out); the arguments fill in what is missing.
+        """
+        for line in lines:
+            if '\t' in line:
+                fields = [field.strip() for field in line.split('\t')] + [''] * 5
+                quote, row_author, row_category, row_tags, source, year = fields[:6]
+                if quote.lower() in ('quote', 'quote_text'):  # header row
+                    continue
+                yield (quote, row_author or author, row_category or category, row_tags or tags,
+                       source, int(year) if year.isdigit() else None)
+                continue
+
+            quote, row_author = line.strip(), author
+            for separator in BATCH_AUTHOR_SEPARATORS:
+                text, found, name = quote.rpartition(separator)
+                if found and text.strip() and name.strip():
+                    quote, row_author = text.strip(), name.strip()
+                    break
+            if len(quote) > 1 and quote[0] in '"\u201c' and quote[-1] in '"\u201d':
+                quote = quote[1:-1].strip()
+            if quote:
+                yield (quote, row_author, category, tags, '', None)
+
+    def add_quotes_batch(self, rows: Iterable[Tuple], chunk_size: int = IMPORT_BATCH_SIZE,
+                         checkpoint: Callable = None) -> Tuple[int, int]:
+        """Insert (quote, author, category, tags, source, year) rows in one transaction.
+
+        Rows are consumed in chunks, so a generator over a huge file is never
+        held in memory. Quotes already stored (or repeated in the input) are
+        skipped. `checkpoint(cursor, added, duplicates)` is called just before
+        the commit, so whatever it writes commits with the quotes.
+        Returns (added, duplicates).
+        """
+        from itertools import islice
+        self._check_writable()
+        rows = iter(rows)
+        added = total = 0
+
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            while True:
+                chunk = [(quote.strip(), author, category, tags, source, year)
+                         for quote, author, category, tags, source, year in islice(rows, chunk_size)]
+                if not chunk:
+                    break
+                total += len(chunk)
+                if self.normalized:
+                    cursor.executemany('INSERT OR IGNORE INTO authors (name) VALUES (?)',
+                                       ((name,) for name in {row[1] for row in chunk}))
+                    cursor.executemany('INSERT OR IGNORE INTO categories (name) VALUES (?)',
+                                       ((name,) for name in {row[2] for row in chunk}))
+                    cursor.executemany('''
+                        INSERT OR IGNORE INTO quote_rows (quote_text, author_id, category_id, tags, source, year)
+                        VALUES (?, (SELECT id FROM authors WHERE name = ?), (SELECT id FROM categories WHERE name = ?), ?, ?, ?)
+                    ''', chunk)
+                else:
+                    cursor.executemany('''
+                        INSERT OR IGNORE INTO quotes (quote_text, author, category, tags, source, year)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                    ''', chunk)
+                # rowcount leaves out the change log rows written by the triggers
+                added += cursor.rowcount
+            if checkpoint is not None:
+                checkpoint(cursor, added, total - added)
+            conn.commit()
+
+        # Which rows were ignored is not known; rebuild the autocomplete index on next use
+        self._completions = None
+        if added and self._sketches is None and os.path.exists(self.sketch_file):
+            self.refresh_sketches()
+        if added:
+            self._follow_writes()
+        return added, total - added
+
+    def add_quotes_from_file(self, filename: str = '-', author: str = "Unknown",
+                             category: str = "General", tags: str = "") -> Tuple[int, int]:
+        """Batch-add the quotes in a text/TSV file ('-' for stdin); returns (added, duplicates)"""
+        if filename == '-':
+            return self.add_quotes_batch(self.parse_batch_lines(sys.stdin, author, category, tags))
+        with open(filename, 'r', encoding='utf-8') as f:
+            return self.add_quotes_batch(self.parse_batch_lines(f, author, category, tags))
+
     def search_quotes(self, search_term: str, search_in: str = "all") -> List[Tuple]:
         """Search quotes by text, author, category, or tags"""
-        with sqlite3.connect(self.db_name) as conn:
-            cursor = conn.cursor()
-            search_term = f"%{search_term}%"
-            
-            if search_in == "all":
-                query = '''
-                    SELECT id, quote_text, author, category, favorite
-                    FROM quotes 
-                    WHERE quote_text LIKE ? 
-                       OR author LIKE ? 
-                       OR category LIKE ? 
-                       OR tags LIKE ?
-                    ORDER BY id
-                '''
-                cursor.execute(query, (search_term, search_term, search_term, search_term))
-            elif search_in == "text":
-                cursor.execute('SELECT id, quote_text, author, category, favorite FROM quotes WHERE quote_text LIKE ? ORDER BY id', (search_term,))
-            elif search_in == "author":
-                cursor.execute('SELECT id, quote_text, author, category, favorite FROM quotes WHERE author LIKE ? ORDER BY id', (search_term,))
-            elif search_in == "category":
-                cursor.execute('SELECT id, quote_text, author, category, favorite FROM quotes WHERE category LIKE ? ORDER BY id', (search_term,))
-            
-            return cursor.fetchall()
+        with self._connect() as conn:
+            return self._search(conn.cursor(), search_term, search_in).fetchall()
+
+    def _search(self, cursor, search_term: str, search_in: str = "all"):
+        """Execute a search on an open cursor and return it for fetching"""
+        search_term = f"%{search_term}%"
+        
+        if search_in == "all":
+            query = '''
+                SELECT id, quote_text, author, category, favorite
+                FROM quotes 
+                WHERE quote_text LIKE ? 
+                   OR author LIKE ? 
+                   OR category LIKE ? 
+                   OR tags LIKE ?
+                ORDER BY id
+            '''
+            cursor.execute(query, (search_term, search_term, search_term, search_term))
+        elif search_in == "text":
+            cursor.execute('SELECT id, quote_text, author, category, favorite FROM quotes WHERE quote_text LIKE ? ORDER BY id', (search_term,))
+        elif search_in == "author":
+            cursor.execute('SELECT id, quote_text, author, category, favorite FROM quotes WHERE author LIKE ? ORDER BY id', (search_term,))
+        elif search_in == "category":
+            cursor.execute('SELECT id, quote_text, author, category, favorite FROM quotes WHERE category LIKE ? ORDER BY id', (search_term,))
+        
+        return cursor
     
+    def build_fuzzy_index(self) -> bool:
+        """Create the full-text index behind fuzzy_search, or re-sync it if its triggers are gone.
+
+        The index is a word-level FTS5 table over quote text (external
+        content: the text is not stored twice), kept current by triggers on
+        the base table. Returns True if it was (re)built.
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT name FROM sqlite_master WHERE name IN ('quotes_fts', 'trg_fts_insert')")
+        present = {row[0] for row in cursor.fetchall()}
+        if len(present) == 2 or ('quotes_fts' in present and self.read_only):
+            return False
+        self._check_writable()
+        table = self.base_table
+        cursor.execute('BEGIN IMMEDIATE')
+        try:
+            for ddl in FUZZY_SCHEMA:
+                cursor.execute(ddl)
+            # The triggers disappear with the base table (MYQuotes.py mode 2, normalize)
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_fts_insert AFTER INSERT ON {table}
+                BEGIN
+                    INSERT INTO quotes_fts (rowid, quote_text) VALUES (NEW.id, NEW.quote_text);
+                END
+            ''')
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_fts_delete AFTER DELETE ON {table}
+                BEGIN
+                    INSERT INTO quotes_fts (quotes_fts, rowid, quote_text) VALUES ('delete', OLD.id, OLD.quote_text);
+                END
+            ''')
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_fts_update AFTER UPDATE OF quote_text ON {table}
+                BEGIN
+                    INSERT INTO quotes_fts (quotes_fts, rowid, quote_text) VALUES ('delete', OLD.id, OLD.quote_text);
+                    INSERT INTO quotes_fts (rowid, quote_text) VALUES (NEW.id, NEW.quote_text);
+                END
+            ''')
+            cursor.execute("INSERT INTO quotes_fts (quotes_fts) VALUES ('rebuild')")
+            cursor.execute('COMMIT')
+        except Exception:
+            cursor.execute('ROLLBACK')
+            raise
+        self._fuzzy = None
+        return True
+
+    def has_fuzzy_index(self) -> bool:
+        """Whether build_fuzzy_index has run on this database"""
+        with self._connect() as conn:
+            return conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'quotes_fts'").fetchone() is not None
+
+    def _fuzzy_index(self, field: str):
+        """TrigramIndex over author or category names, or over the words of quote text ('word').
+
+        Name indexes follow the autocomplete index; the word index is
+        rebuilt when the data changes in bulk or from another connection.
+        """
+        from QuotesFuzzy import TrigramIndex
+        completions = self._completion_index(field if field != 'word' else 'author')
+        # A new autocomplete index means bulk or outside changes; a new name changes its size
+        if self._fuzzy is None or self._fuzzy[0] is not self._completions:
+            self._fuzzy = (self._completions, {})
+        size = len(completions) if field != 'word' else 0
+        cached = self._fuzzy[1].get(field)
+        if cached is None or cached[0] != size:
+            if field == 'word':
+                cursor = self._connect().cursor()
+                # Numbers are not worth correcting and would crowd the index
+                cursor.execute("SELECT term, doc FROM quotes_fts_terms WHERE term NOT GLOB '*[0-9]*'")
+                index = TrigramIndex(cursor.fetchall())
+            else:
+                index = TrigramIndex(completions.counts.items())
+            cached = (size, index)
+            self._fuzzy[1][field] = cached
+        return cached[1]
+
+    def fuzzy_search(self, search_term: str, search_in: str = "all",
+                     limit: int = 20) -> Tuple[List[Tuple], Optional[str]]:
+        """Typo-tolerant search: (results, did-you-mean suggestion or None).
+
+        Each word of the term is matched to indexed words within a few edits
+        (see QuotesFuzzy.typo_budget) and the quotes containing them come
+        from the full-text index; authors and categories are matched as whole
+        names. Results have the search_quotes row shape and are ranked by
+        trigram similarity, then edit distance, then full-text rank.
+        """
+        from QuotesFuzzy import fold, words, typo_budget
+        import json
+        self.build_fuzzy_index()
+        cursor = self._connect().cursor()
+        scores = {}      # quote id -> (similarity, distance, rank)
+        best = (0.0, None)
+
+        if search_in in ('all', 'text'):
+            terms = list(dict.fromkeys(words(search_term)))
+            index = self._fuzzy_index('word')
+            alternatives, frequency = {}, {}
+            for term in terms:
+                known = index.count(term)
+                if known is None:
+                    # Numbers and words added since the trigram index was built
+                    cursor.execute('SELECT doc FROM quotes_fts_terms WHERE term = ?', (term,))
+                    row = cursor.fetchone()
+                    known = row[0] if row else None
+                if known is not None:
+                    alternatives[term], frequency[term] = {term: (1.0, 0)}, known
+                elif len(term) >= 3:
+                    matches = index.lookup(term, FUZZY_ALTERNATIVES, max_distance=typo_budget(term))
+                    if matches:
+                        alternatives[term] = {word: (score, distance) for word, score, distance in matches}
+                        frequency[term] = sum(index.count(word) for word in alternatives[term])
+            if alternatives:
+                cursor.execute(f'SELECT COALESCE(MAX(id), 0) FROM {self.base_table}')
+                common = cursor.fetchone()[0] * FUZZY_COMMON_WORD
+                # Words found in many quotes only slow the full-text query down; keep them for
+                # scoring. Ranking by bm25 has to visit every match, so skip it if all are common
+                narrowing = [term for term in alternatives if frequency[term] <= common]
+                query = ' AND '.join('(' + ' OR '.join(f'"{word}"' for word in alternatives[term]) + ')'
+                                     for term in narrowing or alternatives)
+                cursor.execute('SELECT rowid, quote_text FROM quotes_fts WHERE quotes_fts MATCH ? '
+                               + ('ORDER BY rank ' if narrowing else '') + 'LIMIT ?', (query, FUZZY_CANDIDATES))
+                for rank, (quote_id, text) in enumerate(cursor.fetchall()):
+                    present = set(words(text))
+                    total_score = total_distance = 0
+                    for term, options in alternatives.items():
+                        found = [options[word] for word in options if word in present]
+                        score, distance = max(found, key=lambda item: (item[0], -item[1])) if found else (0.0, len(term))
+                        total_score += score
+                        total_distance += distance
+                    scores[quote_id] = (total_score / len(terms), total_distance, rank)
+                corrected = ' '.join(max(alternatives[term].items(), key=lambda item: (item[1][0], -item[1][1]))[0]
+                                     if term in alternatives else term for term in terms)
+                coverage = sum(max(score for score, _ in options.values()) for options in alternatives.values())
+                best = (coverage / len(terms), corrected)
+
+        for field in ('author', 'category'):
+            if search_in not in ('all', field):
+                continue
+            for name, score, distance in self._fuzzy_index(field).lookup(search_term, FUZZY_ALTERNATIVES):
+                if score > best[0]:
+                    best = (score, name)
+                where, params = self._filter_clause(**{field: name})
+                cursor.execute(f'SELECT id FROM {self.base_table} WHERE {where} ORDER BY id LIMIT ?',
+                               params + [FUZZY_CANDIDATES])
+                for rank, (quote_id,) in enumerate(cursor.fetchall()):
+                    scores[quote_id] = max(scores.get(quote_id, (0.0, 0, 0)), (score, distance, rank),
+                                           key=lambda item: (item[0], -item[1]))
+
+        ranked = sorted(scores, key=lambda quote_id: (-scores[quote_id][0], scores[quote_id][1],
+                                                      scores[quote_id][2], quote_id))[:limit]
+        cursor.execute('SELECT id, quote_text, author, category, favorite FROM quotes '
+                       'WHERE id IN (SELECT value FROM json_each(?))', (json.dumps(ranked),))
+        rows = {row[0]: row for row in cursor.fetchall()}
+        suggestion = best[1]
+        if suggestion is not None and fold(suggestion) == fold(search_term):
+            suggestion = None
+        return [rows[quote_id] for quote_id in ranked if quote_id in rows], suggestion
+
+    def has_embeddings(self) -> bool:
+        """Whether build_embeddings has run on this database"""
+        cursor = self._connect().execute("SELECT 1 FROM sqlite_master WHERE name = 'embedding_state'")
+        return cursor.fetchone() is not None
+
+    def build_embeddings(self, model: str = None, rebuild: bool = False) -> int:
+        """Embed the quotes for semantic_search; returns how many were embedded.
+
+        The first run embeds every quote in batches of EMBED_BATCH_SIZE. Later
+        runs only embed the quotes added or edited since, and drop deleted
+        ones, as recorded in the change log. `model` is 'auto', 'hash' or a
+        sentence-transformers model name (see QuotesEmbeddings.load_embedder);
+        by default the one already used, else 'auto'. A different model, or
+        rebuild=True, embeds everything again.
+        """
+        import zlib
+        from QuotesEmbeddings import to_blob
+        self._check_writable()
+        conn = self._connect()
+        cursor = conn.cursor()
+        state = None
+        if self.has_embeddings():
+            cursor.execute('SELECT model, change_seq FROM embedding_state')
+            state = cursor.fetchone()
+        embedder = self._load_embedder(model or (state[0] if state else 'auto'))
+        cursor.execute("SELECT COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'quote_changes'), 0)")
+        change_seq = cursor.fetchone()[0]
+        # A different embedder, or a change log behind the vectors (the database was replaced)
+        full = rebuild or state is None or state[0] != embedder.name or state[1] > change_seq
+        if not full and state[1] == change_seq:
+            return 0
+
+        for ddl in EMBEDDING_SCHEMA:
+            cursor.execute(ddl)
+        if full:
+            cursor.execute('DELETE FROM quote_embeddings')
+            cursor.execute(f'SELECT id, quote_text FROM {self.base_table} ORDER BY id')
+            changed, removed = cursor.fetchall(), []
+        else:
+            cursor.execute(f'''
+                SELECT c.quote_id, q.quote_text, e.text_crc
+                FROM (SELECT DISTINCT quote_id FROM quote_changes NOT INDEXED WHERE seq > ?) c
+                LEFT JOIN {self.base_table} q ON q.id = c.quote_id
+                LEFT JOIN quote_embeddings e ON e.quote_id = c.quote_id
+            ''', (state[1],))
+            changed, removed = [], []
+            for quote_id, text, crc in cursor.fetchall():
+                if text is None:
+                    removed.append(quote_id)
+                elif crc != zlib.crc32(text.encode('utf-8')):
+                    changed.append((quote_id, text))
+            cursor.executemany('DELETE FROM quote_embeddings WHERE quote_id = ?', ((quote_id,) for quote_id in removed))
+
+        ids, vectors = [], []
+        for start in range(0, len(changed), EMBED_BATCH_SIZE):
+            batch = changed[start:start + EMBED_BATCH_SIZE]
+            embedded = embedder.embed([text for _, text in batch])
+            cursor.executemany('INSERT OR REPLACE INTO quote_embeddings (quote_id, text_crc, vector) VALUES (?, ?, ?)',
+                               [(quote_id, zlib.crc32(text.encode('utf-8')), to_blob(vector))
+                                for (quote_id, text), vector in zip(batch, embedded)])
+            ids.extend(quote_id for quote_id, _ in batch)
+            vectors.extend(embedded)
+        cursor.execute('INSERT OR REPLACE INTO embedding_state (id, model, dim, change_seq) VALUES (1, ?, ?, ?)',
+                       (embedder.name, embedder.dim, change_seq))
+        conn.commit()
+
+        # Keep a loaded index in step rather than reading every vector back
+        index = self._vectors
+        if full or index is None or index.dim != embedder.dim:
+            self._vectors = None
+        else:
+            index.remove(removed)
+            index.add(ids, vectors)
+        return len(changed)
+
+    def _load_embedder(self, model: str):
+        if self._embedder is None or model not in (self._embedder.name, 'auto'):
+            from QuotesEmbeddings import load_embedder
+            self._embedder = load_embedder(model)
+        return self._embedder
+
+    def _vector_index(self):
+        """The embedder and the in-memory VectorIndex, brought up to date with the database"""
+        from QuotesEmbeddings import VectorIndex, from_blobs
+        if not self.read_only:
+            self.build_embeddings()
+        elif not self.has_embeddings():
+            raise ValueError(f"{self.db_name} has no embeddings; run the embed command on a writable copy")
+        cursor = self._connect().cursor()
+        cursor.execute('SELECT model, dim FROM embedding_state')
+        model, dim = cursor.fetchone()
+        embedder = self._load_embedder(model)
+        if self._vectors is None:
+            cursor.execute('SELECT quote_id, vector FROM quote_embeddings ORDER BY quote_id')
+            rows = cursor.fetchall()
+            self._vectors = VectorIndex(dim, (row[0] for row in rows), from_blobs(row[1] for row in rows))
+        return embedder, self._vectors
+
+    def semantic_search(self, query: str, k: int = 10) -> List[Tuple]:
+        """The k quotes closest in meaning to `query`, as search_quotes rows plus a similarity.
+
+        Single and batch inserts and deletes embed as they commit once the
+        embedder is loaded; anything else changed since the last call (bulk
+        edits, other processes) is embedded or dropped first, so the index
+        never has to be rebuilt by hand.
+        """
+        embedder, index = self._vector_index()
+        hits = index.search(embedder.embed([query])[0], k)
+        if not hits:
+            return []
+        cursor = self._connect().cursor()
+        cursor.execute(f'''
+            SELECT id, quote_text, author, category, favorite FROM quotes
+            WHERE id IN ({', '.join('?' for _ in hits)})
+        ''', [quote_id for quote_id, _ in hits])
+        rows = {row[0]: row for row in cursor.fetchall()}
+        return [rows[quote_id] + (round(score, 4),) for quote_id, score in hits if quote_id in rows]
+
+    def complete(self, field: str, prefix: str, k: int = 10) -> List[Tuple[str, int]]:
+        """Top k (name, quote count) authors, categories or tags starting with `prefix`"""
+        return self._completion_index(field).complete(prefix, k)
+
+    def resolve_name(self, field: str, text: str) -> str:
+        """The exact name, else the most used one starting with `text` (any case), else `text`"""
+        return self._completion_index(field).lookup(text) or text
+
+    def _completion_index(self, field: str):
+        """The CompletionIndex of a field, (re)built when another connection changed the data"""
+        if field not in COMPLETION_FIELDS:
+            raise ValueError(f"Unknown completion field: {field}")
+        conn = self._connect()
+        # data_version only moves when a different connection commits; writes
+        # through this manager keep the index current themselves
+        version = conn.execute('PRAGMA data_version').fetchone()[0]
+        if self._completions is None or self._completion_versions.get(id(conn), version) != version:
+            self._completions = self._build_completions(conn.cursor())
+            self._completion_versions.clear()
+        self._completion_versions[id(conn)] = version
+        return self._completions[field]
+
+    def _build_completions(self, cursor) -> Dict:
+        """Count quotes per author, category and tag into CompletionIndex objects"""
+        from QuotesAutocomplete import CompletionIndex
+        authors, categories, tags = self._name_counts(cursor)
+        return {'author': CompletionIndex(authors), 'category': CompletionIndex(categories),
+                'tag': CompletionIndex(tags.items())}
+
+    def _name_counts(self, cursor) -> Tuple[List[Tuple[str, int]], List[Tuple[str, int]], Dict[str, int]]:
+        """(author, count) and (category, count) lists and a tag -> count dict"""
+        if self.normalized:
+            cursor.execute('''
+                SELECT a.name, g.count
+                FROM (SELECT author_id, COUNT(*) AS count FROM quote_rows GROUP BY author_id) g
+                JOIN authors a ON a.id = g.author_id
+            ''')
+            authors = cursor.fetchall()
+            cursor.execute('''
+                SELECT c.name, g.count
+                FROM (SELECT category_id, COUNT(*) AS count FROM quote_rows GROUP BY category_id) g
+                JOIN categories c ON c.id = g.category_id
+            ''')
+            categories = cursor.fetchall()
+        else:
+            # Both read only the covering author/category indexes
+            cursor.execute('SELECT author, COUNT(*) FROM quotes GROUP BY author')
+            authors = cursor.fetchall()
+            cursor.execute('SELECT category, COUNT(*) FROM quotes GROUP BY category')
+            categories = cursor.fetchall()
+
+        tags = {}
+        cursor.execute(f"SELECT tags, COUNT(*) FROM {self.base_table} WHERE tags != '' GROUP BY tags")
+        for value, count in cursor:
+            for tag in set(self._split_tags(value)):
+                tags[tag] = tags.get(tag, 0) + count
+        return authors, categories, tags
+
+    @staticmethod
+    def _split_tags(tags: str) -> List[str]:
+        """The individual tags of a comma-separated tags value"""
+        return [tag.strip() for tag in (tags or '').split(',') if tag.strip()]
+
+    def _note_completions(self, author: str, category: str, tags: str, delta: int):
+        """Apply a quote added (+1) or removed (-1) to a built autocomplete index"""
+        completions = self._completions
+        if completions is None:
+            return
+        completions['author'].adjust(author, delta)
+        completions['category'].adjust(category, delta)
+        for tag in set(self._split_tags(tags)):
+            completions['tag'].adjust(tag, delta)
+
+    def ask_name(self, prompt: str, field: str, default: str = "") -> str:
+        """input() for an author, category or tags answer, with autocomplete.
+
+        Tab completes where readline is available. Ending the answer with '?'
+        lists the most used matches and asks again.
+        """
+        try:
+            import readline
+        except ImportError:
+            readline = None
+        if readline is not None:
+            def completer(text, state):
+                head, comma, last = text.rpartition(',')
+                start = head + comma + (' ' if comma else '')
+                names = [start + name for name, _ in self.complete(field, last.strip(), 20)]
+                return names[state] if state < len(names) else None
+            saved = readline.get_completer(), readline.get_completer_delims()
+            readline.set_completer(completer)
+            readline.set_completer_delims('')
+            readline.parse_and_bind('bind ^I rl_complete' if 'libedit' in (readline.__doc__ or '')
+                                    else 'tab: complete')
+        try:
+            while True:
+                answer = input(prompt).strip()
+                if not answer.endswith('?'):
+                    return answer or default
+                # For tags only the last comma-separated entry is being typed
+                last = answer[:-1].rpartition(',')[2].strip()
+                matches = self.complete(field, last)
+                if not matches:
+                    print(f"    No {field} starts with '{last}'")
+                for name, count in matches:
+                    print(f"    {name} ({count} quotes)")
+        finally:
+            if readline is not None:
+                readline.set_completer(saved[0])
+                readline.set_completer_delims(saved[1])
+
     def show_all_quotes(self, limit: int = None, show_stats: bool = False):
         """Display all quotes with improved formatting"""
-        with sqlite3.connect(self.db_name) as conn:
-            cursor = conn.cursor()
-            
+        if not self.render_quotes(limit, show_stats=show_stats):
+            print("No quotes found! Add some quotes first.")
+        self.pause()
+
+    def renderer(self):
+        """A QuoteRenderer for stdout in this manager's output format"""
+        from QuotesRenderer import QuoteRenderer
+        return QuoteRenderer(format=self.output_format)
+
+    def render_quotes(self, limit: int = None, favorites: bool = False, show_stats: bool = False,
+                      **filters) -> int:
+        """Stream the newest `limit` quotes (default: all, oldest first), or the favorites,
+        through the renderer; returns the number shown. Filters narrow the listing (see _filter_clause)."""
+        if favorites:
+            filters['favorite'] = True
+        where, params = self._filter_clause(**filters)
+        # The count, the statistics and the listing all see the same quotes
+        with self.snapshot() as cursor:
+            cursor.execute(f'SELECT COUNT(*) FROM {self.base_table}' + (f' WHERE {where}' if where else ''), params)
+            total_count = cursor.fetchone()[0]
             if limit:
-                cursor.execute('SELECT id, quote_text, author, category, favorite FROM quotes ORDER BY id DESC LIMIT ?', (limit,))
-            else:
-                cursor.execute('SELECT id, quote_text, author, category, favorite FROM quotes ORDER BY id')
-            
-            quotes = cursor.fetchall()
-            
-            if not quotes:
-                print("No quotes found! Add some quotes first.")
-                self.pause()
-                return
-            
-            # Get statistics if requested
-            total_count = len(quotes)
-            if show_stats:
-                cursor.execute('SELECT COUNT(*) FROM quotes')
-                total = cursor.fetchone()[0]
-                cursor.execute('SELECT COUNT(DISTINCT author) FROM quotes WHERE author != "Unknown"')
-                authors = cursor.fetchone()[0]
-                cursor.execute('SELECT COUNT(*) FROM quotes WHERE author = "Unknown"')
-                unknown_authors = cursor.fetchone()[0]
-                cursor.execute('SELECT COUNT(DISTINCT category) FROM quotes')
-                categories = cursor.fetchone()[0]
-                cursor.execute('SELECT COUNT(*) FROM quotes WHERE favorite = 1')
-                favorites = cursor.fetchone()[0]
-                
-                print("\nSTATISTICS:")
-                print(f"  Total Quotes: {total}")
-                print(f"  Known Authors: {authors}")
-                print(f"  Unknown Authors: {unknown_authors}")
-                print(f"  Categories: {categories}")
-                print(f"  Favorites: {favorites}")
-            
-            print(f"\nQUOTES COLLECTION ({total_count} quotes):")
-            print("-" * 75)
-            
-            for quote_id, text, author, category, favorite in quotes:
-                # Simpler format
-                fav = "[*]" if favorite else "   "
-                print(f"{fav} #{quote_id} {text}")
-                print(f"      Author: {author}")
-                print(f"      Category: {category}")
-                print()
-            
-            self.pause()
-    
+                total_count = min(total_count, limit)
+            if not total_count:
+                return 0
+
+            with self.renderer() as out:
+                # Get statistics if requested
+                if show_stats:
+                    cursor.execute('SELECT COUNT(*) FROM quotes')
+                    total = cursor.fetchone()[0]
+                    cursor.execute('SELECT COUNT(DISTINCT author) FROM quotes WHERE author != "Unknown"')
+                    authors = cursor.fetchone()[0]
+                    cursor.execute('SELECT COUNT(*) FROM quotes WHERE author = "Unknown"')
+                    unknown_authors = cursor.fetchone()[0]
+                    cursor.execute('SELECT COUNT(DISTINCT category) FROM quotes')
+                    categories = cursor.fetchone()[0]
+                    cursor.execute('SELECT COUNT(*) FROM quotes WHERE favorite = 1')
+                    favorite_count = cursor.fetchone()[0]
+
+                    out.heading("\nSTATISTICS:",
+                             f"  Total Quotes: {total}",
+                             f"  Known Authors: {authors}",
+                             f"  Unknown Authors: {unknown_authors}",
+                             f"  Categories: {categories}",
+                             f"  Favorites: {favorite_count}")
+
+                if favorites:
+                    out.heading(f"\nFAVORITE QUOTES ({total_count} total):", "-" * 75)
+                elif where:
+                    out.heading(f"\nMATCHING QUOTES ({total_count} quotes):", "-" * 75)
+                else:
+                    out.heading(f"\nQUOTES COLLECTION ({total_count} quotes):", "-" * 75)
+                cursor.execute(*self._select_sql(('id', 'quote_text', 'author', 'category', 'favorite'),
+                                                 '-id' if limit else 'id', limit, **filters))
+                return out.quotes(cursor)
+
     def add_remove_favorite(self, quote_id: int, action: str = "toggle"):
         """Add, remove, or toggle favorite status of a quote"""
-        with sqlite3.connect(self.db_name) as conn:
-            cursor = conn.cursor()
-            cursor.execute('SELECT favorite, quote_text FROM quotes WHERE id = ?', (quote_id,))
-            result = cursor.fetchone()
+        if action not in ("toggle", "add", "remove"):
+            print("[X] Invalid action!")
+            return
+        if self.read_only:
+            print(f"[X] {self.db_name} is open read-only; favorites cannot be changed")
+            time.sleep(2)
+            return
+
+        with self._connect() as conn:
+            result = self._set_favorite(conn.cursor(), quote_id, action)
             
             if result:
-                current_status = result[0]
-                quote_preview = result[1][:50] + "..." if len(result[1]) > 50 else result[1]
-                
-                if action == "toggle":
-                    new_status = 0 if current_status else 1
-                elif action == "add":
-                    new_status = 1
-                elif action == "remove":
-                    new_status = 0
-                else:
-                    print("[X] Invalid action!")
-                    return
-                
-                cursor.execute('UPDATE quotes SET favorite = ? WHERE id = ?', (new_status, quote_id))
+                current_status, new_status, text = result
+                quote_preview = text[:50] + "..." if len(text) > 50 else text
                 
                 if action == "add":
-                    if new_status == 1:
+                    if not current_status:
                         print(f"[OK] Quote #{quote_id} added to favorites!")
                         print(f'     "{quote_preview}"')
                     else:
                         print(f"[!] Quote #{quote_id} is already in favorites!")
                 elif action == "remove":
-                    if new_status == 0:
+                    if current_status:
                         print(f"[OK] Quote #{quote_id} removed from favorites!")
                         print(f'     "{quote_preview}"')
                     else:
@@ -241,56 +1408,47 @@ class QuotesManager:
                 print(f"[X] Quote #{quote_id} not found!")
                 time.sleep(2)
     
+    def set_favorite(self, quote_id: int, action: str = "toggle") -> Optional[Tuple[int, int, str]]:
+        """Add, remove or toggle a favorite without any output; returns (old, new, quote_text) or None if missing"""
+        if action not in ("toggle", "add", "remove"):
+            raise ValueError(f"Invalid action: {action}")
+        with self._connect() as conn:
+            return self._set_favorite(conn.cursor(), quote_id, action)
+
+    def _set_favorite(self, cursor, quote_id: int, action: str = "toggle") -> Optional[Tuple[int, int, str]]:
+        """Apply a favorite action on an open cursor; returns (old, new, quote_text) or None if missing"""
+        self._check_writable()
+        cursor.execute('SELECT favorite, quote_text FROM quotes WHERE id = ?', (quote_id,))
+        result = cursor.fetchone()
+        if not result:
+            return None
+
+        current_status = result[0]
+        if action == "toggle":
+            new_status = 0 if current_status else 1
+        else:
+            new_status = 1 if action == "add" else 0
+        if new_status != current_status:
+            cursor.execute(f'UPDATE {self.base_table} SET favorite = ? WHERE id = ?', (new_status, quote_id))
+        return current_status, new_status, result[1]
+
     def show_favorites(self):
         """Display only favorite quotes"""
-        with sqlite3.connect(self.db_name) as conn:
-            cursor = conn.cursor()
-            cursor.execute('SELECT id, quote_text, author, category FROM quotes WHERE favorite = 1 ORDER BY id')
-            quotes = cursor.fetchall()
-            
-            if not quotes:
-                print("\nNo favorite quotes yet! Mark some quotes as favorites.")
-                self.pause()
-                return
-            
-            print(f"\nFAVORITE QUOTES ({len(quotes)} total):")
-            print("-" * 75)
-            
-            for quote_id, text, author, category in quotes:
-                print(f"[*] #{quote_id} {text}")
-                print(f"      Author: {author}")
-                print(f"      Category: {category}")
-                print()
-            
-            self.pause()
+        if not self.render_quotes(favorites=True):
+            print("\nNo favorite quotes yet! Mark some quotes as favorites.")
+        self.pause()
     
     def get_random_quote(self, category: str = None):
         """Get a random quote, optionally filtered by category"""
-        with sqlite3.connect(self.db_name) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
-            
-            if category:
-                cursor.execute('''
-                    SELECT id, quote_text, author, category 
-                    FROM quotes 
-                    WHERE category = ? 
-                    ORDER BY RANDOM() 
-                    LIMIT 1
-                ''', (category,))
-            else:
-                cursor.execute('''
-                    SELECT id, quote_text, author, category 
-                    FROM quotes 
-                    ORDER BY RANDOM() 
-                    LIMIT 1
-                ''')
-            
-            quote = cursor.fetchone()
+            quote = self._fetch_random(cursor, category)
             
             if quote:
                 # Update view statistics
-                cursor.execute('UPDATE quotes SET times_viewed = times_viewed + 1, last_viewed = CURRENT_TIMESTAMP WHERE id = ?', (quote[0],))
-                conn.commit()
+                if not self.read_only:
+                    self._record_view(cursor, quote[0])
+                    conn.commit()
                 
                 print(f"RANDOM QUOTE #{quote[0]}:")
                 print("------------------------------------------------------------")
@@ -301,9 +1459,97 @@ class QuotesManager:
             
             self.pause()
     
+    def fetch_random_quote(self, category: str = None) -> Optional[Tuple]:
+        """Return a random (id, quote_text, author, category) and count the view (unless read-only)"""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            quote = self._fetch_random(cursor, category)
+            if quote and not self.read_only:
+                self._record_view(cursor, quote[0])
+                conn.commit()
+            return quote
+
+    def _fetch_random(self, cursor, category: str = None) -> Optional[Tuple]:
+        """Read a random quote on an open cursor"""
+        quote_id = self._pick_random_id(cursor, category)
+        cursor.execute('SELECT id, quote_text, author, category FROM quotes WHERE id = ?', (quote_id,))
+        return cursor.fetchone()
+
+    def _record_view(self, cursor, quote_id: int):
+        """Bump the view statistics of a quote on an open cursor.
+
+        The view event is queued and written with the others once
+        VIEW_BATCH_SIZE have piled up or the oldest is VIEW_FLUSH_SECONDS old,
+        as part of the caller's transaction.
+        """
+        cursor.execute(f'UPDATE {self.base_table} SET times_viewed = times_viewed + 1, last_viewed = CURRENT_TIMESTAMP WHERE id = ?', (quote_id,))
+        now = int(time.time())
+        with self._views_lock:
+            pending = self._pending_views
+            pending.append((quote_id, now))
+            if len(pending) < VIEW_BATCH_SIZE and now - pending[0][1] < VIEW_FLUSH_SECONDS:
+                return
+            self._pending_views = []
+        self._write_view_events(cursor, pending)
+
+    def _write_view_events(self, cursor, events: List[Tuple[int, int]]):
+        if not self._view_tables:
+            for ddl in VIEW_EVENTS_SCHEMA:
+                cursor.execute(ddl)
+            self._view_tables = True
+        cursor.executemany('INSERT INTO view_events (quote_id, viewed_at) VALUES (?, ?)', events)
+
+    def _flush_views(self, cursor):
+        """Write the queued view events on an open cursor"""
+        with self._views_lock:
+            pending, self._pending_views = self._pending_views, []
+        if pending:
+            self._write_view_events(cursor, pending)
+
+    def flush_views(self):
+        """Write the queued view events now"""
+        with self._connect() as conn:
+            self._flush_views(conn.cursor())
+
+    def _pick_random_id(self, cursor, category: str = None) -> Optional[int]:
+        """Pick a uniformly random quote id without sorting the whole table"""
+        import random
+        table = self.base_table
+        if category:
+            # Count and skip within the covering category index; no rows are read
+            match = ('category_id = (SELECT id FROM categories WHERE name = ?)' if self.normalized
+                     else 'category = ?')
+            cursor.execute(f'SELECT COUNT(*) FROM {table} WHERE {match}', (category,))
+            count = cursor.fetchone()[0]
+            if not count:
+                return None
+            cursor.execute(f'SELECT id FROM {table} WHERE {match} LIMIT 1 OFFSET ?',
+                           (category, random.randrange(count)))
+            return cursor.fetchone()[0]
+
+        # Two subqueries so both use the min/max optimization instead of a scan
+        cursor.execute(f'SELECT (SELECT MIN(id) FROM {table}), (SELECT MAX(id) FROM {table})')
+        low, high = cursor.fetchone()
+        if low is None:
+            return None
+        # Rejection sampling over the id range stays uniform despite gaps left by deletes
+        for _ in range(16):
+            quote_id = random.randint(low, high)
+            cursor.execute(f'SELECT 1 FROM {table} WHERE id = ?', (quote_id,))
+            if cursor.fetchone():
+                return quote_id
+        # Very sparse id range: fall back to skipping through an index
+        cursor.execute(f'SELECT COUNT(*) FROM {table}')
+        cursor.execute(f'SELECT id FROM {table} LIMIT 1 OFFSET ?', (random.randrange(cursor.fetchone()[0]),))
+        return cursor.fetchone()[0]
+
     def delete_quote(self, quote_id: int):
         """Delete a quote by ID with confirmation"""
-        with sqlite3.connect(self.db_name) as conn:
+        if self.read_only:
+            print(f"[X] {self.db_name} is open read-only; quotes cannot be deleted")
+            time.sleep(2)
+            return
+        with self._connect() as conn:
             cursor = conn.cursor()
             
             # First, show the quote to be deleted
@@ -317,8 +1563,9 @@ class QuotesManager:
                 
                 confirm = input("\nAre you sure? (y/N): ").lower()
                 if confirm == 'y':
-                    cursor.execute('DELETE FROM quotes WHERE id = ?', (quote_id,))
+                    self._delete(cursor, quote_id)
                     conn.commit()
+                    self._follow_writes()
                     print(f"[OK] Quote #{quote_id} deleted successfully!")
                 else:
                     print("[!] Deletion cancelled.")
@@ -326,98 +1573,629 @@ class QuotesManager:
                 print(f"[X] Quote #{quote_id} not found!")
             
             time.sleep(2)
+
+    def remove_quote(self, quote_id: int) -> bool:
+        """Delete a quote without confirmation or output; returns False if it did not exist"""
+        with self._connect() as conn:
+            removed = self._delete(conn.cursor(), quote_id)
+        if removed:
+            self._follow_writes()
+        return removed
+
+    def _delete(self, cursor, quote_id: int) -> bool:
+        """DELETE one quote on an open cursor; returns False if it did not exist"""
+        self._check_writable()
+        if self._completions is not None:
+            cursor.execute('SELECT author, category, tags FROM quotes WHERE id = ?', (quote_id,))
+            row = cursor.fetchone()
+            if row:
+                self._note_completions(*row, -1)
+        # Rows removed by a view's INSTEAD OF trigger are not counted, so use the base table
+        cursor.execute(f'DELETE FROM {self.base_table} WHERE id = ?', (quote_id,))
+        return cursor.rowcount > 0
     
-    def export_quotes(self, format: str = "json", filename: str = None):
-        """Export quotes to JSON or CSV file"""
-        with sqlite3.connect(self.db_name) as conn:
+    def _filter_clause(self, ids: Iterable[int] = None, id_range: Tuple[int, int] = None,
+                       search: str = None, search_in: str = "all", category: str = None,
+                       author: str = None, tag: str = None, favorite: bool = None,
+                       since: str = None, until: str = None, view: bool = False) -> Tuple[str, List]:
+        """Compile filter arguments into a WHERE clause (and its parameters) on the base table.
+
+        Conditions are combined with AND and written so SQLite can drive them
+        from an index: the primary key for ids, idx_category/idx_author for
+        names, idx_favorite for favorites, idx_date_added for `since`/`until`
+        (dates or timestamps of date_added; a date alone as `until` includes
+        that whole day). With view=True the clause is for `quotes` instead,
+        whose author and category columns hold names in either layout (used
+        on attached databases, see QuotesCollections).
+        """
+        import json
+        clauses, params = [], []
+        if ids is not None:
+            # One parameter however many ids, and still a primary key lookup per id
+            clauses.append('id IN (SELECT value FROM json_each(?))')
+            params.append(json.dumps([int(quote_id) for quote_id in ids]))
+        if id_range is not None:
+            clauses.append('id BETWEEN ? AND ?')
+            params.extend(id_range)
+        for column, value in (('category', category), ('author', author)):
+            if value is not None:
+                clauses.append(f'{column} = ?' if view else self._name_match(column, '='))
+                params.append(value)
+        if tag is not None:
+            clauses.append(f'instr({TAG_LIST}, ?) > 0')
+            params.append(f',{tag.strip()},')
+        if favorite is not None:
+            clauses.append('favorite = 1' if favorite else 'favorite IS NOT 1')
+        if since is not None:
+            clauses.append('date_added >= ?')
+            params.append(date_bound(since))
+        if until is not None:
+            if len(until.strip()) == 10:
+                # A date alone takes in that whole day
+                clauses.append('date_added < ?')
+                params.append(date_bound(until, next_day=True))
+            else:
+                clauses.append('date_added <= ?')
+                params.append(date_bound(until))
+        if search is not None:
+            fields = {'text': ['quote_text'], 'author': ['author'], 'category': ['category'],
+                      'all': ['quote_text', 'author', 'category', 'tags']}[search_in]
+            matches = []
+            for field in fields:
+                matches.append(self._name_match(field, 'LIKE') if field in NAME_TABLES and not view
+                               else f'{field} LIKE ?')
+                params.append(f'%{search}%')
+            clauses.append('(' + ' OR '.join(matches) + ')')
+        return ' AND '.join(clauses), params
+
+    def _name_match(self, column: str, operator: str) -> str:
+        """Condition comparing an author/category name with one parameter, on the base table"""
+        if self.normalized:
+            lookup = f'(SELECT id FROM {NAME_TABLES[column]} WHERE name {operator} ?)'
+            return f'{column}_id = {lookup}' if operator == '=' else f'{column}_id IN {lookup}'
+        return f'{column} {operator} ?'
+
+    def _select_sql(self, columns: Iterable[str] = None, order_by: str = None, limit: int = None,
+                    **filters) -> Tuple[str, List]:
+        """SELECT of `columns` (default: all) for the quotes matching the filters (see _filter_clause).
+
+        `order_by` is a comma-separated list of columns, each optionally
+        prefixed with '-' for descending order; id breaks ties. On the
+        normalized layout the filters run on quote_rows and only the matching
+        ids are read through the view.
+        """
+        columns = list(columns or QUOTE_COLUMNS)
+        terms = [term.strip() for term in (order_by or 'id').split(',')]
+        for column in columns + [term.lstrip('-') for term in terms]:
+            if column not in QUOTE_COLUMNS:
+                raise ValueError(f"Unknown column: {column} (choose from {', '.join(QUOTE_COLUMNS)})")
+        order = [f'{term[1:]} DESC' if term.startswith('-') else term for term in terms]
+        if not any(term.lstrip('-') == 'id' for term in terms):
+            order.append('id')
+        where, params = self._filter_clause(**filters)
+        if where and self.normalized:
+            where = f'id IN (SELECT id FROM quote_rows WHERE {where})'
+        sql = f'SELECT {", ".join(columns)} FROM quotes'
+        if where:
+            sql += f' WHERE {where}'
+        sql += f' ORDER BY {", ".join(order)}'
+        if limit:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        return sql, params
+
+    def _bulk_change(self, action: str, value: str) -> Tuple[Optional[str], str, List, List]:
+        """SET clause (None for delete) and the condition selecting rows the action would
+        change, each with its parameters"""
+        if action == 'favorite':
+            return 'favorite = 1', 'favorite IS NOT 1', [], []
+        if action == 'unfavorite':
+            return 'favorite = 0', 'favorite = 1', [], []
+        if action in ('set_category', 'set_author'):
+            column = action[len('set_'):]
+            if self.normalized:
+                lookup = f'(SELECT id FROM {NAME_TABLES[column]} WHERE name = ?)'
+                return f'{column}_id = {lookup}', f'{column}_id IS NOT {lookup}', [value], [value]
+            return f'{column} = ?', f'{column} IS NOT ?', [value], [value]
+        if action == 'add_tag':
+            return ("tags = CASE WHEN COALESCE(tags, '') = '' THEN ? ELSE tags || ',' || ? END",
+                    f'instr({TAG_LIST}, ?) = 0', [value, value], [f',{value},'])
+        if action == 'remove_tag':
+            return (f"tags = TRIM(REPLACE({TAG_LIST}, ?, ','), ',')",
+                    f'instr({TAG_LIST}, ?) > 0', [f',{value},'], [f',{value},'])
+        return None, '', [], []
+
+    def _bulk_result(self, action: str, value: str) -> Tuple[str, str, List]:
+        """Column of the quotes view an update action sets, and its value right after the
+        action as an expression over the journaled row `u`, with its parameters"""
+        if action in ('set_category', 'set_author'):
+            return action[len('set_'):], '?', [value]
+        assignment, _, params, _ = self._bulk_change(action, value)
+        column, expression = assignment.split(' = ', 1)
+        return column, f'(SELECT {expression} FROM (SELECT u.{column} AS {column}))', params
+
+    def bulk_update(self, action: str, value: str = None, dry_run: bool = False, **filters) -> int:
+        """Apply one action to every quote matching the filters (see _filter_clause).
+
+        Runs as a single UPDATE or DELETE in one transaction and touches only
+        the rows the action actually changes. Their previous state goes to the
+        undo journal first (see undo_bulk). With dry_run=True nothing is
+        written. Returns the number of quotes changed (or that would be).
+        """
+        import json
+        if action not in BULK_ACTIONS:
+            raise ValueError(f"Unknown bulk action: {action}")
+        if action in ('set_category', 'set_author', 'add_tag', 'remove_tag'):
+            value = (value or '').strip()
+            if not value:
+                raise ValueError(f"{action} needs a value")
+        where, params = self._filter_clause(**filters)
+        if not where:
+            raise ValueError("Bulk operations need at least one filter")
+        assignment, condition, set_params, condition_params = self._bulk_change(action, value)
+        if condition:
+            where, params = f'{where} AND {condition}', params + condition_params
+        table = self.base_table
+
+        conn = self._connect()
+        cursor = conn.cursor()
+        if dry_run:
+            cursor.execute(f'SELECT COUNT(*) FROM {table} WHERE {where}', params)
+            return cursor.fetchone()[0]
+
+        self._check_writable()
+        cursor.execute('BEGIN IMMEDIATE')
+        try:
+            for ddl in BULK_JOURNAL_SCHEMA:
+                cursor.execute(ddl)
+            cursor.execute('INSERT INTO bulk_operations (action, value, filter) VALUES (?, ?, ?)',
+                           (action, value, json.dumps(filters, default=list)))
+            operation_id = cursor.lastrowid
+            if self.normalized and action in ('set_category', 'set_author'):
+                cursor.execute(f'INSERT OR IGNORE INTO {NAME_TABLES[action[len("set_"):]]} (name) VALUES (?)',
+                               (value,))
+            # Journal the rows as they are now, read through the quotes view when normalized
+            columns = ', '.join(QUOTE_COLUMNS)
+            cursor.execute(f'''
+                INSERT INTO bulk_undo (operation_id, {columns})
+                SELECT ?, {columns} FROM quotes WHERE id IN (SELECT id FROM {table} WHERE {where})
+            ''', [operation_id] + params)
+            if assignment is None:
+                cursor.execute(f'DELETE FROM {table} WHERE {where}', params)
+            else:
+                cursor.execute(f'UPDATE {table} SET {assignment} WHERE {where}', set_params + params)
+            affected = cursor.rowcount
+            if affected:
+                cursor.execute('UPDATE bulk_operations SET affected = ? WHERE id = ?', (affected, operation_id))
+            else:
+                # Nothing changed, so there is nothing to undo either
+                cursor.execute('DELETE FROM bulk_operations WHERE id = ?', (operation_id,))
+            cursor.execute('COMMIT')
+        except Exception:
+            cursor.execute('ROLLBACK')
+            raise
+        self._completions = None
+        return affected
+
+    def list_bulk_operations(self, limit: int = 10) -> List[Tuple]:
+        """(id, action, value, filter, affected, created_at, undone_at) of recent bulk operations"""
+        with self._connect() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT * FROM quotes ORDER BY id')
-            quotes = cursor.fetchall()
-            
-            if not quotes:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'bulk_operations'")
+            if not cursor.fetchone():
+                return []
+            cursor.execute('SELECT * FROM bulk_operations ORDER BY id DESC LIMIT ?', (limit,))
+            return cursor.fetchall()
+
+    def undo_bulk(self, operation_id: int = None) -> int:
+        """Restore the quotes changed by a bulk operation (default: the latest not yet undone).
+
+        An update is undone only in the column it set, and only on quotes still
+        holding the value it left there, so later edits are kept. Returns the
+        number of quotes restored, or 0 if there was nothing to undo.
+        """
+        self._check_writable()
+        if not self.list_bulk_operations(1):
+            return 0
+        conn = self._connect()
+        cursor = conn.cursor()
+        if operation_id is None:
+            cursor.execute('SELECT id, action, value FROM bulk_operations WHERE undone_at IS NULL '
+                           'ORDER BY id DESC LIMIT 1')
+        else:
+            cursor.execute('SELECT id, action, value FROM bulk_operations WHERE undone_at IS NULL AND id = ?',
+                           (operation_id,))
+        operation = cursor.fetchone()
+        if operation is None:
+            return 0
+        operation_id, action, value = operation
+        columns = ', '.join(QUOTE_COLUMNS)
+
+        cursor.execute('BEGIN IMMEDIATE')
+        try:
+            if action == 'delete':
+                # Writes through the quotes view are not counted by rowcount, so count first
+                # the quotes whose id and text are both still free
+                cursor.execute(f'''
+                    SELECT COUNT(*) FROM bulk_undo u WHERE u.operation_id = ?
+                    AND NOT EXISTS (SELECT 1 FROM {self.base_table} q WHERE q.id = u.id)
+                    AND NOT EXISTS (SELECT 1 FROM {self.base_table} q WHERE q.quote_text = u.quote_text)
+                ''', (operation_id,))
+                restored = cursor.fetchone()[0]
+                # OR IGNORE: a quote added again since then keeps its new row
+                cursor.execute(f'''
+                    INSERT OR IGNORE INTO quotes ({columns})
+                    SELECT {columns} FROM bulk_undo WHERE operation_id = ?
+                ''', (operation_id,))
+            else:
+                column, result, params = self._bulk_result(action, value)
+                # Quotes a later edit changed again (or deleted) keep that edit
+                unchanged = f'''
+                    SELECT u.id FROM bulk_undo u JOIN quotes q ON q.id = u.id
+                    WHERE u.operation_id = ? AND q.{column} IS {result}
+                '''
+                cursor.execute(f'SELECT COUNT(*) FROM ({unchanged})', [operation_id] + params)
+                restored = cursor.fetchone()[0]
+                cursor.execute(f'''
+                    UPDATE quotes SET {column} = (
+                        SELECT u.{column} FROM bulk_undo u WHERE u.operation_id = ? AND u.id = quotes.id)
+                    WHERE id IN ({unchanged})
+                ''', [operation_id, operation_id] + params)
+            cursor.execute('UPDATE bulk_operations SET undone_at = CURRENT_TIMESTAMP WHERE id = ?', (operation_id,))
+            cursor.execute('COMMIT')
+        except Exception:
+            cursor.execute('ROLLBACK')
+            raise
+        self._completions = None
+        return restored
+
+    def export_quotes(self, format: str = "json", filename: str = None, **options):
+        """Export quotes to a JSON, CSV or columnar (qcol) file (options: see write_export)"""
+        if not filename:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"quotes_export_{timestamp}.{format}"
+
+        try:
+            count = self.write_export(format, filename, **options)
+            if count:
+                print(f"[OK] Exported {count} quotes to {filename}")
+            else:
                 print("[X] No quotes to export!")
-                self.pause()
-                return
-            
-            # Get column names
+            self.pause()
+        except Exception as e:
+            print(f"[X] Export failed: {e}")
+            self.pause()
+
+    def write_export(self, format: str, filename: str, codec: str = "zlib", columns: Iterable[str] = None,
+                     order_by: str = None, **filters) -> int:
+        """Write the quotes matching the filters (default: all; see _filter_clause) to `filename`
+        and return how many were written; nothing is written when none match.
+
+        `columns` and `order_by` are passed to _select_sql, so the selection,
+        projection and order all run in SQLite and rows are streamed to the
+        file a chunk at a time. `codec` ('zlib', 'lzma' or 'none') only
+        applies to the columnar 'qcol' format.
+        """
+        import csv
+        import json
+        from itertools import chain, islice
+        if format not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {format}")
+        sql, params = self._select_sql(columns, order_by, **filters)
+        # However long the export takes, it holds the quotes as they were when it started
+        with self.snapshot() as cursor:
+            cursor.execute(sql, params)
             columns = [description[0] for description in cursor.description]
-            
-            if not filename:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = f"quotes_export_{timestamp}.{format}"
-            
-            try:
-                if format == "json":
-                    data = []
-                    for quote in quotes:
-                        data.append(dict(zip(columns, quote)))
-                    
-                    with open(filename, 'w', encoding='utf-8') as f:
-                        json.dump(data, f, indent=2, ensure_ascii=False, default=str)
-                
-                elif format == "csv":
-                    with open(filename, 'w', newline='', encoding='utf-8') as f:
-                        writer = csv.writer(f)
-                        writer.writerow(columns)
-                        writer.writerows(quotes)
-                
-                print(f"[OK] Exported {len(quotes)} quotes to {filename}")
-                self.pause()
-            except Exception as e:
-                print(f"[X] Export failed: {e}")
-                self.pause()
-    
+            first = cursor.fetchone()
+            if first is None:
+                return 0
+            rows = chain((first,), cursor)
+
+            if format == "qcol":
+                from QuotesColumnar import write_columnar
+                with open(filename, 'wb') as f:
+                    return write_columnar(f, columns, rows, codec)
+
+            count = 0
+            if format == "json":
+                # Object by object, laid out as json.dump(..., indent=2) lays out the whole list.
+                # Values are scalars, so each goes through the C encoder, which indent would rule out.
+                encode = json.JSONEncoder(ensure_ascii=False, default=str).encode
+                keys = [f'    {json.dumps(column, ensure_ascii=False)}: ' for column in columns]
+                with open(filename, 'w', encoding='utf-8') as f:
+                    separator = '[\n'
+                    for row in rows:
+                        fields = ',\n'.join([key + encode(value) for key, value in zip(keys, row)])
+                        f.write(f'{separator}  {{\n{fields}\n  }}')
+                        separator = ',\n'
+                        count += 1
+                    f.write('\n]')
+            else:
+                with open(filename, 'w', newline='', encoding='utf-8') as f:
+                    writer = csv.writer(f)
+                    writer.writerow(columns)
+                    for chunk in iter(lambda: list(islice(rows, EXPORT_CHUNK_ROWS)), []):
+                        writer.writerows(chunk)
+                        count += len(chunk)
+            return count
+
     def import_quotes(self, filename: str):
-        """Import quotes from JSON or CSV file"""
+        """Import quotes from JSON, CSV, qcol or change feed (.ndjson) files"""
         if not os.path.exists(filename):
             print(f"[X] File {filename} not found!")
             self.pause()
             return
         
-        imported = 0
-        skipped = 0
-        
         try:
-            if filename.endswith('.json'):
-                with open(filename, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                for item in data:
-                    result = self.add_quote(
-                        item.get('quote_text', ''),
-                        item.get('author', 'Unknown'),
-                        item.get('category', 'General'),
-                        item.get('tags', ''),
-                        item.get('source', ''),
-                        item.get('year')
-                    )
-                    if result:
-                        imported += 1
-                    else:
-                        skipped += 1
-            
-            elif filename.endswith('.csv'):
+            self._check_writable()
+            if filename.endswith('.ndjson'):
                 with open(filename, 'r', encoding='utf-8') as f:
-                    reader = csv.DictReader(f)
-                    for row in reader:
-                        result = self.add_quote(
-                            row.get('quote_text', ''),
-                            row.get('author', 'Unknown'),
-                            row.get('category', 'General'),
-                            row.get('tags', ''),
-                            int(row.get('year')) if row.get('year') else None
-                        )
-                        if result:
-                            imported += 1
-                        else:
-                            skipped += 1
-            
-            print(f"[OK] Import complete: {imported} added, {skipped} skipped (duplicates)")
+                    applied, watermark = self.apply_changes(f)
+                print(f"[OK] Applied {applied} changes (replica now at watermark {watermark})")
+                self.pause()
+                return
+
+            report = self.import_file(filename)
+            self.print_import_report(report)
             self.pause()
-        except Exception as e:
+        except (OSError, ValueError, sqlite3.Error) as e:
+            # Problems with the file as a whole; bad records never get here
             print(f"[X] Import failed: {e}")
             self.pause()
-    
+
+    def import_file(self, filename: str, quarantine: str = None, restart: bool = False,
+                    checkpoint_batches: int = IMPORT_CHECKPOINT_BATCHES) -> Dict:
+        """Run a JSON, CSV or qcol file through the QuotesImport pipeline into the database.
+
+        Rejected records go to `quarantine` (default: <filename>.rejected.ndjson,
+        created only when needed). The run is journaled in import_jobs under
+        the file's SHA-256 and commits every `checkpoint_batches` batches
+        together with the position reached. Importing the same file again
+        resumes an interrupted run from its last checkpoint, or does nothing
+        if it already finished; restart=True starts over either way.
+
+        Returns the pipeline report plus 'added', 'duplicates' (already
+        stored), 'seconds', 'job', 'resumed_from' (record number) and
+        'already_imported'.
+        """
+        from itertools import islice
+        from QuotesImport import ImportPipeline, file_digest
+        self._check_writable()
+        quarantine = quarantine or filename + '.rejected.ndjson'
+        start = time.perf_counter()
+        file_hash = file_digest(filename)
+
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('BEGIN IMMEDIATE')
+        try:
+            for ddl in IMPORT_JOURNAL_SCHEMA:
+                cursor.execute(ddl)
+            if restart:
+                cursor.execute("UPDATE import_jobs SET status = 'abandoned' WHERE file_hash = ? AND status = 'running'",
+                               (file_hash,))
+            cursor.execute('''
+                SELECT id, status, record, byte_offset, quarantine_size, rejected, updated_at FROM import_jobs
+                WHERE file_hash = ? AND status IN ('running', 'done') ORDER BY id DESC LIMIT 1
+            ''', (file_hash,))
+            job = cursor.fetchone()
+            if job and job[1] == 'done' and restart:
+                job = None
+            if job is None:
+                cursor.execute('INSERT INTO import_jobs (source, file_hash, file_size) VALUES (?, ?, ?)',
+                               (os.path.abspath(filename), file_hash, os.path.getsize(filename)))
+                job = (cursor.lastrowid, 'running', 0, None, 0, 0, None)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        job_id, status, record, offset, quarantine_size, rejected_before, finished_at = job
+
+        if status == 'done':
+            return {'read': 0, 'passed': 0, 'rejected': {}, 'timings': {}, 'quarantine': None,
+                    'added': 0, 'duplicates': 0, 'seconds': time.perf_counter() - start,
+                    'source': filename, 'job': job_id, 'resumed_from': record,
+                    'already_imported': True, 'finished_at': finished_at}
+
+        resuming = record > 0
+        if resuming and os.path.exists(quarantine):
+            # Records rejected after the checkpoint are rejected again below
+            os.truncate(quarantine, quarantine_size)
+        pipeline = ImportPipeline(quarantine, append=resuming)
+        rows = pipeline.rows(filename, (record, offset))
+        segment = IMPORT_BATCH_SIZE * checkpoint_batches
+        added = duplicates = 0
+
+        def checkpoint(cursor, segment_added, segment_duplicates):
+            record, offset = pipeline.position
+            cursor.execute('''
+                UPDATE import_jobs SET record = ?, byte_offset = ?, quarantine_size = ?, added = added + ?,
+                       duplicates = duplicates + ?, rejected = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            ''', (record, offset, pipeline.quarantine_size(), segment_added, segment_duplicates,
+                  rejected_before + sum(pipeline.rejected.values()), job_id))
+
+        try:
+            while True:
+                segment_added, segment_duplicates = self.add_quotes_batch(islice(rows, segment),
+                                                                          checkpoint=checkpoint)
+                added += segment_added
+                duplicates += segment_duplicates
+                if segment_added + segment_duplicates < segment:
+                    break
+        finally:
+            pipeline.close()
+        cursor.execute("UPDATE import_jobs SET status = 'done', updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                       (job_id,))
+        conn.commit()
+
+        elapsed = time.perf_counter() - start
+        report = pipeline.report()
+        report['timings']['write'] = max(elapsed - sum(report['timings'].values()), 0.0)
+        report.update(added=added, duplicates=duplicates, seconds=elapsed, source=filename,
+                      job=job_id, resumed_from=record, already_imported=False)
+        return report
+
+    @staticmethod
+    def print_import_report(report: Dict):
+        """Print the summary and stage timings of an import_file report"""
+        if report['already_imported']:
+            print(f"[!] {report['source']} was already imported (job #{report['job']}, "
+                  f"finished {report['finished_at']}); use --restart to import it again")
+            return
+        if report['resumed_from']:
+            print(f"[OK] Resumed import job #{report['job']} after record {report['resumed_from']}")
+        rejected = sum(report['rejected'].values())
+        print(f"[OK] Import complete: {report['added']} added, {report['duplicates']} skipped (duplicates), "
+              f"{rejected} rejected")
+        if report['quarantine']:
+            reasons = ', '.join(f"{count} at {stage}" for stage, count in report['rejected'].items())
+            print(f"[!] Rejected records ({reasons}) were written to {report['quarantine']}")
+        seconds = report['seconds']
+        print(f"    {report['read']} records in {seconds:.2f} s ({report['read'] / seconds if seconds else 0:,.0f} records/s)")
+        print("    " + ", ".join(f"{stage} {elapsed * 1000:.0f} ms" for stage, elapsed in report['timings'].items()))
+
+    def list_import_jobs(self, limit: int = 10) -> List[Tuple]:
+        """(id, source, status, record, added, duplicates, rejected, started_at, updated_at) of recent imports"""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'import_jobs'")
+            if not cursor.fetchone():
+                return []
+            cursor.execute('''
+                SELECT id, source, status, record, added, duplicates, rejected, started_at, updated_at
+                FROM import_jobs ORDER BY id DESC LIMIT ?
+            ''', (limit,))
+            return cursor.fetchall()
+
+    def read_import_rows(self, filename: str) -> Iterator[Tuple]:
+        """Yield the valid (quote_text, author, category, tags, source, year) rows of a JSON,
+        CSV or qcol export, normalized and deduplicated (see QuotesImport)"""
+        from QuotesImport import ImportPipeline
+        return ImportPipeline().rows(filename)
+
+    def get_changes(self, since: int = 0) -> Iterator[Dict]:
+        """Yield the net change of every quote modified after the `since` watermark.
+
+        Several changes to one quote collapse into a single record carrying the
+        latest sequence number, so a replica only replays the final state.
+        """
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            columns = ', '.join(f'q.{column}' for column in QUOTE_COLUMNS)
+            cursor.execute(f'''
+                SELECT c.seq, c.op, c.quote_id, {columns}
+                FROM (
+                    SELECT quote_id, MAX(seq) AS seq
+                    FROM quote_changes NOT INDEXED  -- range on seq, not a scan of idx_changes_quote
+                    WHERE seq > ?
+                    GROUP BY quote_id
+                ) AS latest
+                JOIN quote_changes c ON c.seq = latest.seq
+                LEFT JOIN quotes q ON q.id = c.quote_id
+                ORDER BY c.seq
+            ''', (since,))
+
+            for row in cursor:
+                seq, op, quote_id = row[:3]
+                if op == 'D' or row[3] is None:
+                    yield {'seq': seq, 'op': 'delete', 'id': quote_id}
+                else:
+                    yield {'seq': seq, 'op': 'upsert', 'quote': dict(zip(QUOTE_COLUMNS, row[3:]))}
+
+    def get_change_watermark(self) -> int:
+        """Return the sequence number of the latest logged change"""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT COALESCE(MAX(seq), 0) FROM quote_changes')
+            return cursor.fetchone()[0]
+
+    def export_changes(self, since: int = 0, filename: str = None) -> int:
+        """Write changes after `since` as NDJSON and return the new watermark.
+
+        A filename of '-' streams to stdout so the feed can be piped straight
+        into `apply-changes` on a replica.
+        """
+        import json
+        watermark = since
+        written = 0
+        if not filename:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"quotes_changes_{since}_{timestamp}.ndjson"
+
+        out = sys.stdout if filename == '-' else open(filename, 'w', encoding='utf-8')
+        try:
+            for change in self.get_changes(since):
+                out.write(json.dumps(change, ensure_ascii=False, default=str))
+                out.write('\n')
+                watermark = change['seq']
+                written += 1
+        finally:
+            if out is not sys.stdout:
+                out.close()
+
+        # Keep stdout clean for the NDJSON stream
+        status = sys.stderr if filename == '-' else sys.stdout
+        print(f"[OK] Exported {written} changes (watermark {since} -> {watermark}) to {filename}", file=status)
+        return watermark
+
+    def apply_changes(self, lines: Iterable[str]) -> Tuple[int, int]:
+        """Apply an NDJSON change feed in one transaction.
+
+        Upserts are keyed by id and deletes ignore missing rows, so replaying
+        the same feed (or an overlapping one) leaves the database unchanged.
+        Returns (number of changes applied, highest sequence number seen).
+        """
+        import json
+        self._check_writable()
+        placeholders = ', '.join('?' for _ in QUOTE_COLUMNS)
+        updates = ', '.join(f'{column} = ?' for column in QUOTE_COLUMNS[1:])
+        applied = 0
+        watermark = 0
+
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            for line in lines:
+                line = line.strip()
+                if not line:
+                    continue
+                change = json.loads(line)
+                if change['op'] == 'delete':
+                    cursor.execute('DELETE FROM quotes WHERE id = ?', (change['id'],))
+                elif change['op'] == 'upsert':
+                    quote = change['quote']
+                    values = tuple(quote.get(column) for column in QUOTE_COLUMNS)
+                    # The same text may live under another id on this replica
+                    cursor.execute('DELETE FROM quotes WHERE quote_text = ? AND id != ?',
+                                   (quote['quote_text'], quote['id']))
+                    # Plain UPDATE-or-INSERT rather than an UPSERT, which views do not support
+                    cursor.execute('SELECT 1 FROM quotes WHERE id = ?', (quote['id'],))
+                    if cursor.fetchone():
+                        cursor.execute(f'UPDATE quotes SET {updates} WHERE id = ?', values[1:] + values[:1])
+                    else:
+                        cursor.execute(f'INSERT INTO quotes ({", ".join(QUOTE_COLUMNS)}) VALUES ({placeholders})',
+                                       values)
+                else:
+                    raise ValueError(f"Unknown change operation: {change['op']!r}")
+                applied += 1
+                watermark = max(watermark, change['seq'])
+            conn.commit()
+
+        self._completions = None
+        return applied, watermark
+
+    def prune_changes(self) -> int:
+        """Drop change log entries superseded by a later change to the same quote"""
+        self._check_writable()
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                DELETE FROM quote_changes
+                WHERE seq NOT IN (SELECT MAX(seq) FROM quote_changes GROUP BY quote_id)
+            ''')
+            conn.commit()
+            return cursor.rowcount
+
     def backup_database(self, backup_name: str = None):
         """Create a backup of the database"""
         try:
@@ -425,7 +2203,10 @@ class QuotesManager:
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                 backup_name = f"quotes_backup_{timestamp}.db"
             
-            shutil.copy2(self.db_name, backup_name)
+            # The backup API rather than a file copy: committed pages may still be in the WAL
+            with sqlite3.connect(backup_name) as target:
+                self._connect().backup(target)
+            target.close()
             print(f"[OK] Database backed up to: {backup_name}")
             self.pause()
         except Exception as e:
@@ -434,152 +2215,945 @@ class QuotesManager:
     
     def get_statistics(self):
         """Display detailed statistics about the quotes database"""
-        with sqlite3.connect(self.db_name) as conn:
-            cursor = conn.cursor()
-            
-            # Basic stats
-            cursor.execute('SELECT COUNT(*) FROM quotes')
-            total = cursor.fetchone()[0]
-            
-            if total == 0:
-                print("No quotes in database yet!")
-                self.pause()
-                return
-            
-            cursor.execute('SELECT COUNT(DISTINCT author) FROM quotes WHERE author != "Unknown"')
-            known_authors_count = cursor.fetchone()[0]
-            
-            cursor.execute('SELECT COUNT(*) FROM quotes WHERE author = "Unknown"')
-            unknown_authors = cursor.fetchone()[0]
-            
-            cursor.execute('SELECT COUNT(DISTINCT category) FROM quotes')
-            categories_count = cursor.fetchone()[0]
-            
-            cursor.execute('SELECT COUNT(*) FROM quotes WHERE favorite = 1')
-            favorites = cursor.fetchone()[0]
-            
-            # Most viewed quote
-            cursor.execute('SELECT id, quote_text, author, times_viewed FROM quotes ORDER BY times_viewed DESC LIMIT 1')
-            most_viewed = cursor.fetchone()
-            
-            # All authors with counts (including Unknown)
-            cursor.execute('''
-                SELECT author, COUNT(*) as count 
-                FROM quotes 
-                GROUP BY author 
-                ORDER BY count DESC, author
-            ''')
-            all_authors = cursor.fetchall()
-            
-            # All categories with counts
-            cursor.execute('''
-                SELECT category, COUNT(*) as count 
-                FROM quotes 
-                GROUP BY category 
-                ORDER BY count DESC, category
-            ''')
-            all_categories = cursor.fetchall()
-            
-            print("\n" + "=" * 70)
-            print("QUOTES DATABASE STATISTICS")
-            print("=" * 70)
-            print(f"Total Quotes: {total}")
-            print(f"Total Authors: {known_authors_count + (1 if unknown_authors > 0 else 0)}")
-            print(f"  Known Authors: {known_authors_count}")
-            print(f"  Unknown Author Quotes: {unknown_authors}")
-            print(f"Categories: {categories_count}")
-            print(f"Favorites: {favorites} ({favorites*100//total if total else 0}%)")
+        self.print_statistics()
+        self.pause()
+
+    def print_statistics(self, approximate: bool = None):
+        """Print the statistics; approximate=None picks the sketch-based figures
+        from APPROX_STATS_ROWS quotes up. Every figure comes from one snapshot."""
+        if not self.read_only:
+            self.rollup_views()
+        with self.snapshot() as cursor:
+            if approximate is None:
+                cursor.execute(f'SELECT MAX(id) FROM {self.base_table}')
+                approximate = (cursor.fetchone()[0] or 0) >= APPROX_STATS_ROWS
+            engagement = self._query_engagement(cursor)
+            stats = self.approximate_statistics() if approximate else self._query_statistics(cursor)
+        if approximate:
+            self._print_approximate(stats)
+            if engagement is not None:
+                with self.renderer() as out:
+                    self._print_engagement(out, engagement)
+                    out.text("=" * 70)
+            return
+        total = stats['total']
+        
+        if total == 0:
+            print("No quotes in database yet!")
+            return
+        
+        known_authors_count = stats['known_authors']
+        unknown_authors = stats['unknown_authors']
+        favorites = stats['favorites']
+        most_viewed = stats['most_viewed']
+        
+        if engagement is not None:
+            stats['engagement'] = engagement
+        with self.renderer() as out:
+            out.record(stats)
+            out.text("\n" + "=" * 70,
+                     "QUOTES DATABASE STATISTICS",
+                     "=" * 70,
+                     f"Total Quotes: {total}",
+                     f"Total Authors: {known_authors_count + (1 if unknown_authors > 0 else 0)}",
+                     f"  Known Authors: {known_authors_count}",
+                     f"  Unknown Author Quotes: {unknown_authors}",
+                     f"Categories: {stats['categories']}",
+                     f"Favorites: {favorites} ({favorites*100//total if total else 0}%)")
             
             if most_viewed and most_viewed[3] > 0:
-                print(f"\nMost Viewed Quote (viewed {most_viewed[3]} times):")
-                print(f'  #{most_viewed[0]}: "{most_viewed[1][:50]}{"..." if len(most_viewed[1]) > 50 else ""}"')
-                print(f"  - {most_viewed[2]}")
+                out.text(f"\nMost Viewed Quote (viewed {most_viewed[3]} times):",
+                         f'  #{most_viewed[0]}: "{most_viewed[1][:50]}{"..." if len(most_viewed[1]) > 50 else ""}"',
+                         f"  - {most_viewed[2]}")
             
-            print("\n" + "-" * 70)
-            print("ALL AUTHORS:")
-            print("-" * 70)
-            for author, count in all_authors:
-                print(f"  {author}: {count} quotes")
+            out.text("\n" + "-" * 70, "ALL AUTHORS:", "-" * 70)
+            out.text(*(f"  {author}: {count} quotes" for author, count in stats['all_authors']))
             
+            out.text("\n" + "-" * 70, "ALL CATEGORIES:", "-" * 70)
+            out.text(*(f"  {category}: {count} quotes" for category, count in stats['all_categories']))
+
+            if engagement is not None:
+                self._print_engagement(out, engagement)
+            out.text("=" * 70)
+
+    @property
+    def sketch_file(self) -> str:
+        """Where the approximate-statistics sketches of this database are kept"""
+        return self.db_name + '.sketch'
+
+    def refresh_sketches(self, rebuild: bool = False, save: bool = True):
+        """Bring the sketches up to date with the quotes added since they were saved.
+
+        New quotes (ids above the last one counted) are added one by one.
+        Renames (a changed author, category or tags) and deletes cannot be taken
+        back out of a sketch, so they only count as drift; other edits do not
+        touch what the sketches count. Past APPROX_DRIFT_RATIO of the collection,
+        or when the table was rebuilt, the sketches are rebuilt from GROUP BY
+        queries. The file is rewritten if `save` and the database is not open
+        read-only.
+        """
+        from QuotesSketches import QuoteSketches
+        sketches = self._sketches
+        if sketches is None and not rebuild and os.path.exists(self.sketch_file):
+            try:
+                sketches = QuoteSketches.load(self.sketch_file)
+            except (OSError, ValueError):
+                sketches = None
+
+        cursor = self._connect().cursor()
+        cursor.execute(f"SELECT COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'quote_changes'), 0), "
+                       f"(SELECT COALESCE(MAX(id), 0) FROM {self.base_table})")
+        change_seq, max_id = cursor.fetchone()
+        if sketches is not None and (change_seq < sketches.change_seq or max_id < sketches.max_id):
+            sketches = None  # the database was replaced or rebuilt
+        if sketches is not None and change_seq == sketches.change_seq:
+            self._sketches = sketches
+            return sketches
+
+        if sketches is not None:
+            # Renames and deletes of quotes the sketches have already counted
+            cursor.execute('''
+                SELECT op, COUNT(*) FROM quote_changes
+                WHERE seq > ? AND quote_id <= ? AND op IN ('N', 'D') GROUP BY op
+            ''', (sketches.change_seq, sketches.max_id))
+            for op, count in cursor.fetchall():
+                sketches.drift += count
+                if op == 'D':
+                    sketches.total -= count
+            if sketches.drift > max(APPROX_DRIFT_MIN, sketches.total * APPROX_DRIFT_RATIO):
+                sketches = None
+
+        if sketches is None:
+            sketches = QuoteSketches()
+            authors, categories, tags = self._name_counts(cursor)
+            sketches.add_counts('author', authors)
+            sketches.add_counts('category', categories)
+            sketches.add_counts('tag', tags.items())
+            sketches.total = sum(count for _, count in authors)
+        else:
+            split_tags = self._split_tags
+            cursor.execute('SELECT author, category, tags FROM quotes WHERE id > ? ORDER BY id', (sketches.max_id,))
+            for author, category, tags in cursor:
+                sketches.add_quote(author, category, set(split_tags(tags)))
+        sketches.max_id, sketches.change_seq = max_id, change_seq
+        if save and not self.read_only:
+            sketches.save(self.sketch_file)
+        self._sketches = sketches
+        return sketches
+
+    def approximate_statistics(self, k: int = 10) -> Dict:
+        """Sketch-based figures with their error bounds, in the same time at any table size.
+
+        distinct counts are HyperLogLog estimates (error given as two standard
+        errors, about 95% confidence); top authors/categories are count-min
+        estimates that overcount by at most `overcount` with the stated
+        confidence. `drift` is the number of renames (author, category or
+        tags) and deletes since the sketches were built, which they do not reflect.
+        """
+        sketches = self.refresh_sketches()
+        stats = {'total': sketches.total, 'drift': sketches.drift, 'distinct': {}, 'top': {}}
+        for field, hll in sketches.distinct.items():
+            estimate = hll.count()
+            stats['distinct'][field] = (estimate, math.ceil(2 * hll.relative_error * estimate))
+        for field, heavy in sketches.heavy.items():
+            stats['top'][field] = {'counts': heavy.top(k), 'overcount': heavy.error_bound,
+                                   'confidence': 1 - heavy.failure_probability}
+        return stats
+
+    def show_approximate_statistics(self, k: int = 10):
+        """Print approximate_statistics"""
+        self._print_approximate(self.approximate_statistics(k))
+
+    @staticmethod
+    def _print_approximate(stats: Dict):
+        print("\n" + "=" * 70)
+        print("QUOTES DATABASE STATISTICS (approximate)")
+        print("=" * 70)
+        print(f"Total Quotes: {stats['total']}")
+        if stats['drift']:
+            print(f"  ({stats['drift']} renames/deletes since the sketches were built are not reflected below)")
+        for field, label in (('author', 'Authors'), ('category', 'Categories'), ('tag', 'Tags')):
+            estimate, error = stats['distinct'][field]
+            print(f"{label}: ~{estimate} (±{error}, 95% confidence)")
+        for field, label in (('author', 'TOP AUTHORS'), ('category', 'TOP CATEGORIES')):
+            top = stats['top'][field]
             print("\n" + "-" * 70)
-            print("ALL CATEGORIES:")
+            print(f"{label} (counts may be up to {top['overcount']} too high, "
+                  f"{top['confidence']:.1%} confidence):")
             print("-" * 70)
-            for category, count in all_categories:
-                print(f"  {category}: {count} quotes")
-            
-            print("=" * 70)
-            self.pause()
+            for name, count in top['counts']:
+                print(f"  {name}: ~{count} quotes")
+        print("=" * 70)
+
+    def _has_view_tables(self, cursor) -> bool:
+        if not self._view_tables:
+            cursor.execute(f"SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' "
+                           f"AND name IN ({', '.join('?' * len(VIEW_TABLES))})", VIEW_TABLES)
+            self._view_tables = cursor.fetchone()[0] == len(VIEW_TABLES)
+        return self._view_tables
+
+    def rollup_views(self) -> int:
+        """Add the view events since the last run to the hourly and daily rollups, then trim.
+
+        Only new events are read, so a run costs in proportion to the views
+        since the previous one, however long the history. Returns how many
+        events were rolled up.
+        """
+        self._check_writable()
+        now = int(time.time())
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            self._flush_views(cursor)
+            if not self._has_view_tables(cursor):
+                return 0
+            cursor.execute('SELECT COALESCE((SELECT last_event FROM view_rollup_state), 0), '
+                           'COALESCE((SELECT MAX(id) FROM view_events), 0)')
+            start, end = cursor.fetchone()
+            cursor.execute('SELECT COUNT(*) FROM view_events WHERE id > ? AND id <= ?', (start, end))
+            rolled = cursor.fetchone()[0]
+            if rolled:
+                for period, size in VIEW_PERIODS.items():
+                    cursor.execute('''
+                        INSERT INTO view_rollups (period, dimension, bucket, key, views)
+                        SELECT ?, 'quote', viewed_at - viewed_at % ?, quote_id, COUNT(*)
+                        FROM view_events WHERE id > ? AND id <= ?
+                        GROUP BY 3, 4
+                        ON CONFLICT DO UPDATE SET views = views + excluded.views
+                    ''', (period, size, start, end))
+                    # Views of quotes deleted since are only kept in the quote rollup
+                    for dimension in ('author', 'category'):
+                        cursor.execute(f'''
+                            INSERT INTO view_rollups (period, dimension, bucket, key, views)
+                            SELECT ?, ?, e.viewed_at - e.viewed_at % ?, q.{dimension}, COUNT(*)
+                            FROM view_events e JOIN quotes q ON q.id = e.quote_id
+                            WHERE e.id > ? AND e.id <= ?
+                            GROUP BY 3, 4
+                            ON CONFLICT DO UPDATE SET views = views + excluded.views
+                        ''', (period, dimension, size, start, end))
+                cursor.execute('''
+                    INSERT INTO view_totals (quote_id, views, last_viewed)
+                    SELECT quote_id, COUNT(*), MAX(viewed_at) FROM view_events WHERE id > ? AND id <= ?
+                    GROUP BY quote_id
+                    ON CONFLICT DO UPDATE SET views = views + excluded.views,
+                                              last_viewed = MAX(last_viewed, excluded.last_viewed)
+                ''', (start, end))
+                cursor.execute('''
+                    INSERT INTO view_rollup_state (id, last_event, rolled_at) VALUES (1, ?, ?)
+                    ON CONFLICT (id) DO UPDATE SET last_event = excluded.last_event, rolled_at = excluded.rolled_at
+                ''', (end, now))
+
+            # Retention: events arrive in id order, so the old ones are a prefix of the table
+            cursor.execute('SELECT id FROM view_events WHERE id > ? OR viewed_at >= ? ORDER BY id LIMIT 1',
+                           (end, now - VIEW_EVENT_RETENTION_DAYS * 86400))
+            row = cursor.fetchone()
+            cursor.execute('DELETE FROM view_events WHERE id < ?', (row[0] if row else end + 1,))
+            for dimension in VIEW_DIMENSIONS:
+                cursor.execute("DELETE FROM view_rollups WHERE period = 'hour' AND dimension = ? AND bucket < ?",
+                               (dimension, now - VIEW_HOURLY_RETENTION_DAYS * 86400))
+            conn.commit()
+        return rolled
+
+    def view_trends(self, dimension: str = 'category', days: float = 7, k: int = 10) -> List[Tuple]:
+        """The k quotes, authors or categories gaining the most views, from the rollups.
+
+        Compares the views of the last `days` days (hourly buckets up to two
+        days, daily beyond) with the `days` before. Rows are (name, recent,
+        previous), or (id, quote_text, author, recent, previous) for quotes.
+        """
+        if dimension not in VIEW_DIMENSIONS:
+            raise ValueError(f"Unknown dimension: {dimension}")
+        with self.snapshot() as cursor:
+            return self._query_trends(cursor, dimension, days, k)
+
+    def _query_trends(self, cursor, dimension: str, days: float, k: int) -> List[Tuple]:
+        """Run the view_trends query on an open cursor"""
+        if not self._has_view_tables(cursor):
+            return []
+        period = 'hour' if days <= 2 else 'day'
+        size = VIEW_PERIODS[period]
+        now = int(time.time())
+        buckets = max(1, round(days * 86400 / size))
+        recent_start = now - now % size - (buckets - 1) * size
+        totals = '''
+            SELECT key, SUM(CASE WHEN bucket >= :recent THEN views ELSE 0 END) AS recent,
+                   SUM(CASE WHEN bucket < :recent THEN views ELSE 0 END) AS previous
+            FROM view_rollups
+            WHERE period = :period AND dimension = :dimension AND bucket >= :start
+            GROUP BY key HAVING recent > 0
+        '''
+        params = {'recent': recent_start, 'start': recent_start - buckets * size, 'period': period,
+                  'dimension': dimension, 'k': k}
+        if dimension == 'quote':
+            cursor.execute(f'''
+                SELECT q.id, q.quote_text, q.author, t.recent, t.previous
+                FROM ({totals}) t JOIN quotes q ON q.id = t.key
+                ORDER BY t.recent - t.previous DESC, t.recent DESC LIMIT :k
+            ''', params)
+        else:
+            cursor.execute(f'{totals} ORDER BY recent - previous DESC, recent DESC LIMIT :k', params)
+        return cursor.fetchall()
+
+    def cold_quotes(self, k: int = 10) -> List[Tuple]:
+        """Quotes last viewed between COLD_LOOKBACK_DAYS and COLD_AFTER_DAYS ago, most viewed first.
+
+        Rows are (id, quote_text, author, total views, time of the last view).
+        """
+        with self.snapshot() as cursor:
+            return self._query_cold(cursor, k)
+
+    def _query_cold(self, cursor, k: int) -> List[Tuple]:
+        """Run the cold_quotes query on an open cursor"""
+        if not self._has_view_tables(cursor):
+            return []
+        now = int(time.time())
+        cursor.execute('''
+            SELECT q.id, q.quote_text, q.author, t.views, t.last_viewed
+            FROM view_totals t JOIN quotes q ON q.id = t.quote_id
+            WHERE t.last_viewed >= ? AND t.last_viewed < ?
+            ORDER BY t.views DESC LIMIT ?
+        ''', (now - COLD_LOOKBACK_DAYS * 86400, now - COLD_AFTER_DAYS * 86400, k))
+        return cursor.fetchall()
+
+    def engagement_statistics(self, days: float = 7, k: int = 5) -> Optional[Dict]:
+        """Trending quotes/authors/categories and cold quotes; None if no views were ever recorded.
+
+        New view events are rolled up first (unless read-only); the reports
+        then read only the rollups.
+        """
+        if not self.read_only:
+            self.rollup_views()
+        with self.snapshot() as cursor:
+            return self._query_engagement(cursor, days, k)
+
+    def _query_engagement(self, cursor, days: float = 7, k: int = 5) -> Optional[Dict]:
+        """Run the engagement_statistics queries on an open snapshot cursor"""
+        if not self._has_view_tables(cursor):
+            return None
+        return {'days': days,
+                'trending': {dimension: self._query_trends(cursor, dimension, days, k)
+                             for dimension in VIEW_DIMENSIONS},
+                'cold': self._query_cold(cursor, k)}
+
+    def show_engagement(self, days: float = 7, k: int = 5):
+        """Print engagement_statistics"""
+        engagement = self.engagement_statistics(days, k)
+        with self.renderer() as out:
+            if engagement is None:
+                out.text("No views recorded yet.")
+                return
+            out.record(engagement)
+            self._print_engagement(out, engagement)
+
+    @staticmethod
+    def _print_engagement(out, engagement: Dict):
+        days = engagement['days']
+        out.text("\n" + "-" * 70, f"TRENDING (views in the last {days:g} days, change from the {days:g} before):",
+                 "-" * 70)
+        trending = engagement['trending']
+        if not any(trending.values()):
+            out.text("  No views in this period.")
+        for dimension, label in (('category', 'Categories'), ('author', 'Authors')):
+            if trending[dimension]:
+                out.text(f"  {label}:")
+                out.text(*(f"    {name}: {recent} views ({recent - previous:+d})"
+                           for name, recent, previous in trending[dimension]))
+        if trending['quote']:
+            out.text("  Quotes:")
+            out.text(*(f'    #{quote_id} "{text[:50]}{"..." if len(text) > 50 else ""}" - {author}: '
+                       f'{recent} views ({recent - previous:+d})'
+                       for quote_id, text, author, recent, previous in trending['quote']))
+        if engagement['cold']:
+            out.text("\n" + "-" * 70,
+                     f"COLD QUOTES (last viewed {COLD_AFTER_DAYS} to {COLD_LOOKBACK_DAYS} days ago):",
+                     "-" * 70)
+            out.text(*(f'  #{quote_id} "{text[:50]}{"..." if len(text) > 50 else ""}" - {author}: '
+                       f'{views} views, last on {time.strftime("%Y-%m-%d", time.gmtime(last_viewed))}'
+                       for quote_id, text, author, views, last_viewed in engagement['cold']))
+
+    def collect_statistics(self) -> Dict:
+        """Return the figures shown by get_statistics, all from one snapshot"""
+        with self.snapshot() as cursor:
+            return self._query_statistics(cursor)
+
+    def _query_statistics(self, cursor) -> Dict:
+        """Run the statistics queries on an open cursor"""
+        if self.normalized:
+            return self._query_normalized_statistics(cursor)
+        stats = {}
+        
+        # Basic stats
+        cursor.execute('SELECT COUNT(*) FROM quotes')
+        stats['total'] = cursor.fetchone()[0]
+        
+        cursor.execute('SELECT COUNT(DISTINCT author) FROM quotes WHERE author != "Unknown"')
+        stats['known_authors'] = cursor.fetchone()[0]
+        
+        cursor.execute('SELECT COUNT(*) FROM quotes WHERE author = "Unknown"')
+        stats['unknown_authors'] = cursor.fetchone()[0]
+        
+        cursor.execute('SELECT COUNT(DISTINCT category) FROM quotes')
+        stats['categories'] = cursor.fetchone()[0]
+        
+        cursor.execute('SELECT COUNT(*) FROM quotes WHERE favorite = 1')
+        stats['favorites'] = cursor.fetchone()[0]
+        
+        # Most viewed quote
+        cursor.execute('SELECT id, quote_text, author, times_viewed FROM quotes WHERE times_viewed > 0 ORDER BY times_viewed DESC LIMIT 1')
+        stats['most_viewed'] = cursor.fetchone()
+        
+        # All authors with counts (including Unknown)
+        cursor.execute('''
+            SELECT author, COUNT(*) as count 
+            FROM quotes 
+            GROUP BY author 
+            ORDER BY count DESC, author
+        ''')
+        stats['all_authors'] = cursor.fetchall()
+        
+        # All categories with counts
+        cursor.execute('''
+            SELECT category, COUNT(*) as count 
+            FROM quotes 
+            GROUP BY category 
+            ORDER BY count DESC, category
+        ''')
+        stats['all_categories'] = cursor.fetchall()
+        return stats
+
+    def _query_normalized_statistics(self, cursor) -> Dict:
+        """Statistics on the normalized layout: counts and grouping run on integer keys"""
+        stats = {}
+        cursor.execute("SELECT id FROM authors WHERE name = 'Unknown'")
+        row = cursor.fetchone()
+        unknown_id = row[0] if row else None
+
+        cursor.execute('SELECT COUNT(*) FROM quote_rows')
+        stats['total'] = cursor.fetchone()[0]
+        cursor.execute('SELECT COUNT(DISTINCT author_id) FROM quote_rows WHERE author_id IS NOT ?', (unknown_id,))
+        stats['known_authors'] = cursor.fetchone()[0]
+        cursor.execute('SELECT COUNT(*) FROM quote_rows WHERE author_id = ?', (unknown_id,))
+        stats['unknown_authors'] = cursor.fetchone()[0]
+        cursor.execute('SELECT COUNT(DISTINCT category_id) FROM quote_rows')
+        stats['categories'] = cursor.fetchone()[0]
+        cursor.execute('SELECT COUNT(*) FROM quote_rows WHERE favorite = 1')
+        stats['favorites'] = cursor.fetchone()[0]
+        cursor.execute('SELECT id, quote_text, author, times_viewed FROM quotes WHERE times_viewed > 0 ORDER BY times_viewed DESC LIMIT 1')
+        stats['most_viewed'] = cursor.fetchone()
+
+        # Group on the integer key first, then look the names up once per group
+        cursor.execute('''
+            SELECT a.name, g.count
+            FROM (SELECT author_id, COUNT(*) AS count FROM quote_rows GROUP BY author_id) g
+            JOIN authors a ON a.id = g.author_id
+            ORDER BY g.count DESC, a.name
+        ''')
+        stats['all_authors'] = cursor.fetchall()
+        cursor.execute('''
+            SELECT c.name, g.count
+            FROM (SELECT category_id, COUNT(*) AS count FROM quote_rows GROUP BY category_id) g
+            JOIN categories c ON c.id = g.category_id
+            ORDER BY g.count DESC, c.name
+        ''')
+        stats['all_categories'] = cursor.fetchall()
+        return stats
     
+    def _advisor_queries(self) -> List[Tuple]:
+        """ADVISOR_QUERIES with the normalized layout's statements swapped in when needed"""
+        if not self.normalized:
+            return ADVISOR_QUERIES
+        replaced = {method for method, _, _, _ in NORMALIZED_ADVISOR_QUERIES}
+        return [q for q in ADVISOR_QUERIES if q[0] not in replaced] + NORMALIZED_ADVISOR_QUERIES
+
+    def measure_latency(self, rounds: int = 5) -> Dict[str, float]:
+        """Best-of-`rounds` milliseconds of the statements behind each menu action"""
+        timings = {}
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            for _ in range(rounds):
+                round_timings = {}
+                for method, sql, params, _ in self._advisor_queries():
+                    if method in LATENCY_PROBE_SKIP:
+                        continue
+                    start = time.perf_counter()
+                    cursor.execute(sql, params).fetchall()
+                    round_timings[method] = round_timings.get(method, 0) + (time.perf_counter() - start) * 1000
+                for method, elapsed in round_timings.items():
+                    timings[method] = min(elapsed, timings.get(method, elapsed))
+        return timings
+
+    def storage_report(self) -> Dict:
+        """Page usage, free-page ratio, per-table/index sizes and fragmentation.
+
+        Fragmentation is the share of B-tree leaf pages that do not directly
+        follow the previous leaf of the same tree on disk; only a full VACUUM
+        brings it back down.
+        """
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM pragma_page_size, pragma_page_count, pragma_freelist_count, '
+                           'pragma_auto_vacuum')
+            page_size, page_count, free_pages, auto_vacuum = cursor.fetchone()
+            report = {
+                'page_size': page_size,
+                'page_count': page_count,
+                'free_pages': free_pages,
+                'free_ratio': free_pages / page_count if page_count else 0.0,
+                'file_size': page_size * page_count,
+                'auto_vacuum': ('none', 'full', 'incremental')[auto_vacuum],
+                'objects': [],
+                'fragmentation': None,
+            }
+            try:
+                # dbstat lists pages in B-tree order, so jumps between neighbours are out-of-order pages
+                cursor.execute("SELECT name, pageno, pagetype, pgsize, unused FROM dbstat")
+            except sqlite3.OperationalError:  # SQLite built without SQLITE_ENABLE_DBSTAT_VTAB
+                return report
+            objects = {}
+            jumps = leaves = 0
+            previous = (None, None)
+            for name, pageno, pagetype, size, unused in cursor:
+                entry = objects.setdefault(name, [0, 0, 0])
+                entry[0] += size
+                entry[1] += unused
+                entry[2] += 1
+                if pagetype == 'leaf':
+                    if previous[0] == name:
+                        leaves += 1
+                        jumps += pageno != previous[1] + 1
+                    previous = (name, pageno)
+            report['objects'] = sorted(((name, size, unused / size if size else 0.0, pages)
+                                        for name, (size, unused, pages) in objects.items()),
+                                       key=lambda item: -item[1])
+            report['fragmentation'] = jumps / leaves if leaves else 0.0
+        return report
+
+    def maintenance_due(self) -> List[str]:
+        """Reasons maintenance should run now (empty when it is not due).
+
+        Cheap enough to call on every exit: a few PRAGMAs and two indexed lookups.
+        """
+        reasons = []
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM pragma_page_count, pragma_freelist_count')
+            page_count, free_pages = cursor.fetchone()
+            if page_count and free_pages / page_count >= MAINTENANCE_FREE_RATIO:
+                reasons.append(f"{free_pages * 100 // page_count}% of the file is free pages")
+
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'maintenance_log'")
+            last = None
+            if cursor.fetchone():
+                cursor.execute('SELECT change_seq, julianday() - julianday(ran_at) FROM maintenance_log '
+                               'ORDER BY id DESC LIMIT 1')
+                last = cursor.fetchone()
+            if last is None:
+                reasons.append("maintenance has never run")
+                return reasons
+
+            cursor.execute("SELECT COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'quote_changes'), 0)")
+            changes = cursor.fetchone()[0] - (last[0] or 0)
+            cursor.execute(f'SELECT COALESCE(MAX(id), 0) FROM {self.base_table}')
+            if changes >= max(MAINTENANCE_MIN_CHANGES, cursor.fetchone()[0] * MAINTENANCE_CHANGE_RATIO):
+                reasons.append(f"{changes} quotes changed since the last ANALYZE")
+            if last[1] >= MAINTENANCE_INTERVAL_DAYS:
+                reasons.append(f"last maintenance was {int(last[1])} days ago")
+        return reasons
+
+    def run_maintenance(self, vacuum: str = "auto", integrity: str = "quick") -> Dict:
+        """Check integrity, refresh planner statistics and reclaim free space.
+
+        vacuum is 'auto' (by the thresholds), 'incremental', 'full' or 'none';
+        integrity is 'quick', 'full' or 'none'. The probe statements of
+        measure_latency run before and after, and the run is recorded in the
+        maintenance_log table. Returns a summary dict.
+        """
+        self._check_writable()
+        conn = self._connect()
+        conn.commit()
+        cursor = conn.cursor()
+        before = self.storage_report()
+        summary = {'actions': [], 'before': before, 'latency_before': self.measure_latency()}
+
+        if integrity != 'none':
+            cursor.execute('PRAGMA integrity_check' if integrity == 'full' else 'PRAGMA quick_check')
+            problems = [row[0] for row in cursor.fetchall()]
+            summary['integrity'] = problems
+            summary['actions'].append(f"{integrity} integrity check")
+            if problems != ['ok']:
+                # Rewriting a damaged file could make matters worse; stop here
+                return summary
+
+        if vacuum == 'auto':
+            fragmented = (before['fragmentation'] or 0) >= MAINTENANCE_FRAGMENTATION
+            if fragmented or (before['free_ratio'] >= MAINTENANCE_FREE_RATIO and before['auto_vacuum'] != 'incremental'):
+                vacuum = 'full'
+            elif before['free_pages']:
+                vacuum = 'incremental' if before['auto_vacuum'] == 'incremental' else 'none'
+            else:
+                vacuum = 'none'
+        if vacuum == 'full':
+            # Switch to incremental auto-vacuum on the way, so later runs can usually skip the rewrite
+            cursor.execute('PRAGMA auto_vacuum = INCREMENTAL')
+            cursor.execute('VACUUM')
+            summary['actions'].append('full VACUUM')
+        elif vacuum == 'incremental':
+            cursor.execute('PRAGMA incremental_vacuum').fetchall()
+            summary['actions'].append(f"incremental vacuum ({before['free_pages']} free pages)")
+
+        rolled = self.rollup_views()
+        if rolled:
+            summary['actions'].append(f"rolled up {rolled} view events")
+
+        cursor.execute('ANALYZE')
+        cursor.execute('PRAGMA optimize')
+        summary['actions'].append('ANALYZE + PRAGMA optimize')
+
+        summary['after'] = self.storage_report()
+        summary['latency_after'] = self.measure_latency()
+        cursor.execute(MAINTENANCE_LOG_SCHEMA)
+        cursor.execute('''
+            INSERT INTO maintenance_log (actions, change_seq, free_ratio_before, free_ratio_after,
+                                         latency_before_ms, latency_after_ms)
+            VALUES (?, COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'quote_changes'), 0), ?, ?, ?, ?)
+        ''', ('; '.join(summary['actions']), before['free_ratio'], summary['after']['free_ratio'],
+              sum(summary['latency_before'].values()), sum(summary['latency_after'].values())))
+        conn.commit()
+        return summary
+
+    def show_maintenance(self, run: bool = None):
+        """Print the storage report and, if confirmed (or run=True), run maintenance"""
+        report = self.storage_report()
+        due = self.maintenance_due()
+        print("\n" + "=" * 70)
+        print("DATABASE MAINTENANCE")
+        print("=" * 70)
+        print(f"File size: {report['file_size'] / 2**20:.2f} MB ({report['page_count']} pages of {report['page_size']} bytes)")
+        print(f"Free pages: {report['free_pages']} ({report['free_ratio']:.1%}), auto_vacuum: {report['auto_vacuum']}")
+        if report['fragmentation'] is not None:
+            print(f"Fragmentation: {report['fragmentation']:.1%} of leaf pages out of order")
+            print("-" * 70)
+            print(f"  {'table / index':<36} {'size':>10} {'unused':>8}")
+            for name, size, unused, _ in report['objects'][:12]:
+                print(f"  {name:<36} {size / 2**10:7.0f} KB {unused:8.1%}")
+        print("-" * 70)
+        print("Maintenance due: " + ("; ".join(due) if due else "no"))
+
+        if run is None:
+            if self.read_only:
+                run = False
+            else:
+                run = input("\nRun maintenance now? (y/N): ").lower() == 'y'
+        if run:
+            summary = self.run_maintenance()
+            for action in summary['actions']:
+                print(f"[OK] {action}")
+            if summary.get('integrity', ['ok']) != ['ok']:
+                print("[X] Integrity problems found; nothing else was done:")
+                for problem in summary['integrity'][:20]:
+                    print(f"    {problem}")
+            else:
+                after = summary['after']
+                print(f"[OK] Free pages {report['free_ratio']:.1%} -> {after['free_ratio']:.1%}, "
+                      f"file {report['file_size'] / 2**20:.2f} -> {after['file_size'] / 2**20:.2f} MB")
+                print(f"     Probe latency {sum(summary['latency_before'].values()):.2f} -> "
+                      f"{sum(summary['latency_after'].values()):.2f} ms")
+        print("=" * 70)
+
+    def advise_indexes(self) -> List[Dict]:
+        """Run EXPLAIN QUERY PLAN over ADVISOR_QUERIES and flag full scans and temp B-trees"""
+        findings = []
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            for method, sql, params, expected in self._advisor_queries():
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+                plan = [row[3] for row in cursor.fetchall()]
+                issues = []
+                for step in plan:
+                    # "SCAN quotes USING COVERING INDEX ..." only reads the index and
+                    # "SCAN CONSTANT ROW" is the outer SELECT of scalar subqueries
+                    if step.startswith('SCAN ') and ' USING ' not in step and step != 'SCAN CONSTANT ROW':
+                        issues.append('full table scan')
+                    elif step.startswith('USE TEMP B-TREE'):
+                        issues.append(step[4:].lower())
+                findings.append({
+                    'method': method,
+                    'sql': sql,
+                    'plan': plan,
+                    'issues': issues,
+                    'expected': expected if issues else None,
+                })
+        return findings
+
+    def show_index_report(self):
+        """Print the index advisor report"""
+        findings = self.advise_indexes()
+        print("\n" + "=" * 70)
+        print("INDEX ADVISOR")
+        print("=" * 70)
+        for finding in findings:
+            if not finding['issues']:
+                status = "[OK]"
+            elif finding['expected']:
+                status = "[~] "
+            else:
+                status = "[!] "
+            print(f"{status} {finding['method']}: {finding['sql'][:80]}")
+            for step in finding['plan']:
+                print(f"        {step}")
+            if finding['expected']:
+                print(f"        expected: {finding['expected']}")
+
+        unexpected = [f for f in findings if f['issues'] and not f['expected']]
+        print("-" * 70)
+        if unexpected:
+            print(f"{len(unexpected)} queries scan or sort without an index:")
+            for finding in unexpected:
+                print(f"  {finding['method']}: {', '.join(finding['issues'])}")
+        else:
+            print("No unexpected full scans or temporary B-trees.")
+        print("=" * 70)
+
     def add_multiple_quotes(self):
         """Add multiple quotes at once"""
         self.clear_screen()
+        if self.read_only:
+            print(f"[X] {self.db_name} is open read-only; quotes cannot be added")
+            self.pause()
+            return
         print("\nADD MULTIPLE QUOTES")
         print("=" * 60)
         print("Instructions:")
         print("  - Paste or type multiple quotes")
-        print("  - One quote per line")
+        print("  - One quote per line, optionally ending in ' — Author'")
+        print("  - Tab-separated lines: quote, author, category, tags, source, year")
         print("  - Type 'DONE' on a new line when finished")
         print("=" * 60)
-        
-        quotes = []
+
+        filename = input("\nFile to import (Enter to type quotes instead): ").strip().strip('"')
+        if filename:
+            if not os.path.exists(filename):
+                print(f"[X] File not found: {filename}")
+                self.pause()
+                return
+            author = self.ask_name("Author for lines without one (Enter for 'Unknown'): ", 'author', "Unknown")
+            category = self.ask_name("Category for lines without one (Enter for 'General'): ", 'category', "General")
+            tags = self.ask_name("Tags for lines without any (comma-separated, optional): ", 'tag')
+            try:
+                start = time.perf_counter()
+                added, skipped = self.add_quotes_from_file(filename, author, category, tags)
+                elapsed = time.perf_counter() - start
+            except Exception as e:
+                print(f"[X] Error reading {filename}: {e}")
+                self.pause()
+                return
+            print("\n" + "=" * 60)
+            print(f"[OK] Results: {added} added, {skipped} skipped (duplicates) in {elapsed:.2f}s")
+            print("=" * 60)
+            self.pause()
+            return
+
+        lines = []
         print("\nEnter quotes (type 'DONE' when finished):\n")
-        
+
         while True:
             line = input()
             if line.strip().upper() == 'DONE':
                 break
             if line.strip():
-                quotes.append(line.strip())
-        
-        if not quotes:
+                lines.append(line)
+
+        # None marks what the prompts below still have to fill in
+        rows = [list(row) for row in self.parse_batch_lines(lines, None, None, None)]
+        if not rows:
             print("[X] No quotes entered!")
             self.pause()
             return
-        
-        print(f"\nYou entered {len(quotes)} quotes.")
+
+        print(f"\nYou entered {len(rows)} quotes.")
         print("-" * 50)
-        
-        # Ask for author preference first
-        print("\nHow do you want to set authors?")
-        print("1. Same author for all quotes")
-        print("2. Enter author for each quote individually")
-        print("3. All quotes are 'Unknown' author")
-        
-        author_choice = input("\nChoose (1/2/3): ").strip()
-        
-        authors_list = []
-        if author_choice == '1':
-            author = input("Enter author name for all quotes: ").strip() or "Unknown"
-            authors_list = [author] * len(quotes)
-        elif author_choice == '2':
-            print("\nEnter author for each quote (press Enter for 'Unknown'):")
-            for i, quote in enumerate(quotes, 1):
-                print(f'\n{i}. "{quote[:50]}{"..." if len(quote) > 50 else ""}"')
-                ind_author = input(f"   Author: ").strip() or "Unknown"
-                authors_list.append(ind_author)
-        else:
-            authors_list = ["Unknown"] * len(quotes)
-        
-        # Ask for category and tags
-        category = input("\nCategory for all quotes (Enter for 'General'): ").strip() or "General"
-        tags = input("Tags for all (comma-separated, optional): ").strip()
-        
-        # Add quotes to database
-        added = 0
-        skipped = 0
-        
-        for quote, quote_author in zip(quotes, authors_list):
-            result = self.add_quote(quote, quote_author, category, tags)
-            if result:
-                added += 1
+
+        missing = [row for row in rows if row[1] is None]
+        if missing:
+            # Ask for author preference first
+            print(f"\nHow do you want to set authors for the {len(missing)} quotes without one?")
+            print("1. Same author for all quotes")
+            print("2. Enter author for each quote individually")
+            print("3. All quotes are 'Unknown' author")
+
+            author_choice = input("\nChoose (1/2/3): ").strip()
+
+            if author_choice == '1':
+                author = self.ask_name("Enter author name for all quotes: ", 'author', "Unknown")
+                for row in missing:
+                    row[1] = author
+            elif author_choice == '2':
+                print("\nEnter author for each quote (press Enter for 'Unknown'):")
+                for i, row in enumerate(missing, 1):
+                    quote = row[0]
+                    print(f'\n{i}. "{quote[:50]}{"..." if len(quote) > 50 else ""}"')
+                    row[1] = self.ask_name("   Author: ", 'author', "Unknown")
             else:
-                skipped += 1
-        
+                for row in missing:
+                    row[1] = "Unknown"
+
+        # Ask for category and tags
+        category = self.ask_name("\nCategory for all quotes (Enter for 'General'): ", 'category', "General")
+        tags = self.ask_name("Tags for all (comma-separated, optional): ", 'tag')
+        for row in rows:
+            row[2] = row[2] or category
+            row[3] = row[3] if row[3] is not None else tags
+
+        # Add quotes to database in one transaction
+        try:
+            added, skipped = self.add_quotes_batch(rows)
+        except Exception as e:
+            print(f"[X] Error adding quotes: {e}")
+            self.pause()
+            return
+
         print("\n" + "=" * 60)
         print(f"[OK] Results: {added} added, {skipped} skipped (duplicates)")
         print("=" * 60)
         self.pause()
 
+    def bulk_edit(self):
+        """Interactive front end of bulk_update / undo_bulk"""
+        self.clear_screen()
+        print("\nBULK EDIT")
+        print("=" * 60)
+        print("Select quotes by:")
+        print("  1. IDs (e.g. 3,7,10-200)")
+        print("  2. Search term")
+        print("  3. Category")
+        print("  4. Author")
+        print("  5. Tag")
+        print("  6. Favorites")
+        print("  7. Undo the last bulk edit")
+        choice = input("\nChoose (1-7): ").strip()
+
+        try:
+            if choice == '7':
+                restored = self.undo_bulk()
+                print(f"[OK] Restored {restored} quotes" if restored else "[!] Nothing to undo")
+                self.pause()
+                return
+            if choice == '1':
+                filters = parse_id_spec(input("IDs: "))
+            elif choice == '2':
+                filters = {'search': input("Search term: ").strip()}
+            elif choice == '3':
+                filters = {'category': self.resolve_name('category', self.ask_name("Category: ", 'category'))}
+            elif choice == '4':
+                filters = {'author': self.resolve_name('author', self.ask_name("Author: ", 'author'))}
+            elif choice == '5':
+                filters = {'tag': self.ask_name("Tag: ", 'tag')}
+            elif choice == '6':
+                filters = {'favorite': True}
+            else:
+                print("[X] Invalid choice!")
+                self.pause()
+                return
+        except ValueError:
+            print("[X] Please enter IDs like 3,7,10-200")
+            self.pause()
+            return
+        if not any(value not in (None, '', []) for value in filters.values()):
+            print("[X] Nothing selected!")
+            self.pause()
+            return
+
+        print("\nAction:")
+        for number, action in enumerate(BULK_ACTIONS, 1):
+            print(f"  {number}. {action.replace('_', ' ')}")
+        action_str = input(f"\nChoose (1-{len(BULK_ACTIONS)}): ").strip()
+        if not action_str.isdigit() or not 1 <= int(action_str) <= len(BULK_ACTIONS):
+            print("[X] Invalid action!")
+            self.pause()
+            return
+        action = BULK_ACTIONS[int(action_str) - 1]
+        value = None
+        if action in ('set_category', 'set_author'):
+            field = action[len('set_'):]
+            value = self.ask_name(f"New {field}: ", field)
+        elif action in ('add_tag', 'remove_tag'):
+            value = self.ask_name("Tag: ", 'tag')
+
+        try:
+            count = self.bulk_update(action, value, dry_run=True, **filters)
+            if not count:
+                print("[!] No quotes would change.")
+                self.pause()
+                return
+            confirm = input(f"\nThis will {action.replace('_', ' ')} {count} quotes. Proceed? (y/N): ").lower()
+            if confirm != 'y':
+                print("[!] Cancelled.")
+            else:
+                changed = self.bulk_update(action, value, **filters)
+                print(f"[OK] {changed} quotes changed (undo with Bulk edit > 7)")
+        except (ValueError, sqlite3.Error) as e:
+            print(f"[X] Bulk edit failed: {e}")
+        self.pause()
+
+
+def date_bound(text: str, next_day: bool = False) -> str:
+    """A date or timestamp in the form date_added is stored in, to compare it with"""
+    text = text.strip()
+    try:
+        moment = datetime.fromisoformat(text)
+    except ValueError:
+        raise ValueError(f"Invalid date: {text!r} (expected YYYY-MM-DD or YYYY-MM-DD HH:MM:SS)") from None
+    if len(text) == 10:
+        if next_day:
+            moment += timedelta(days=1)
+        return moment.strftime('%Y-%m-%d')
+    return moment.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def parse_id_spec(text: str) -> Dict:
+    """Turn "3,7,10-200" into bulk_update filters: id_range for a single range, else ids"""
+    ids, ranges = [], []
+    for part in text.replace(' ', '').split(','):
+        if not part:
+            continue
+        low, dash, high = part.partition('-')
+        if dash:
+            ranges.append((int(low), int(high)))
+        else:
+            ids.append(int(part))
+    if len(ranges) == 1 and not ids:
+        return {'id_range': ranges[0]}
+    for low, high in ranges:
+        ids.extend(range(low, high + 1))
+    return {'ids': ids}
+
+
+# Filter options copied as they are from the parsed arguments into _filter_clause
+FILTER_OPTIONS = ('search', 'category', 'author', 'tag', 'favorite', 'since', 'until')
+
+
+def add_filter_arguments(parser):
+    """The filter options of run_cli commands that select quotes (see filters_from_args)"""
+    parser.add_argument('--ids', help='ids and ranges, e.g. 3,7,10-200')
+    parser.add_argument('--search', help='keyword or phrase')
+    parser.add_argument('--in', dest='search_in', default='all',
+                        choices=['all', 'text', 'author', 'category'], help='fields --search looks at')
+    parser.add_argument('--category')
+    parser.add_argument('--author')
+    parser.add_argument('--tag')
+    parser.add_argument('--favorites', dest='favorite', action='store_const', const=True,
+                        help='only favorites')
+    parser.add_argument('--since', help='added on or after this date (YYYY-MM-DD[ HH:MM:SS])')
+    parser.add_argument('--until', help='added on or before this date')
+
+
+def filters_from_args(args) -> Dict:
+    """_filter_clause arguments from the options added by add_filter_arguments"""
+    filters = parse_id_spec(args.ids) if args.ids else {}
+    filters.update({name: getattr(args, name) for name in FILTER_OPTIONS if getattr(args, name) is not None})
+    if args.search is not None:
+        filters['search_in'] = args.search_in
+    return filters
+
 
 def display_menu():
     """Display the enhanced menu"""
@@ -604,32 +3178,27 @@ def display_menu():
     print("  11. Export quotes")
     print("  12. Import quotes")
     print("  13. Backup database")
-    print("  14. Exit")
-    print("="*60)
-
 
-def is_db_empty(db_name: str) -> bool:
-    """Check if the database is empty (no quotes)"""
-    try:
-        with sqlite3.connect(db_name) as conn:
-            cursor = conn.cursor()
-            # First, check if table exists
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='quotes'")
-            if not cursor.fetchone():
-                return True
-            cursor.execute('SELECT COUNT(*) FROM quotes')
-            return cursor.fetchone()[0] == 0
-    except sqlite3.Error:
-        return True  # Assume empty if error (e.g., DB doesn't exist)
+    print("\n  TOOLS:")
+    print("  15. Bulk edit (favorite, recategorize, retag or delete many quotes)")
+    print("  16. Maintenance (fragmentation report, ANALYZE, VACUUM, integrity check)")
+    print("\n  14. Exit")
+    print("="*60)
 
 
 # Global functions for startup
 def clear_screen():
-    os.system('cls' if os.name == 'nt' else 'clear')
+    if os.name == 'nt':
+        os.system('cls')
+    else:
+        # The escape sequence `clear` prints, without spawning a shell for it
+        sys.stdout.write('\033[H\033[2J\033[3J')
+        sys.stdout.flush()
 
 def pause(message="Press Enter to continue..."):
     print(f"\n{message}")
     if os.name == 'nt':
+        import msvcrt
         msvcrt.getch()
     else:
         input()
@@ -653,19 +3222,16 @@ def initialize_from_myquotes():
         return False
 
 
-def main():
+def main(db_name: str = "quotes.db", read_only: bool = False):
     """Main menu system"""
-    db_name = "quotes.db"
-    empty = is_db_empty(db_name)
+    # One connection and one schema-version check for the whole session
+    qm = QuotesManager(db_name, read_only=read_only)
     
-    qm = None
-    if not empty:
-        qm = QuotesManager(db_name)
-    else:
+    if not read_only and qm.is_empty():
         clear_screen()
         print("\nDatabase is empty!")
         print("Choose an option to get started:")
-        print("1. Import quotes from a file (JSON/CSV)")
+        print("1. Import quotes from a file (JSON/CSV/qcol)")
         print("2. Start adding quotes manually")
         print("3. Run MYQuotes.py to populate database")
         
@@ -673,19 +3239,20 @@ def main():
         
         if choice == '3':
             clear_screen()
+            # MYQuotes.py may delete or rebuild quotes.db, so let go of our connection first
+            qm.close()
             success = initialize_from_myquotes()
             if success:
                 print("\nMYQuotes.py completed successfully! Entering main menu...")
             else:
                 print("\nMYQuotes.py failed or not found. You can try again or add quotes manually.")
             pause()
-            qm = QuotesManager(db_name)
+            qm.setup_database()
         else:
-            qm = QuotesManager(db_name)
             if choice == '1':
                 clear_screen()
                 print("\nIMPORT FROM FILE")
-                print("Supported formats: .json, .csv")
+                print("Supported formats: .json, .csv, .qcol")
                 filename = input("Enter file path: ").strip()
                 filename = filename.strip('"').strip("'")
                 if filename:
@@ -695,154 +3262,482 @@ def main():
                     qm.pause()
             # For choice 2, just proceed to menu
     
-    # Now qm is created, enter main menu loop
-    while True:
-        qm.clear_screen()
-        display_menu()
-        choice = input("Choose an option (1-14): ").strip()
-        
-        if choice == '1':
+    # Now qm is created, enter main menu loop. Leaving it any way (Ctrl-C included)
+    # writes the view events still queued in memory.
+    try:
+        while True:
             qm.clear_screen()
-            print("\nADD NEW QUOTE")
-            print("-" * 50)
-            quote = input("Quote text: ").strip()
-            if quote:
-                author = input("Author (Enter for 'Unknown'): ").strip() or "Unknown"
-                category = input("Category (Enter for 'General'): ").strip() or "General"
-                tags = input("Tags (comma-separated, optional): ").strip()
-                source = input("Source (optional): ").strip()
-                year_str = input("Year (optional): ").strip()
-                year = int(year_str) if year_str.isdigit() else None
-                
-                qm.add_quote(quote, author, category, tags, source, year)
-                time.sleep(2)
-            else:
-                print("[X] Quote cannot be empty!")
-                time.sleep(2)
+            display_menu()
+            choice = input("Choose an option (1-16): ").strip()
         
-        elif choice == '2':
-            qm.add_multiple_quotes()
+            if choice == '1':
+                qm.clear_screen()
+                print("\nADD NEW QUOTE")
+                print("-" * 50)
+                quote = input("Quote text: ").strip()
+                if quote:
+                    author = qm.ask_name("Author (Enter for 'Unknown', end with ? to list matches): ", 'author', "Unknown")
+                    category = qm.ask_name("Category (Enter for 'General'): ", 'category', "General")
+                    tags = qm.ask_name("Tags (comma-separated, optional): ", 'tag')
+                    source = input("Source (optional): ").strip()
+                    year_str = input("Year (optional): ").strip()
+                    year = int(year_str) if year_str.isdigit() else None
+                
+                    qm.add_quote(quote, author, category, tags, source, year)
+                    time.sleep(2)
+                else:
+                    print("[X] Quote cannot be empty!")
+                    time.sleep(2)
         
-        elif choice == '3':
-            qm.clear_screen()
-            print("\nVIEW QUOTES")
-            print("-" * 50)
-            limit_str = input("Show how many? (Enter for all): ").strip()
-            limit = int(limit_str) if limit_str.isdigit() else None
-            show_stats = input("Show statistics? (y/N): ").lower() == 'y'
-            qm.clear_screen()
-            qm.show_all_quotes(limit, show_stats)
+            elif choice == '2':
+                qm.add_multiple_quotes()
         
-        elif choice == '4':
-            qm.clear_screen()
-            print("\nRANDOM QUOTE")
-            category = input("Filter by category? (Enter for any): ").strip()
-            qm.clear_screen()
-            qm.get_random_quote(category if category else None)
+            elif choice == '3':
+                qm.clear_screen()
+                print("\nVIEW QUOTES")
+                print("-" * 50)
+                limit_str = input("Show how many? (Enter for all): ").strip()
+                limit = int(limit_str) if limit_str.isdigit() else None
+                show_stats = input("Show statistics? (y/N): ").lower() == 'y'
+                qm.clear_screen()
+                qm.show_all_quotes(limit, show_stats)
         
-        elif choice == '5':
-            try:
+            elif choice == '4':
                 qm.clear_screen()
-                quote_id = int(input("\nEnter quote ID to delete: "))
-                qm.delete_quote(quote_id)
-            except ValueError:
-                print("[X] Please enter a valid number!")
-                time.sleep(2)
+                print("\nRANDOM QUOTE")
+                category = qm.ask_name("Filter by category? (Enter for any, a prefix is enough): ", 'category')
+                qm.clear_screen()
+                qm.get_random_quote(qm.resolve_name('category', category) if category else None)
         
-        elif choice == '6':
-            qm.clear_screen()
-            print("\nSEARCH QUOTES")
-            print("-" * 50)
-            search_term = input("What are you looking for? (keyword/phrase): ").strip()
-            if search_term:
-                print("\nWhere to search?")
-                print("1) All fields")
-                print("2) Quote text only")
-                print("3) Author names only")
-                print("4) Categories only")
-                search_choice = input("\nChoose (1-4): ").strip()
-                search_map = {'1': 'all', '2': 'text', '3': 'author', '4': 'category'}
-                search_in = search_map.get(search_choice, 'all')
+            elif choice == '5':
+                try:
+                    qm.clear_screen()
+                    quote_id = int(input("\nEnter quote ID to delete: "))
+                    qm.delete_quote(quote_id)
+                except ValueError:
+                    print("[X] Please enter a valid number!")
+                    time.sleep(2)
+        
+            elif choice == '6':
+                qm.clear_screen()
+                print("\nSEARCH QUOTES")
+                print("-" * 50)
+                search_term = input("What are you looking for? (keyword/phrase): ").strip()
+                if search_term:
+                    print("\nWhere to search?")
+                    print("1) All fields")
+                    print("2) Quote text only")
+                    print("3) Author names only")
+                    print("4) Categories only")
+                    print("5) By meaning (closest quotes, not exact words)")
+                    search_choice = input("\nChoose (1-5): ").strip()
+                    search_map = {'1': 'all', '2': 'text', '3': 'author', '4': 'category'}
+                    search_in = search_map.get(search_choice, 'all')
                 
+                    qm.clear_screen()
+                    if search_choice == '5':
+                        if not qm.has_embeddings() and not read_only:
+                            print("Embedding the quotes for semantic search (first time only)...")
+                        try:
+                            results = qm.semantic_search(search_term, 10)
+                        except ValueError as e:
+                            print(f"[X] {e}")
+                            results = []
+                        except (ImportError, OSError) as e:
+                            # sentence-transformers is missing, or the model is not cached locally
+                            print(f"[!] Could not load the embedding model ({e})")
+                            results = []
+                            if read_only:
+                                print(f"[X] {qm.db_name} is open read-only; its embeddings cannot be rebuilt")
+                            else:
+                                print("Falling back to hashing embeddings (the embed command can switch back)...")
+                                qm.build_embeddings('hash')
+                                results = qm.semantic_search(search_term, 10)
+                    else:
+                        results = qm.search_quotes(search_term, search_in)
+                        indexed = qm.has_fuzzy_index()
+                        if not results and (indexed or not read_only):
+                            # Nothing matched exactly: look for near misses
+                            if not indexed:
+                                print("Building the fuzzy search index (first time only)...")
+                            results, suggestion = qm.fuzzy_search(search_term, search_in)
+                            if suggestion:
+                                print(f"[!] No exact matches. Did you mean: {suggestion}?")
+                    if results:
+                        with qm.renderer() as out:
+                            out.heading(f"\nFound {len(results)} matching quotes:", "-" * 75)
+                            out.quotes(results)
+                    else:
+                        print(f"[X] No quotes found matching '{search_term}'")
+                    qm.pause()
+        
+            elif choice == '7':
+                try:
+                    qm.clear_screen()
+                    quote_id = int(input("\nEnter quote ID to ADD to favorites: "))
+                    qm.add_remove_favorite(quote_id, "add")
+                except ValueError:
+                    print("[X] Please enter a valid number!")
+                    time.sleep(2)
+        
+            elif choice == '8':
+                try:
+                    qm.clear_screen()
+                    quote_id = int(input("\nEnter quote ID to REMOVE from favorites: "))
+                    qm.add_remove_favorite(quote_id, "remove")
+                except ValueError:
+                    print("[X] Please enter a valid number!")
+                    time.sleep(2)
+        
+            elif choice == '9':
                 qm.clear_screen()
-                results = qm.search_quotes(search_term, search_in)
-                if results:
-                    print(f"\nFound {len(results)} matching quotes:")
-                    print("-" * 75)
-                    for quote_id, text, author, category, favorite in results:
-                        fav = "[*]" if favorite else "   "
-                        print(f"{fav} #{quote_id} {text}")
-                        print(f"      Author: {author}")
-                        print(f"      Category: {category}")
-                        print()
-                else:
-                    print(f"[X] No quotes found matching '{search_term}'")
-                qm.pause()
+                qm.show_favorites()
         
-        elif choice == '7':
-            try:
+            elif choice == '10':
                 qm.clear_screen()
-                quote_id = int(input("\nEnter quote ID to ADD to favorites: "))
-                qm.add_remove_favorite(quote_id, "add")
-            except ValueError:
-                print("[X] Please enter a valid number!")
-                time.sleep(2)
+                qm.get_statistics()
         
-        elif choice == '8':
-            try:
+            elif choice == '11':
                 qm.clear_screen()
-                quote_id = int(input("\nEnter quote ID to REMOVE from favorites: "))
-                qm.add_remove_favorite(quote_id, "remove")
-            except ValueError:
-                print("[X] Please enter a valid number!")
-                time.sleep(2)
+                print("\nEXPORT QUOTES")
+                format_choice = input("Export format (json/csv/qcol/changes): ").lower()
+                if format_choice in ['json', 'csv', 'qcol']:
+                    filename = input(f"Filename (Enter for auto): ").strip()
+                    qm.export_quotes(format_choice, filename if filename else None)
+                elif format_choice == 'changes':
+                    since_str = input(f"Export changes after watermark (Enter for 0, latest is {qm.get_change_watermark()}): ").strip()
+                    since = int(since_str) if since_str.isdigit() else 0
+                    filename = input(f"Filename (Enter for auto): ").strip()
+                    qm.export_changes(since, filename if filename else None)
+                    qm.pause()
+                else:
+                    print("[X] Invalid format! Choose 'json', 'csv', 'qcol' or 'changes'")
+                    qm.pause()
         
-        elif choice == '9':
-            qm.clear_screen()
-            qm.show_favorites()
+            elif choice == '12':
+                qm.clear_screen()
+                print("\nIMPORT QUOTES")
+                filename = input("Enter file path: ").strip()
+                filename = filename.strip('"').strip("'")
+                if filename:
+                    qm.import_quotes(filename)
+                else:
+                    print("[X] Filename required!")
+                    qm.pause()
         
-        elif choice == '10':
-            qm.clear_screen()
-            qm.get_statistics()
+            elif choice == '13':
+                qm.clear_screen()
+                print("\nBACKUP DATABASE")
+                backup_name = input("Backup filename (Enter for auto): ").strip()
+                qm.backup_database(backup_name if backup_name else None)
         
-        elif choice == '11':
-            qm.clear_screen()
-            print("\nEXPORT QUOTES")
-            format_choice = input("Export format (json/csv): ").lower()
-            if format_choice in ['json', 'csv']:
-                filename = input(f"Filename (Enter for auto): ").strip()
-                qm.export_quotes(format_choice, filename if filename else None)
-            else:
-                print("[X] Invalid format! Choose 'json' or 'csv'")
+            elif choice == '15':
+                qm.bulk_edit()
+
+            elif choice == '16':
+                qm.clear_screen()
+                qm.show_maintenance()
                 qm.pause()
+
+            elif choice == '14':
+                qm.clear_screen()
+                if not read_only:
+                    due = qm.maintenance_due()
+                    if due:
+                        print(f"Running database maintenance ({'; '.join(due)})...")
+                        qm.run_maintenance()    # rolls up the views too
+                    else:
+                        qm.rollup_views()
+                    if os.path.exists(qm.sketch_file):
+                        qm.refresh_sketches()
+                print("\nThank you for using Quotes Manager!")
+                print("Your wisdom has been preserved. Until next time!")
+                break
         
-        elif choice == '12':
-            qm.clear_screen()
-            print("\nIMPORT QUOTES")
-            filename = input("Enter file path: ").strip()
-            filename = filename.strip('"').strip("'")
-            if filename:
-                qm.import_quotes(filename)
             else:
-                print("[X] Filename required!")
-                qm.pause()
-        
-        elif choice == '13':
-            qm.clear_screen()
-            print("\nBACKUP DATABASE")
-            backup_name = input("Backup filename (Enter for auto): ").strip()
-            qm.backup_database(backup_name if backup_name else None)
-        
-        elif choice == '14':
-            qm.clear_screen()
-            print("\nThank you for using Quotes Manager!")
-            print("Your wisdom has been preserved. Until next time!")
-            break
-        
+                print("[X] Invalid choice! Please choose 1-16.")
+                time.sleep(2)
+    finally:
+        qm.close()
+
+
+def run_cli(argv: List[str]) -> int:
+    """Non-interactive entry point: `python QuotesManager.py <command> ...`"""
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='QuotesManager.py', description='Quotes Manager command line')
+    parser.add_argument('--db', default='quotes.db', help='database file (default: quotes.db)')
+    parser.add_argument('--read-only', action='store_true',
+                        help='open the database immutable and memory-mapped; writes are refused')
+    parser.add_argument('--format', default='auto', choices=['auto', 'pretty', 'plain', 'ndjson'],
+                        help='listing format (default: pretty on a terminal, plain when redirected)')
+    parser.add_argument('--collection', help='work on this named collection instead of --db')
+    parser.add_argument('--collections-dir', default='collections',
+                        help='directory of the named collections (default: collections)')
+    commands = parser.add_subparsers(dest='command')
+
+    commands.add_parser('collections', help='list the named collections')
+    search_all_parser = commands.add_parser('search-all', help='search every named collection')
+    search_all_parser.add_argument('term')
+    search_all_parser.add_argument('--in', dest='search_in', default='all',
+                                   choices=['all', 'text', 'author', 'category'], help='fields to search')
+    search_all_parser.add_argument('--only', help='comma-separated collections to search (default: all)')
+    copy_parser = commands.add_parser('copy', help='copy quotes from one named collection to another')
+    copy_parser.add_argument('source')
+    copy_parser.add_argument('target', help='created if it does not exist')
+    add_filter_arguments(copy_parser)
+
+    list_parser = commands.add_parser('list', help='print all quotes or those matching filters')
+    list_parser.add_argument('--limit', type=int, help='only the N most recent quotes')
+    add_filter_arguments(list_parser)
+
+    export_parser = commands.add_parser('export', help='write matching quotes to a JSON, CSV or qcol file')
+    export_parser.add_argument('export_format', metavar='format', choices=EXPORT_FORMATS)
+    export_parser.add_argument('-o', '--output', help='file to write (default: quotes_export_<time>.<format>)')
+    export_parser.add_argument('--columns', help=f"comma-separated columns (default: {', '.join(QUOTE_COLUMNS)})")
+    export_parser.add_argument('--order', help="comma-separated columns, '-' in front for descending (default: id)")
+    export_parser.add_argument('--codec', default='zlib', choices=['zlib', 'lzma', 'none'], help='qcol compression')
+    add_filter_arguments(export_parser)
+
+    random_parser = commands.add_parser('random', help='print a random quote')
+    random_parser.add_argument('--category', help='only pick from this category (a unique prefix is enough)')
+
+    bulk_parser = commands.add_parser('bulk', help='favorite/unfavorite, recategorize, retag or delete many quotes')
+    bulk_parser.add_argument('action', choices=BULK_ACTIONS)
+    bulk_parser.add_argument('value', nargs='?', help='new category/author, or the tag to add/remove')
+    add_filter_arguments(bulk_parser)
+    bulk_parser.add_argument('--dry-run', action='store_true', help='only count the quotes that would change')
+
+    undo_parser = commands.add_parser('undo-bulk', help='undo a bulk operation (default: the latest)')
+    undo_parser.add_argument('operation', nargs='?', type=int)
+
+    maintenance_parser = commands.add_parser('maintenance', help='storage report; ANALYZE, VACUUM and integrity check')
+    maintenance_parser.add_argument('--report', action='store_true', help='only print the report')
+    maintenance_parser.add_argument('--if-due', action='store_true', help='only run when maintenance is due')
+    maintenance_parser.add_argument('--vacuum', default='auto', choices=['auto', 'incremental', 'full', 'none'])
+    maintenance_parser.add_argument('--integrity', default='quick', choices=['quick', 'full', 'none'])
+
+    stats_parser = commands.add_parser('stats', help='collection statistics')
+    stats_mode = stats_parser.add_mutually_exclusive_group()
+    stats_mode.add_argument('--approx', dest='approximate', action='store_const', const=True,
+                            help='sketch-based estimates with error bounds (default from 500,000 quotes)')
+    stats_mode.add_argument('--exact', dest='approximate', action='store_const', const=False)
+    stats_mode.add_argument('--rebuild-sketches', action='store_true', help='rebuild the sketches from the table')
+    stats_parser.add_argument('--top', type=int, default=10, help='heavy hitters to list (approximate mode)')
+
+    views_parser = commands.add_parser('views', help='roll up view events; trending and cold quotes')
+    views_parser.add_argument('--days', type=float, default=7, help='trend window in days (default: 7)')
+    views_parser.add_argument('--top', type=int, default=10, dest='k', help='entries per report (default: 10)')
+
+    complete_parser = commands.add_parser('complete', help='list authors, categories or tags starting with a prefix')
+    complete_parser.add_argument('field', choices=COMPLETION_FIELDS)
+    complete_parser.add_argument('prefix', nargs='?', default='')
+    complete_parser.add_argument('-k', type=int, default=10, help='number of completions (default: 10)')
+
+    search_parser = commands.add_parser('search', help='print the quotes matching a keyword or phrase')
+    search_parser.add_argument('term')
+    search_parser.add_argument('--in', dest='search_in', default='all',
+                               choices=['all', 'text', 'author', 'category'], help='fields to search')
+    search_parser.add_argument('--fuzzy', action='store_true', help='tolerate typos, rank by similarity')
+
+    semantic_parser = commands.add_parser('semantic', help='print the quotes closest in meaning to a phrase')
+    semantic_parser.add_argument('query')
+    semantic_parser.add_argument('--top', dest='k', type=int, default=10, help='number of quotes')
+
+    embed_parser = commands.add_parser('embed', help='embed new and edited quotes for semantic search')
+    embed_parser.add_argument('--model', help="'auto' (default), 'hash', or a sentence-transformers model name")
+    embed_parser.add_argument('--rebuild', action='store_true', help='embed every quote again')
+
+    changes_parser = commands.add_parser('export-changes', help='stream changes after a watermark as NDJSON')
+    changes_parser.add_argument('--since', type=int, default=0, help='last sequence number already synced')
+    changes_parser.add_argument('-o', '--output', default='-', help="output file ('-' for stdout)")
+
+    apply_parser = commands.add_parser('apply-changes', help='apply an NDJSON change feed (idempotent)')
+    apply_parser.add_argument('input', nargs='?', default='-', help="change feed file ('-' for stdin)")
+
+    import_parser = commands.add_parser('import', help='import a JSON, CSV or qcol file; bad records are quarantined')
+    import_parser.add_argument('input', help='file to import')
+    import_parser.add_argument('--quarantine', help='where rejected records go (default: INPUT.rejected.ndjson)')
+    import_parser.add_argument('--restart', action='store_true',
+                               help='import from the start even if an earlier run finished or was interrupted')
+
+    jobs_parser = commands.add_parser('import-jobs', help='list recent imports and where interrupted ones stopped')
+    jobs_parser.add_argument('--limit', type=int, default=10)
+
+    batch_parser = commands.add_parser('add-batch', help='add quotes from plain, "quote — author" or TSV lines')
+    batch_parser.add_argument('input', nargs='?', default='-', help="text or TSV file ('-' for stdin)")
+    batch_parser.add_argument('--author', default='Unknown', help='author for lines without one')
+    batch_parser.add_argument('--category', default='General', help='category for lines without one')
+    batch_parser.add_argument('--tags', default='', help='tags for lines without any')
+
+    commands.add_parser('advise-indexes', help='explain every query and report full scans / temp B-trees')
+    commands.add_parser('normalize', help='move authors and categories into tables keyed by integers')
+    commands.add_parser('watermark', help='print the latest change sequence number')
+    commands.add_parser('prune-changes', help='drop superseded change log entries')
+
+    args = parser.parse_args(argv)
+    if args.collection or args.command in COLLECTION_COMMANDS:
+        from QuotesCollections import CollectionRegistry
+        try:
+            registry = CollectionRegistry(args.collections_dir, read_only=args.read_only)
+            if args.command in COLLECTION_COMMANDS:
+                with registry:
+                    return dispatch_collections_command(registry, args)
+            args.db = registry.path(args.collection)
+        except (ReadOnlyError, ValueError, OSError) as e:
+            print(f"[X] {e}", file=sys.stderr)
+            return 1
+    if args.command is None:
+        main(args.db, args.read_only)
+        return 0
+    qm = QuotesManager(args.db, read_only=args.read_only)
+    qm.output_format = args.format
+
+    try:
+        return dispatch_command(qm, args)
+    except (ReadOnlyError, ValueError, OSError) as e:
+        print(f"[X] {e}", file=sys.stderr)
+        return 1
+    finally:
+        qm.close()
+
+
+COLLECTION_COMMANDS = ('collections', 'search-all', 'copy')
+
+
+def dispatch_collections_command(registry, args) -> int:
+    """Run a run_cli command that spans named collections (see QuotesCollections)"""
+    if args.command == 'collections':
+        for name in registry.names():
+            qm = registry.get(name)
+            with qm._connect() as conn:
+                count = conn.execute(f'SELECT COUNT(*) FROM {qm.base_table}').fetchone()[0]
+            print(f"{name}\t{count} quotes\t{os.path.getsize(registry.path(name)) / 2**20:.2f} MB")
+    elif args.command == 'search-all':
+        from itertools import groupby
+        from QuotesRenderer import QuoteRenderer
+        names = [name.strip() for name in args.only.split(',')] if args.only else None
+        results = registry.search(args.term, args.search_in, names)
+        with QuoteRenderer(format=args.format) as out:
+            for collection, rows in groupby(results, key=lambda row: row[0]):
+                out.quotes((row[1:] for row in rows), collection=collection)
+    elif args.command == 'copy':
+        added, duplicates = registry.copy(args.source, args.target, **filters_from_args(args))
+        print(f"[OK] Copied {added} quotes from {args.source} to {args.target} ({duplicates} already there)")
+    return 0
+
+
+def dispatch_command(qm: QuotesManager, args) -> int:
+    """Run one parsed run_cli command"""
+    if args.command == 'random':
+        quote = qm.fetch_random_quote(qm.resolve_name('category', args.category) if args.category else None)
+        if not quote:
+            print("[X] No quotes available!", file=sys.stderr)
+            return 1
+        print(f"{quote[1]}\n\t- {quote[2]} | Category: {quote[3]}")
+    elif args.command == 'bulk':
+        count = qm.bulk_update(args.action, args.value, args.dry_run, **filters_from_args(args))
+        print(f"[OK] {count} quotes {'would change' if args.dry_run else 'changed'}")
+    elif args.command == 'undo-bulk':
+        restored = qm.undo_bulk(args.operation)
+        print(f"[OK] Restored {restored} quotes" if restored else "[!] Nothing to undo")
+    elif args.command == 'list':
+        qm.render_quotes(args.limit, **filters_from_args(args))
+    elif args.command == 'export':
+        filename = args.output or f"quotes_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{args.export_format}"
+        columns = [column.strip() for column in args.columns.split(',')] if args.columns else None
+        count = qm.write_export(args.export_format, filename, args.codec, columns, args.order,
+                                **filters_from_args(args))
+        if not count:
+            print("[X] No quotes to export!", file=sys.stderr)
+            return 1
+        print(f"[OK] Exported {count} quotes to {filename}")
+    elif args.command == 'stats':
+        if args.rebuild_sketches:
+            qm.refresh_sketches(rebuild=True)
+            print(f"[OK] Sketches written to {qm.sketch_file}")
+        elif args.approximate:
+            qm.show_approximate_statistics(args.top)
         else:
-            print("[X] Invalid choice! Please choose 1-14.")
-            time.sleep(2)
+            qm.print_statistics(args.approximate)
+    elif args.command == 'maintenance':
+        if args.report:
+            qm.show_maintenance(run=False)
+        elif args.if_due and not qm.maintenance_due():
+            print("[OK] Maintenance is not due")
+        else:
+            summary = qm.run_maintenance(args.vacuum, args.integrity)
+            for action in summary['actions']:
+                print(f"[OK] {action}")
+            if summary.get('integrity', ['ok']) != ['ok']:
+                print("[X] Integrity check failed:\n    " + "\n    ".join(summary['integrity']), file=sys.stderr)
+                return 1
+            before, after = summary['before'], summary['after']
+            print(f"[OK] Free pages {before['free_ratio']:.1%} -> {after['free_ratio']:.1%}; "
+                  f"probe latency {sum(summary['latency_before'].values()):.2f} -> "
+                  f"{sum(summary['latency_after'].values()):.2f} ms")
+    elif args.command == 'views':
+        qm.show_engagement(args.days, args.k)
+    elif args.command == 'complete':
+        for name, count in qm.complete(args.field, args.prefix, args.k):
+            print(f"{name}\t{count}")
+    elif args.command == 'search':
+        if args.fuzzy:
+            results, suggestion = qm.fuzzy_search(args.term, args.search_in)
+            if suggestion:
+                print(f"Did you mean: {suggestion}?", file=sys.stderr)
+        else:
+            results = qm.search_quotes(args.term, args.search_in)
+        with qm.renderer() as out:
+            out.quotes(results)
+    elif args.command == 'semantic':
+        results = qm.semantic_search(args.query, args.k)
+        with qm.renderer() as out:
+            out.quotes(results)
+    elif args.command == 'embed':
+        start = time.perf_counter()
+        embedded = qm.build_embeddings(args.model, args.rebuild)
+        model = qm._connect().execute('SELECT model FROM embedding_state').fetchone()[0]
+        print(f"[OK] Embedded {embedded} quotes with {model} in {time.perf_counter() - start:.2f}s")
+    elif args.command == 'export-changes':
+        qm.export_changes(args.since, args.output)
+    elif args.command == 'apply-changes':
+        if args.input == '-':
+            applied, watermark = qm.apply_changes(sys.stdin)
+        else:
+            with open(args.input, 'r', encoding='utf-8') as f:
+                applied, watermark = qm.apply_changes(f)
+        print(f"[OK] Applied {applied} changes (replica now at watermark {watermark})")
+    elif args.command == 'import':
+        qm.print_import_report(qm.import_file(args.input, args.quarantine, args.restart))
+    elif args.command == 'import-jobs':
+        jobs = qm.list_import_jobs(args.limit)
+        if not jobs:
+            print("No imports recorded")
+        for job_id, source, status, record, added, duplicates, rejected, started_at, updated_at in jobs:
+            print(f"#{job_id} {status:<9} {source}")
+            print(f"    started {started_at}, last checkpoint {updated_at}: record {record}, "
+                  f"{added} added, {duplicates} duplicates, {rejected} rejected")
+    elif args.command == 'add-batch':
+        start = time.perf_counter()
+        added, skipped = qm.add_quotes_from_file(args.input, args.author, args.category, args.tags)
+        elapsed = time.perf_counter() - start
+        print(f"[OK] {added} added, {skipped} skipped (duplicates) in {elapsed:.2f}s", file=sys.stderr)
+    elif args.command == 'advise-indexes':
+        qm.show_index_report()
+    elif args.command == 'normalize':
+        if qm.normalize_schema():
+            print("[OK] Database normalized; 'quotes' is now a compatibility view")
+        else:
+            print("[!] Database is already normalized")
+    elif args.command == 'watermark':
+        print(qm.get_change_watermark())
+    elif args.command == 'prune-changes':
+        print(f"[OK] Pruned {qm.prune_changes()} superseded change log entries")
+    return 0
 
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(run_cli(sys.argv[1:]))
     main()
\ No newline at end of file
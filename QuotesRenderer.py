@@ -0,0 +1,193 @@
+"""Buffered rendering of quote listings for terminals and pipes.
+
+Rows are formatted in chunks and each chunk is written with one call, so a
+long listing costs a few hundred writes instead of four per quote. Output
+formats:
+
+    pretty   wrapped to the terminal width, paged when longer than a screen
+    plain    one tab-separated line per quote (#id, text, author, category)
+    ndjson   one JSON object per quote
+
+'auto' picks pretty for a terminal and plain when stdout is redirected.
+"""
+import json
+import os
+import shutil
+import subprocess
+import sys
+from typing import Dict, Iterable, Sequence
+
+FORMATS = ('auto', 'pretty', 'plain', 'ndjson')
+CHUNK_ROWS = 512
+INDENT = ' ' * 6
+
+
+class QuoteRenderer:
+    """Write quotes and text to a stream (default: stdout).
+
+        with QuoteRenderer() as out:
+            out.text("FAVORITE QUOTES:")
+            out.quotes(cursor)
+    """
+
+    def __init__(self, stream=None, format: str = 'auto', width: int = None, pager: bool = None):
+        if format not in FORMATS:
+            raise ValueError(f"Unknown output format: {format}")
+        self.stream = stream or sys.stdout
+        tty = hasattr(self.stream, 'isatty') and self.stream.isatty()
+        self.format = ('pretty' if tty else 'plain') if format == 'auto' else format
+        size = shutil.get_terminal_size()
+        self.width = max(width or size.columns, 40)
+        self.height = size.lines
+        self.pager = (tty and self.format == 'pretty') if pager is None else pager
+        self.stopped = False    # the pager was quit; callers can stop producing rows
+        self._buffer = []
+        self._lines = 0
+        self._pager_process = None
+        self._target = None if self.pager else self.stream
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def text(self, *lines: str):
+        """Headings and messages; left out of ndjson output"""
+        if self.format != 'ndjson':
+            for line in lines:
+                self._buffer.append(line + '\n')
+                self._lines += line.count('\n') + 1
+            self._flush_if_full()
+
+    def heading(self, *lines: str):
+        """Decoration around a quote listing; pretty output only, so plain lines stay one per quote"""
+        if self.format == 'pretty':
+            self.text(*lines)
+
+    def record(self, data: Dict):
+        """One JSON object, in ndjson output only"""
+        if self.format == 'ndjson':
+            self._buffer.append(json.dumps(data, ensure_ascii=False, default=str) + '\n')
+            self._flush_if_full()
+
+    def quotes(self, rows: Iterable[Sequence], favorite: bool = False, collection: str = None) -> int:
+        """Render (id, text, author, category[, favorite]) rows; returns how many were written.
+
+        `favorite` marks rows that have no fifth column. `collection` names
+        the collection the rows come from: a heading in pretty output, a
+        first column in plain output and a field in ndjson output.
+        """
+        count = 0
+        format_row = {'pretty': self._pretty, 'plain': self._plain, 'ndjson': self._ndjson}[self.format]
+        if collection is not None:
+            self.heading(f"[{collection}]")
+            if self.format != 'pretty':
+                format_row = self._labelled(format_row, collection)
+        buffer = self._buffer
+        for row in rows:
+            if self.stopped:
+                break
+            buffer.append(format_row(row, favorite))
+            count += 1
+            if count % CHUNK_ROWS == 0:
+                self.flush()
+        self.flush()
+        return count
+
+    def _labelled(self, format_row, collection: str):
+        if self.format == 'plain':
+            return lambda row, favorite: f"{collection}\t{format_row(row, favorite)}"
+        prefix = '{"collection": ' + json.dumps(collection, ensure_ascii=False) + ', '
+        return lambda row, favorite: prefix + format_row(row, favorite)[1:]
+
+    def _pretty(self, row: Sequence, favorite: bool) -> str:
+        quote_id, text, author, category = row[:4]
+        head = f"{'[*]' if (row[4] if len(row) > 4 else favorite) else '   '} #{quote_id} "
+        line = head + text
+        if len(line) >= self.width or '\n' in text:
+            line = self._wrap(text, head)
+        self._lines += line.count('\n') + 4
+        return f"{line}\n{INDENT}Author: {author}\n{INDENT}Category: {category}\n\n"
+
+    def _wrap(self, text: str, head: str) -> str:
+        """Greedy word wrap: a few str.rfind calls per line, several times quicker than textwrap"""
+        width = self.width - 1
+        lines = []
+        prefix = head
+        for paragraph in text.split('\n'):
+            paragraph = paragraph.expandtabs()
+            while len(prefix) + len(paragraph) > width:
+                room = max(width - len(prefix), 10)
+                cut = paragraph.rfind(' ', 0, room + 1)
+                if cut <= 0:
+                    cut = room  # a word longer than the line
+                lines.append(prefix + paragraph[:cut].rstrip())
+                paragraph = paragraph[cut:].lstrip(' ')
+                prefix = INDENT
+            lines.append(prefix + paragraph)
+            prefix = INDENT
+        return '\n'.join(lines)
+
+    def _plain(self, row: Sequence, favorite: bool) -> str:
+        self._lines += 1
+        return f"#{row[0]}\t{row[1]}\t{row[2]}\t{row[3]}\n"
+
+    def _ndjson(self, row: Sequence, favorite: bool) -> str:
+        self._lines += 1
+        return json.dumps({'id': row[0], 'quote_text': row[1], 'author': row[2], 'category': row[3],
+                           'favorite': bool(row[4] if len(row) > 4 else favorite)}, ensure_ascii=False) + '\n'
+
+    def _flush_if_full(self):
+        if len(self._buffer) >= CHUNK_ROWS:
+            self.flush()
+
+    def flush(self):
+        """Write out the buffered chunk (held back while it may still fit on one screen)"""
+        if not self._buffer:
+            return
+        if self._target is None:
+            if self._lines < self.height - 1:
+                return
+            self._target = self._start_pager()
+        data = ''.join(self._buffer)
+        self._buffer.clear()
+        try:
+            self._target.write(data)
+        except BrokenPipeError:
+            self.stopped = True
+
+    def _start_pager(self):
+        """stdin of a pager ($PAGER, else less), or the stream if there is none"""
+        command = os.environ.get('PAGER') or ('less' if shutil.which('less') else None)
+        if not command:
+            return self.stream
+        self.stream.flush()
+        environment = dict(os.environ)
+        # Quit at once if it fits after all, keep colours, leave the text on screen
+        environment.setdefault('LESS', 'FRX')
+        try:
+            self._pager_process = subprocess.Popen(command, shell=True, stdin=subprocess.PIPE, env=environment,
+                                                   encoding=getattr(self.stream, 'encoding', None) or 'utf-8',
+                                                   errors='replace')
+        except OSError:
+            return self.stream
+        return self._pager_process.stdin
+
+    def close(self):
+        """Write what is left and wait for the pager to be quit"""
+        if self._target is None:
+            self._target = self.stream
+        self.flush()
+        if self._pager_process is not None:
+            try:
+                self._pager_process.stdin.close()
+            except BrokenPipeError:
+                pass
+            self._pager_process.wait()
+            self._pager_process = None
+        else:
+            try:
+                self.stream.flush()
+            except BrokenPipeError:
+                self.stopped = True
@@ -0,0 +1,201 @@
+"""Fixed-size sketches for approximate statistics of very large collections.
+
+HyperLogLog counts distinct authors, categories and tags; a count-min sketch
+with a small candidate set tracks the heaviest authors and categories. All
+of them take the same memory and answer in the same time whatever the
+number of quotes, and can be updated one quote at a time.
+
+QuoteSketches bundles them with the position they cover (the highest quote
+id and change sequence number seen) and is stored in a file next to the
+database:
+
+    b'QSKT' | header length u32 | JSON header | raw arrays, little-endian
+"""
+import hashlib
+import json
+import math
+import os
+import struct
+import sys
+from array import array
+from typing import Dict, Iterable, List, Tuple
+
+MAGIC = b'QSKT'
+HLL_PRECISION = 14           # 2**14 registers: 0.81% standard error, 16 KB
+CMS_WIDTH = 2048             # overestimate at most e/2048 = 0.13% of all quotes ...
+CMS_DEPTH = 5                # ... except with probability e**-5 = 0.67%
+TOP_CAPACITY = 64            # heavy-hitter candidates kept per field
+DISTINCT_FIELDS = ('author', 'category', 'tag')
+HEAVY_FIELDS = ('author', 'category')
+
+
+def _hash(value: str) -> Tuple[int, int]:
+    """Two independent 64-bit hashes of a string"""
+    digest = hashlib.blake2b(value.encode('utf-8'), digest_size=16).digest()
+    return int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little')
+
+
+def _to_bytes(values: array) -> bytes:
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_bytes(typecode: str, data: bytes) -> array:
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+class HyperLogLog:
+    """Distinct-count estimator (Flajolet et al. 2007, with linear counting for small sets)"""
+
+    def __init__(self, precision: int = HLL_PRECISION, registers: array = None):
+        self.precision = precision
+        self.registers = registers if registers is not None else array('B', bytes(1 << precision))
+
+    def add(self, value: str):
+        h, _ = _hash(value)
+        bits = 64 - self.precision
+        index = h >> bits
+        rank = bits - (h & ((1 << bits) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self) -> int:
+        m = len(self.registers)
+        estimate = 0.7213 / (1 + 1.079 / m) * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return round(estimate)
+
+    @property
+    def relative_error(self) -> float:
+        """One standard error, as a fraction of the estimate"""
+        return 1.04 / math.sqrt(len(self.registers))
+
+
+class HeavyHitters:
+    """Count-min sketch (Cormode & Muthukrishnan) plus the TOP_CAPACITY most frequent keys seen.
+
+    Estimates never undercount; they overcount by at most `error_bound`
+    except with probability `failure_probability`.
+    """
+
+    def __init__(self, width: int = CMS_WIDTH, depth: int = CMS_DEPTH, table: array = None,
+                 candidates: Dict[str, int] = None):
+        self.width = width
+        self.depth = depth
+        self.table = table if table is not None else array('q', bytes(8 * width * depth))
+        self.total = 0
+        self.candidates = candidates or {}
+
+    def _cells(self, value: str) -> List[int]:
+        h1, h2 = _hash(value)
+        return [row * self.width + (h1 + row * h2) % self.width for row in range(self.depth)]
+
+    def add(self, value: str, count: int = 1):
+        table = self.table
+        estimate = None
+        for cell in self._cells(value):
+            table[cell] += count
+            estimate = table[cell] if estimate is None else min(estimate, table[cell])
+        self.total += count
+        candidates = self.candidates
+        if value in candidates or len(candidates) < TOP_CAPACITY:
+            candidates[value] = estimate
+        else:
+            smallest = min(candidates, key=candidates.get)
+            if estimate > candidates[smallest]:
+                del candidates[smallest]
+                candidates[value] = estimate
+
+    def estimate(self, value: str) -> int:
+        return min(self.table[cell] for cell in self._cells(value))
+
+    def top(self, k: int = 10) -> List[Tuple[str, int]]:
+        """Up to k (key, estimated count) pairs, most frequent first"""
+        counts = [(value, self.estimate(value)) for value in self.candidates]
+        return sorted(counts, key=lambda item: (-item[1], item[0]))[:k]
+
+    @property
+    def error_bound(self) -> int:
+        return math.ceil(math.e / self.width * self.total)
+
+    @property
+    def failure_probability(self) -> float:
+        return math.exp(-self.depth)
+
+
+class QuoteSketches:
+    """The sketches of one collection and the position they are current to"""
+
+    def __init__(self):
+        self.distinct = {field: HyperLogLog() for field in DISTINCT_FIELDS}
+        self.heavy = {field: HeavyHitters() for field in HEAVY_FIELDS}
+        self.max_id = 0        # highest quote id added
+        self.change_seq = 0    # change log position the counters below cover
+        self.total = 0         # quotes added minus quotes deleted
+        self.drift = 0         # renames and deletes the sketches could not apply
+
+    def add_quote(self, author: str, category: str, tags: Iterable[str]):
+        """Count one quote"""
+        for field, value in (('author', author), ('category', category)):
+            if value:
+                self.distinct[field].add(value)
+                self.heavy[field].add(value)
+        for tag in tags:
+            self.distinct['tag'].add(tag)
+        self.total += 1
+
+    def add_counts(self, field: str, counts: Iterable[Tuple[str, int]]):
+        """Count `count` quotes for each value at once (used when building from GROUP BY results)"""
+        for value, count in counts:
+            if value:
+                self.distinct[field].add(value)
+                if field in self.heavy:
+                    self.heavy[field].add(value, count)
+
+    def save(self, filename: str):
+        """Write the sketches to `filename`, replacing it atomically"""
+        header = {
+            'max_id': self.max_id, 'change_seq': self.change_seq, 'total': self.total, 'drift': self.drift,
+            'distinct': {field: hll.precision for field, hll in self.distinct.items()},
+            'heavy': {field: [hh.width, hh.depth, hh.total, hh.candidates] for field, hh in self.heavy.items()},
+        }
+        data = json.dumps(header).encode('utf-8')
+        temporary = filename + '.tmp'
+        with open(temporary, 'wb') as f:
+            f.write(MAGIC + struct.pack('<I', len(data)) + data)
+            for field in DISTINCT_FIELDS:
+                f.write(_to_bytes(self.distinct[field].registers))
+            for field in HEAVY_FIELDS:
+                f.write(_to_bytes(self.heavy[field].table))
+        os.replace(temporary, filename)
+
+    @classmethod
+    def load(cls, filename: str) -> 'QuoteSketches':
+        """Read sketches written by save(); raises ValueError if the file is not one"""
+        with open(filename, 'rb') as f:
+            prefix = f.read(8)
+            if len(prefix) < 8 or prefix[:4] != MAGIC:
+                raise ValueError("Not a quote sketches file")
+            header = json.loads(f.read(struct.unpack('<I', prefix[4:])[0]).decode('utf-8'))
+            sketches = cls()
+            for name in ('max_id', 'change_seq', 'total', 'drift'):
+                setattr(sketches, name, header[name])
+            for field in DISTINCT_FIELDS:
+                precision = header['distinct'][field]
+                sketches.distinct[field] = HyperLogLog(precision, _from_bytes('B', f.read(1 << precision)))
+            for field in HEAVY_FIELDS:
+                width, depth, total, candidates = header['heavy'][field]
+                table = _from_bytes('q', f.read(8 * width * depth))
+                sketches.heavy[field] = HeavyHitters(width, depth, table, candidates)
+                sketches.heavy[field].total = total
+            if len(sketches.heavy[HEAVY_FIELDS[-1]].table) != width * depth:
+                raise ValueError("Truncated quote sketches file")
+        return sketches
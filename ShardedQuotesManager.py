@@ -0,0 +1,274 @@
+"""Quotes spread over several SQLite files.
+
+Each shard is an ordinary quotes database managed by its own QuotesManager,
+so it can be opened, backed up or exported on its own. Writes are routed to
+one shard by a hash of the quote text (or of its category), and reads fan
+out to every shard on a thread pool and are merged.
+
+Quote ids are global: shard-local id * shard count + shard number, so an id
+alone says which shard holds the quote.
+
+    sqm = ShardedQuotesManager("quotes_shards", shards=4)
+    quote_id = sqm.add_quote("...", "Seneca", "Stoicism")
+    sqm.search_quotes("time")
+"""
+import heapq
+import json
+import os
+import random
+import sqlite3
+import zlib
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from QuotesManager import QuotesManager
+
+MANIFEST = 'shards.json'
+PARTITIONS = ('hash', 'category')
+
+
+class ShardedQuotesManager:
+    def __init__(self, directory: str = "quotes_shards", shards: int = None,
+                 partition: str = None, read_only: bool = False):
+        """Open (or create) a sharded collection in `directory`.
+
+        The shard count and partition scheme are stored in shards.json when the
+        collection is created; reopening it with different values is an error.
+        """
+        self.directory = directory
+        manifest_path = os.path.join(directory, MANIFEST)
+        if os.path.exists(manifest_path):
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            for key, value in (('shards', shards), ('partition', partition)):
+                if value is not None and value != manifest[key]:
+                    raise ValueError(f"{directory} was created with {key}={manifest[key]!r}, not {value!r}")
+        else:
+            manifest = {'shards': shards or 4, 'partition': partition or 'hash'}
+            if manifest['partition'] not in PARTITIONS:
+                raise ValueError(f"Unknown partition scheme: {manifest['partition']!r}")
+            if manifest['shards'] < 1:
+                raise ValueError("A sharded collection needs at least one shard")
+            if read_only:
+                raise FileNotFoundError(f"Sharded collection {directory} not found")
+            os.makedirs(directory, exist_ok=True)
+            with open(manifest_path, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f)
+
+        self.shard_count = manifest['shards']
+        self.partition = manifest['partition']
+        self.shards = [QuotesManager(self.shard_path(i), read_only=read_only)
+                       for i in range(self.shard_count)]
+        self._pool = ThreadPoolExecutor(max_workers=self.shard_count, thread_name_prefix='quotes-shard')
+
+    def close(self):
+        """Stop the fan-out threads, then close every shard's connections, theirs included"""
+        self._pool.shutdown(wait=True)
+        for shard in self.shards:
+            shard.close_all()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ------------------------------------------------------------------
+    # routing
+
+    def shard_path(self, index: int) -> str:
+        """Database file of shard `index`"""
+        return os.path.join(self.directory, f'quotes-{index:02d}.db')
+
+    def shard_for(self, quote: str, category: str = "General") -> int:
+        """Shard that stores a quote; crc32 keeps the mapping stable across runs"""
+        key = category if self.partition == 'category' else quote.strip()
+        return zlib.crc32(key.encode('utf-8')) % self.shard_count
+
+    def global_id(self, index: int, local_id: int) -> int:
+        """Collection-wide id of quote `local_id` in shard `index`"""
+        return local_id * self.shard_count + index
+
+    def locate(self, quote_id: int) -> Tuple[QuotesManager, int]:
+        """(shard, shard-local id) of a global quote id"""
+        return self.shards[quote_id % self.shard_count], quote_id // self.shard_count
+
+    def _fan_out(self, func, *args) -> List:
+        """Run func(index, shard, *args) for every shard on the pool; results in shard order"""
+        return list(self._pool.map(lambda index: func(index, self.shards[index], *args),
+                                   range(self.shard_count)))
+
+    # ------------------------------------------------------------------
+    # writes
+
+    def add_quote(self, quote: str, author: str = "Unknown", category: str = "General",
+                  tags: str = "", source: str = "", year: int = None) -> Optional[int]:
+        """Add a quote to its shard; returns its global id, or None if it already exists in any shard.
+
+        Partitioned by category, the check of the other shards and the insert are
+        separate transactions on separate files: two writers adding the same text
+        under different categories at the same moment can both succeed. Use the
+        hash partition when texts must stay unique under concurrent writers.
+        """
+        if self.partition == 'category' and self._existing_texts([quote.strip()]):
+            return None
+        index = self.shard_for(quote, category)
+        try:
+            local_id = self.shards[index].insert_quote(quote, author, category, tags, source, year)
+        except sqlite3.IntegrityError:
+            return None
+        return self.global_id(index, local_id)
+
+    def add_quotes_batch(self, rows: Iterable[Tuple], chunk_size: int = 50000) -> Tuple[int, int]:
+        """Route (quote, author, category, tags, source, year) rows and insert every shard's share in parallel.
+
+        Each chunk commits once per shard. Returns (added, duplicates). Partitioned
+        by category, texts are checked against every shard before the insert, with
+        the same race against concurrent writers as add_quote.
+        """
+        rows = iter(rows)
+        added = duplicates = 0
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            if self.partition == 'category':
+                # A text's shard depends on its category, so the shard's UNIQUE index cannot
+                # catch it under another category: drop texts stored in any shard, and repeats
+                existing = self._existing_texts(list({row[0].strip() for row in chunk}))
+                unique = []
+                for row in chunk:
+                    text = row[0].strip()
+                    if text not in existing:
+                        existing.add(text)
+                        unique.append(row)
+                duplicates += len(chunk) - len(unique)
+                chunk = unique
+            routed = [[] for _ in self.shards]
+            for row in chunk:
+                routed[self.shard_for(row[0], row[2])].append(row)
+            for shard_added, shard_duplicates in self._fan_out(
+                    lambda index, shard: shard.add_quotes_batch(routed[index])):
+                added += shard_added
+                duplicates += shard_duplicates
+        return added, duplicates
+
+    def _existing_texts(self, texts: List[str]) -> set:
+        """The quote texts among `texts` already stored in some shard"""
+        payload = json.dumps(texts)
+
+        def lookup(index, shard):
+            with shard.connection() as conn:
+                return [text for text, in conn.execute(
+                    f'SELECT quote_text FROM {shard.base_table} '
+                    f'WHERE quote_text IN (SELECT value FROM json_each(?))', (payload,))]
+        return {text for found in self._fan_out(lookup) for text in found}
+
+    def set_favorite(self, quote_id: int, action: str = "toggle") -> Optional[int]:
+        """Add, remove or toggle a favorite; returns the new status, or None if not found"""
+        shard, local_id = self.locate(quote_id)
+        result = shard.set_favorite(local_id, action)
+        return result[1] if result else None
+
+    def delete_quote(self, quote_id: int) -> bool:
+        """Delete a quote without confirmation; returns False if it did not exist"""
+        shard, local_id = self.locate(quote_id)
+        return shard.remove_quote(local_id)
+
+    # ------------------------------------------------------------------
+    # reads
+
+    def get_quote(self, quote_id: int) -> Optional[Tuple]:
+        """Return (id, quote_text, author, category, favorite) of one quote"""
+        shard, local_id = self.locate(quote_id)
+        with shard.connection() as conn:
+            row = conn.execute('SELECT id, quote_text, author, category, favorite FROM quotes WHERE id = ?',
+                               (local_id,)).fetchone()
+        return (quote_id,) + row[1:] if row else None
+
+    def search_quotes(self, search_term: str, search_in: str = "all") -> List[Tuple]:
+        """Search every shard in parallel; results are ordered by global id"""
+        def search(index, shard):
+            return [(self.global_id(index, row[0]),) + row[1:]
+                    for row in shard.search_quotes(search_term, search_in)]
+        # Each shard's rows are sorted by local id, hence by global id too
+        return list(heapq.merge(*self._fan_out(search)))
+
+    def shard_sizes(self, category: str = None) -> List[int]:
+        """Number of quotes (optionally of one category) in each shard"""
+        def count(index, shard):
+            with shard.connection() as conn:
+                if category is None:
+                    return conn.execute(f'SELECT COUNT(*) FROM {shard.base_table}').fetchone()[0]
+                return conn.execute('SELECT COUNT(*) FROM quotes WHERE category = ?', (category,)).fetchone()[0]
+        return self._fan_out(count)
+
+    def fetch_random_quote(self, category: str = None) -> Optional[Tuple]:
+        """Return a uniformly random (id, quote_text, author, category) and count the view.
+
+        The shard is drawn with probability proportional to its size, so every
+        quote is equally likely however unevenly the shards are filled.
+        """
+        if category is not None and self.partition == 'category':
+            index = self.shard_for('', category)
+        else:
+            sizes = self.shard_sizes(category)
+            if not any(sizes):
+                return None
+            index = random.choices(range(self.shard_count), weights=sizes)[0]
+        quote = self.shards[index].fetch_random_quote(category)
+        return (self.global_id(index, quote[0]),) + quote[1:] if quote else None
+
+    def collect_statistics(self) -> Dict:
+        """The figures of QuotesManager.collect_statistics, merged over all shards"""
+        parts = self._fan_out(lambda index, shard: (index, shard.collect_statistics()))
+        authors, categories = Counter(), Counter()
+        stats = {'total': 0, 'favorites': 0, 'most_viewed': None}
+        for index, part in parts:
+            stats['total'] += part['total']
+            stats['favorites'] += part['favorites']
+            authors.update(dict(part['all_authors']))
+            categories.update(dict(part['all_categories']))
+            viewed = part['most_viewed']
+            if viewed and (stats['most_viewed'] is None or viewed[3] > stats['most_viewed'][3]):
+                stats['most_viewed'] = (self.global_id(index, viewed[0]),) + tuple(viewed[1:])
+
+        # Distinct counts cannot be added up; recount them from the merged groups
+        stats['known_authors'] = sum(1 for author in authors if author != 'Unknown')
+        stats['unknown_authors'] = authors.get('Unknown', 0)
+        stats['categories'] = len(categories)
+        stats['all_authors'] = sorted(authors.items(), key=lambda item: (-item[1], item[0]))
+        stats['all_categories'] = sorted(categories.items(), key=lambda item: (-item[1], item[0]))
+        return stats
+
+    # ------------------------------------------------------------------
+    # per-shard maintenance
+
+    def backup_shards(self, directory: str) -> List[str]:
+        """Copy every shard into `directory` with SQLite's online backup; returns the files written"""
+        os.makedirs(directory, exist_ok=True)
+
+        def backup(index, shard):
+            target = os.path.join(directory, os.path.basename(self.shard_path(index)))
+            with sqlite3.connect(target) as destination:
+                shard.connection().backup(destination)
+            destination.close()
+            return target
+
+        paths = self._fan_out(backup)
+        with open(os.path.join(directory, MANIFEST), 'w', encoding='utf-8') as f:
+            json.dump({'shards': self.shard_count, 'partition': self.partition}, f)
+        return paths
+
+    def export_shards(self, format: str = "json", directory: str = None) -> Dict[str, int]:
+        """Export each shard to its own JSON or CSV file; returns {filename: quotes written}"""
+        directory = directory or self.directory
+        os.makedirs(directory, exist_ok=True)
+
+        def export(index, shard):
+            filename = os.path.join(directory, f'quotes-{index:02d}.{format}')
+            return filename, shard.write_export(format, filename)
+
+        return dict(self._fan_out(export))
@@ -0,0 +1,12 @@
+"""Tests for Quotes Manager.
+
+The property checks run every fast path against the reference implementation
+it replaces, on several seeded synthetic corpora; the load tests drive
+concurrent readers and writers. Standard library only:
+
+    python -m unittest discover tests
+    QUOTES_TEST_SEEDS=7,42 python -m unittest tests.test_layouts
+
+Seeds are drawn at random on each run unless QUOTES_TEST_SEEDS is set; a
+failing check names its seed, so it can be replayed.
+"""
@@ -0,0 +1,46 @@
+"""AsyncQuotesManager: batched writes and reads, and close() leaves no connection open"""
+import asyncio
+import os
+import random
+import sqlite3
+import tempfile
+import unittest
+
+from AsyncQuotesManager import AsyncQuotesManager
+from tests.corpus import SEEDS
+
+
+class AsyncTests(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.workdir.cleanup)
+
+    def test_close_leaves_no_connection_open(self):
+        for seed in SEEDS:
+            with self.subTest(seed=seed):
+                connections = asyncio.run(self.session(seed))
+                self.assertTrue(connections)
+                for conn in connections:
+                    # The reader threads' connections of the wrapped QuotesManager included
+                    with self.assertRaises(sqlite3.ProgrammingError):
+                        conn.execute('SELECT 1')
+
+    async def session(self, seed: int) -> list:
+        rng = random.Random(seed)
+        aqm = AsyncQuotesManager(os.path.join(self.workdir.name, f'async-{seed}.db'), readers=3)
+        authors = [f'Author {n}' for n in range(5)]
+        ids = await asyncio.gather(*(aqm.add_quote(f'Async quote {seed} {n}.', rng.choice(authors), 'Async')
+                                     for n in range(100)))
+        self.assertEqual(100, len(set(ids) - {None}))
+        completions = await asyncio.gather(*(aqm.complete('author', 'auth') for _ in range(6)))
+        self.assertEqual(100, sum(count for _, count in completions[0]))
+        export = os.path.join(self.workdir.name, f'async-{seed}.json')
+        self.assertEqual(100, await aqm.export_quotes('json', export))
+        connections = list(aqm._qm._connections) + list(aqm._connections)
+        await aqm.close()
+        self.assertEqual([], aqm._qm._connections)
+        return connections
+
+
+if __name__ == '__main__':
+    unittest.main()
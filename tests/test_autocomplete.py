@@ -0,0 +1,44 @@
+"""CompletionIndex: rankings kept exact through count changes, and a bounded cache"""
+import random
+import unittest
+from collections import Counter
+
+from QuotesAutocomplete import CACHE_SIZE, TOP_COMPLETIONS, CompletionIndex
+from tests.corpus import SEEDS
+
+
+class CompletionIndexTests(unittest.TestCase):
+    def test_rankings_follow_count_changes(self):
+        for seed in SEEDS:
+            with self.subTest(seed=seed):
+                rng = random.Random(seed)
+                names = [f'{rng.choice("aAbBcé")}{rng.choice("xyz")}{n}' for n in range(300)]
+                counts = Counter({name: rng.randint(1, 20) for name in rng.sample(names, 150)})
+                index = CompletionIndex(counts.items())
+                prefixes = ['', 'a', 'B', 'é', 'ax', 'cz1', 'q']
+                wrong = []
+                for step in range(2000):
+                    name = rng.choice(names)
+                    delta = rng.choice([1, 1, 2, 5, -1, -3]) if counts[name] else rng.randint(1, 3)
+                    delta = max(delta, -counts[name])
+                    index.adjust(name, delta)
+                    counts[name] += delta
+                    prefix, k = rng.choice(prefixes), rng.choice([1, 5, TOP_COMPLETIONS, TOP_COMPLETIONS + 5])
+                    expected = sorted(((name, count) for name, count in counts.items()
+                                       if count > 0 and name.casefold().startswith(prefix.casefold())),
+                                      key=lambda item: (-item[1], item[0]))[:k]
+                    if index.complete(prefix, k) != expected:
+                        wrong.append((step, prefix, k))
+                self.assertEqual([], wrong[:3])
+
+    def test_cache_is_bounded(self):
+        index = CompletionIndex((f'name {n}', n % 7 + 1) for n in range(1000))
+        for n in range(CACHE_SIZE * 2):
+            index.complete(f'name {n}', 3)
+        self.assertEqual(CACHE_SIZE, len(index._cache))
+        self.assertNotIn(('name 0', 3), index._cache)    # least recently used first out
+        self.assertIn((f'name {CACHE_SIZE * 2 - 1}', 3), index._cache)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+"""The .qcol reader rejects damaged files with ValueError, and the writer names bad columns"""
+import io
+import random
+import unittest
+
+from QuotesColumnar import ColumnarReader, write_columnar
+from tests.corpus import SEEDS, edge_case_quotes
+
+COLUMNS = ['quote_text', 'author', 'category', 'tags', 'source', 'year']
+
+
+def columnar_file(seed: int, codec: str) -> bytes:
+    f = io.BytesIO()
+    write_columnar(f, COLUMNS, edge_case_quotes(300, seed), codec, chunk_rows=100)
+    return f.getvalue()
+
+
+def read_all(data: bytes) -> list:
+    return list(ColumnarReader(io.BytesIO(data)).rows())
+
+
+class ColumnarTests(unittest.TestCase):
+    def test_round_trip(self):
+        for seed in SEEDS:
+            for codec in ('none', 'zlib', 'lzma'):
+                with self.subTest(seed=seed, codec=codec):
+                    self.assertEqual(list(edge_case_quotes(300, seed)), read_all(columnar_file(seed, codec)))
+
+    def test_truncated_file(self):
+        for seed in SEEDS:
+            for codec in ('none', 'zlib', 'lzma'):
+                with self.subTest(seed=seed, codec=codec):
+                    data = columnar_file(seed, codec)
+                    for cut in [5, 1] + random.Random(seed).sample(range(10, len(data) - 1), 20):
+                        with self.assertRaises(ValueError, msg=f'last {cut} bytes cut off'):
+                            read_all(data[:-cut])
+
+    def test_corrupt_payload(self):
+        for seed in SEEDS:
+            for codec in ('zlib', 'lzma'):
+                with self.subTest(seed=seed, codec=codec):
+                    data = bytearray(columnar_file(seed, codec))
+                    rng = random.Random(seed)
+                    for position in rng.sample(range(len(data) - 200, len(data)), 10):
+                        damaged = bytearray(data)
+                        damaged[position] ^= 0xFF
+                        try:
+                            read_all(bytes(damaged))
+                        except ValueError:
+                            pass    # anything else escaping is the failure
+
+    def test_unknown_codec(self):
+        data = bytearray(columnar_file(0, 'zlib'))
+        data[5] = 9
+        with self.assertRaisesRegex(ValueError, 'Unsupported columnar codec 9'):
+            read_all(bytes(data))
+
+    def test_non_integer_year(self):
+        with self.assertRaisesRegex(ValueError, "'year'"):
+            write_columnar(io.BytesIO(), COLUMNS, [('Text', 'Author', 'General', '', '', 'nineteen')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+"""Importing damaged files from the menu reports the problem and leaves the menu running"""
+import io
+import os
+import random
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from QuotesBenchmark import quiet
+from QuotesManager import QuotesManager
+from tests.corpus import SEEDS, build_flat
+
+
+class DamagedImportTests(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.workdir.cleanup)
+        self.target = quiet(QuotesManager(os.path.join(self.workdir.name, 'target.db')))
+        self.addCleanup(self.target.close)
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.workdir.name, name)
+
+    def menu_import(self, filename: str) -> str:
+        """What the menu's import option prints; any exception escaping it fails the test"""
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.target.import_quotes(filename)
+        return output.getvalue()
+
+    def damaged_files(self, seed: int):
+        """(label, file) pairs: exports cut short or overwritten, and CSV files the csv module rejects"""
+        source = build_flat(self.path(f'source-{seed}.db'), seed, rows=300)
+        rng = random.Random(seed)
+        for format, codec in (('qcol', 'zlib'), ('qcol', 'lzma'), ('qcol', 'none'), ('json', None), ('csv', None)):
+            export = self.path(f'export-{seed}-{codec or format}.{format}')
+            source.write_export(format, export, codec or 'zlib')
+            with open(export, 'rb') as f:
+                data = f.read()
+            truncated = self.path(f'truncated-{seed}-{codec or format}.{format}')
+            with open(truncated, 'wb') as f:
+                f.write(data[:-5])
+            yield f'{codec or format}, last 5 bytes cut off', truncated
+            damaged = bytearray(data)
+            for position in rng.sample(range(len(data) // 2, len(data)), 8):
+                damaged[position] = rng.randrange(256)
+            overwritten = self.path(f'damaged-{seed}-{codec or format}.{format}')
+            with open(overwritten, 'wb') as f:
+                f.write(bytes(damaged))
+            yield f'{codec or format}, 8 bytes overwritten', overwritten
+        source.close()
+        header = self.path(f'header-{seed}.csv')
+        with open(header, 'w', encoding='utf-8') as f:
+            f.write('quote_text,"' + 'x' * 200_000 + f'"\nSome quote ({seed}),x\n')
+        yield 'csv header over the field size limit', header
+        row = self.path(f'row-{seed}.csv')
+        with open(row, 'w', encoding='utf-8') as f:
+            f.write('quote_text,author\n"' + 'y' * 200_000 + f'",Someone\nA fine quote ({seed}).,Someone\n')
+        yield 'csv row over the field size limit', row
+
+    def test_menu_survives_damaged_files(self):
+        for seed in SEEDS:
+            for label, filename in self.damaged_files(seed):
+                with self.subTest(seed=seed, file=label):
+                    output = self.menu_import(filename)
+                    self.assertRegex(output, r'\[X\] Import failed|\[OK\] Import complete')
+                    # And the manager carries on: the next write works
+                    with redirect_stdout(io.StringIO()):
+                        self.assertIsNotNone(self.target.add_quote(f'Still working after {label} ({seed}).'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+"""Read paths of every layout against the flat table and plain scans of its rows"""
+import json
+import os
+import random
+import tempfile
+import unittest
+from collections import Counter
+
+from tests.corpus import EDGE_WORDS, SEEDS, Layouts, comparable_statistics, first_difference
+
+
+class LayoutTests(unittest.TestCase):
+    """Read-only checks; the corpora are built once per seed and shared"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.workdir = tempfile.TemporaryDirectory()
+        cls.layouts = {}
+        for seed in SEEDS:
+            workdir = os.path.join(cls.workdir.name, str(seed))
+            os.makedirs(workdir)
+            cls.layouts[seed] = Layouts(workdir, seed)
+
+    @classmethod
+    def tearDownClass(cls):
+        for layouts in cls.layouts.values():
+            layouts.close()
+        cls.workdir.cleanup()
+
+    def search_terms(self, layouts, rng):
+        all_rows = layouts.all_rows
+        words = [word for text in rng.sample([row[1] for row in all_rows], 20) for word in text.split()[:2]]
+        names = [row[2] for row in rng.sample(all_rows, 10)] + [row[3] for row in rng.sample(all_rows, 5)]
+        return sorted(set(words + names + list(EDGE_WORDS) + ['', '%', '_', "'", 'no such phrase', 'e']))
+
+    def test_search_matches_plain_scan(self):
+        columns = {'all': (1, 2, 3, 4), 'text': (1,), 'author': (2,), 'category': (3,)}
+        for seed, layouts in self.layouts.items():
+            with self.subTest(seed=seed):
+                # LIKE folds ASCII only, and treats % and _ as wildcards
+                terms = [term for term in self.search_terms(layouts, random.Random(seed))
+                         if term.isascii() and '%' not in term and '_' not in term]
+                for term in terms:
+                    for field, searched in columns.items():
+                        needle = term.lower()
+                        scanned = sorted(row[:4] + row[5:] for row in layouts.all_rows
+                                         if any(needle in (row[c] or '').lower() for c in searched))
+                        actual = layouts.flat.search_quotes(term, field)
+                        self.assertEqual(scanned, actual, f'{term!r} in {field}: {first_difference(scanned, actual)}')
+
+    def test_layouts_search_like_flat(self):
+        for seed, layouts in self.layouts.items():
+            with self.subTest(seed=seed):
+                for term in self.search_terms(layouts, random.Random(seed)):
+                    for field in ('all', 'text', 'author', 'category'):
+                        expected = layouts.flat.search_quotes(term, field)
+                        label = f'{term!r} in {field}'
+                        actual = layouts.normalized.search_quotes(term, field)
+                        self.assertEqual(expected, actual, f'normalized, {label}: {first_difference(expected, actual)}')
+                        actual = sorted(row[1:] for row in layouts.sharded.search_quotes(term, field))
+                        unsharded = sorted(row[1:] for row in expected)
+                        self.assertEqual(unsharded, actual, f'sharded, {label}: {first_difference(unsharded, actual)}')
+                        actual = [row[1:] for row in layouts.registry.search(term, field)]
+                        self.assertEqual(expected, actual, f'collections, {label}: {first_difference(expected, actual)}')
+
+    def test_statistics_match_plain_count(self):
+        for seed, layouts in self.layouts.items():
+            with self.subTest(seed=seed):
+                all_rows = layouts.all_rows
+                reference = layouts.flat.collect_statistics()
+                authors = Counter(row[2] for row in all_rows)
+                categories = Counter(row[3] for row in all_rows)
+                scanned = {'total': len(all_rows), 'favorites': sum(row[5] for row in all_rows),
+                           'known_authors': sum(1 for author in authors if author != 'Unknown'),
+                           'unknown_authors': authors['Unknown'], 'categories': len(categories),
+                           'all_authors': sorted(authors.items(), key=lambda item: (-item[1], item[0])),
+                           'all_categories': sorted(categories.items(), key=lambda item: (-item[1], item[0]))}
+                self.assertEqual(scanned, {key: reference[key] for key in scanned})
+
+    def test_layouts_statistics_like_flat(self):
+        for seed, layouts in self.layouts.items():
+            with self.subTest(seed=seed):
+                reference = comparable_statistics(layouts.flat.collect_statistics())
+                for layout, manager in (('normalized', layouts.normalized), ('sharded', layouts.sharded)):
+                    self.assertEqual(reference, comparable_statistics(manager.collect_statistics()), layout)
+
+    def test_sketches_within_stated_error(self):
+        for seed, layouts in self.layouts.items():
+            with self.subTest(seed=seed):
+                all_rows, flat = layouts.all_rows, layouts.flat
+                sketched = flat.approximate_statistics(k=10)
+                authors = Counter(row[2] for row in all_rows)
+                categories = Counter(row[3] for row in all_rows)
+                tags = Counter(tag for row in all_rows for tag in set(flat._split_tags(row[4])))
+                for field, exact in (('author', len(authors)), ('category', len(categories)), ('tag', len(tags))):
+                    estimate, error = sketched['distinct'][field]
+                    self.assertLessEqual(abs(estimate - exact), max(error, 1),
+                                         f'distinct {field}: {estimate} +/- {error}, exact {exact}')
+                for field, exact in (('author', authors), ('category', categories)):
+                    top = sketched['top'][field]
+                    # Count-min never undercounts, and overcounts at most the stated bound
+                    wrong = [(name, count, exact[name]) for name, count in top['counts']
+                             if not exact[name] <= count <= exact[name] + top['overcount']]
+                    self.assertEqual([], wrong, f'top {field}')
+
+    def test_complete_matches_scan(self):
+        for seed, layouts in self.layouts.items():
+            with self.subTest(seed=seed):
+                for layout, manager in (('flat', layouts.flat), ('normalized', layouts.normalized)):
+                    self.assertEqual([], completion_mismatches(manager, random.Random(seed)), layout)
+
+    def test_filtered_export(self):
+        # Selection, projection and order pushed into SQL match filtering every row
+        for seed, layouts in self.layouts.items():
+            with self.subTest(seed=seed):
+                category = random.Random(seed).choice(sorted({row[3] for row in layouts.all_rows}))
+                expected = sorted(([quote_id, text] for quote_id, text, _, row_category, _, favorite
+                                   in layouts.all_rows if row_category == category and not favorite), reverse=True)
+                for layout, manager in (('flat', layouts.flat), ('normalized', layouts.normalized)):
+                    export = os.path.join(self.workdir.name, str(seed), f'filtered-{layout}.json')
+                    count = manager.write_export('json', export, columns=['id', 'quote_text'], order_by='-id',
+                                                 category=category, favorite=False)
+                    actual = []
+                    if count:
+                        with open(export, encoding='utf-8') as f:
+                            actual = [[item['id'], item['quote_text']] for item in json.load(f)]
+                    self.assertEqual(expected, actual, f'{layout}, {category!r}: {first_difference(expected, actual)}')
+
+
+def completion_mismatches(manager, rng: random.Random) -> list:
+    """(field, prefix) pairs whose completions differ from a count over the stored names"""
+    with manager._connect() as conn:
+        current = conn.execute('SELECT author, category, tags FROM quotes').fetchall()
+    counts = {'author': Counter(row[0] for row in current), 'category': Counter(row[1] for row in current),
+              'tag': Counter(tag for row in current for tag in set(manager._split_tags(row[2])))}
+    wrong = []
+    for field, names in counts.items():
+        prefixes = {''} | {name[:length] for name in rng.sample(sorted(names), min(len(names), 15))
+                           for length in (1, 2, 4)}
+        prefixes |= {prefix.swapcase() for prefix in list(prefixes)} | {'zzz', 'é'}
+        for prefix in sorted(prefixes):
+            expected = sorted(((name, count) for name, count in names.items()
+                               if name and count > 0 and name.casefold().startswith(prefix.casefold())),
+                              key=lambda item: (-item[1], item[0]))[:10]
+            if manager.complete(field, prefix, 10) != expected:
+                wrong.append((field, prefix))
+    return wrong
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,179 @@
+"""Load tests: concurrent readers and writers on one database, against p99 latency budgets,
+then a writer committing while long exports run in another process"""
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+from QuotesBenchmark import CATEGORIES, WORDS, build_corpus, quiet
+from tests.corpus import SEEDS
+
+LOAD_ROWS = int(os.environ.get('QUOTES_LOAD_ROWS', 20_000))
+LOAD_SECONDS = float(os.environ.get('QUOTES_LOAD_SECONDS', 3))
+LOAD_READERS = 4
+LOAD_WRITERS = 2
+# p99 latency budgets (ms), generous enough for a single core shared by every thread up
+# to 100,000 rows. complete rebuilds its index after each batch insert, and random counts
+# a view (a write), so both wait on the writers now and then.
+LOAD_BUDGETS = {'search': 2500, 'random': 2500, 'statistics': 4000, 'complete': 3000,
+                'add': 2500, 'favorite': 2500}
+LOAD_WRITE_INTERVAL = 0.05    # writers pause this long between operations, as users do
+# Writer throughput while a long export runs, as a share of the throughput without one. Commits
+# get slower, not blocked: while the export's snapshot is open the WAL cannot be checkpointed,
+# so it grows (about 85% of the throughput with an idle snapshot held). Checked only with two
+# or more CPUs: on one core the export also takes the writer's CPU and it falls to about half.
+LOAD_EXPORT_THROUGHPUT = 0.75
+LOAD_EXPORT_BATCH = 10
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'QuotesManager.py')
+
+
+class LoadTests(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.workdir.cleanup)
+
+    def corpus(self, seed: int):
+        db_name = os.path.join(self.workdir.name, f'load-{seed}.db')
+        qm = quiet(build_corpus(db_name, LOAD_ROWS, seed))
+        self.addCleanup(qm.close)
+        return qm
+
+    def test_readers_and_writers_within_budgets(self):
+        for seed in SEEDS:
+            with self.subTest(seed=seed):
+                self.run_mixed_load(self.corpus(seed), seed)
+
+    def run_mixed_load(self, qm, seed: int):
+        latencies = {name: [] for name in LOAD_BUDGETS}
+        errors, mixed = [], []
+        stop = threading.Event()
+
+        def statistics():
+            # One snapshot: the totals agree with the per-author and per-category counts
+            stats = qm.collect_statistics()
+            by_author = sum(count for _, count in stats['all_authors'])
+            by_category = sum(count for _, count in stats['all_categories'])
+            if not stats['total'] == by_author == by_category:
+                mixed.append((stats['total'], by_author, by_category))
+
+        def reader(n):
+            rng = random.Random(seed + n)
+            run(rng, [('search', lambda: qm.search_quotes(rng.choice(WORDS), 'text')),
+                      ('random', lambda: qm.fetch_random_quote(rng.choice(CATEGORIES))),
+                      ('statistics', statistics),
+                      ('complete', lambda: qm.complete('author', rng.choice('AUTU'), 10))])
+
+        def writer(n):
+            rng = random.Random(seed + 100 + n)
+            counter = iter(range(10 ** 9))
+
+            def favorite():
+                with qm._connect() as conn:
+                    qm._set_favorite(conn.cursor(), rng.randint(1, LOAD_ROWS), 'toggle')
+
+            run(rng, [('add', lambda: qm.add_quotes_batch([(f'Load writer {n} quote {next(counter)}.', 'Loader',
+                                                            'Load', '', '', None) for _ in range(10)])),
+                      ('favorite', favorite)], LOAD_WRITE_INTERVAL)
+
+        def run(rng, operations, pause=0.0):
+            while not stop.wait(pause):
+                name, operation = rng.choice(operations)
+                start = time.perf_counter()
+                try:
+                    operation()
+                except sqlite3.Error as e:
+                    errors.append(f'{name}: {e}')
+                    continue
+                latencies[name].append(time.perf_counter() - start)
+            qm.close()
+
+        threads = ([threading.Thread(target=reader, args=(n,)) for n in range(LOAD_READERS)]
+                   + [threading.Thread(target=writer, args=(n,)) for n in range(LOAD_WRITERS)])
+        for thread in threads:
+            thread.start()
+        time.sleep(LOAD_SECONDS)
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual([], errors[:1], f'{len(errors)} operations failed')
+        self.assertEqual([], mixed[:1], 'statistics (total, by author, by category) that do not add up')
+        for name, budget in LOAD_BUDGETS.items():
+            samples = sorted(latencies[name])
+            self.assertTrue(samples, f'{name}: no operation finished')
+            p99 = samples[min(int(len(samples) * 0.99), len(samples) - 1)] * 1000
+            self.assertLessEqual(p99, budget, f'{name}: p99 {p99:.1f} ms over the {budget} ms budget')
+
+    def test_writer_during_exports(self):
+        # The export reads one snapshot and commits carry on around it. One writer, so a slow
+        # commit can only be waiting on the export.
+        for seed in SEEDS:
+            with self.subTest(seed=seed):
+                self.run_export_load(self.corpus(seed))
+
+    def run_export_load(self, qm):
+        errors = []
+
+        def write_batches(deadline, commits):
+            counter = iter(range(10 ** 9))
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    qm.add_quotes_batch([(f'Export-time quote {next(counter)} {start}.', 'Exporter', 'Load',
+                                          '', '', None) for _ in range(LOAD_EXPORT_BATCH)])
+                except sqlite3.Error as e:
+                    errors.append(f'add during export: {e}')
+                    continue
+                commits.append(time.perf_counter() - start)
+            qm.close()
+
+        def export_until(deadline, exports):
+            # In its own process at low priority, as a scheduled export would run, so it takes
+            # idle CPU rather than the writer's, and not the GIL
+            command = [sys.executable, SCRIPT, '--db', qm.db_name, 'export', 'json', '-o',
+                       os.path.join(self.workdir.name, 'load-export.json')]
+            background = (lambda: os.nice(10)) if hasattr(os, 'nice') else None
+            while time.perf_counter() < deadline:
+                before = qm._connect().execute('SELECT MAX(id) FROM quotes').fetchone()[0]
+                start = time.perf_counter()
+                result = subprocess.run(command, capture_output=True, text=True, preexec_fn=background)
+                exports.append((int(result.stdout.split()[2]) if result.returncode == 0 else -1, before,
+                                time.perf_counter() - start))
+            qm.close()
+
+        phase = LOAD_SECONDS
+        throughput, slowest, exports = [], [], []
+        for with_export in (False, True):
+            commits = []
+            deadline = time.perf_counter() + phase
+            threads = [threading.Thread(target=write_batches, args=(deadline, commits))]
+            if with_export:
+                threads.append(threading.Thread(target=export_until, args=(deadline, exports)))
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            throughput.append(len(commits) / phase)
+            slowest.append(max(commits, default=0))
+
+        self.assertEqual([], errors[:1], f'{len(errors)} writes failed')
+        longest = max(elapsed for _, _, elapsed in exports)
+        self.assertLess(slowest[1], longest / 4,
+                        f'a commit waited for an export: slowest {slowest[1]:.2f} s, export {longest:.2f} s')
+        # Batches commit whole, and every quote committed before an export started is in it
+        torn = [(count, before) for count, before, _ in exports
+                if (count - LOAD_ROWS) % LOAD_EXPORT_BATCH or count < before]
+        self.assertEqual([], torn[:1], f'{len(torn)} exports (count, max id at start) not of one moment')
+        if (os.cpu_count() or 1) > 1:
+            ratio = throughput[1] / throughput[0]
+            self.assertGreaterEqual(ratio, LOAD_EXPORT_THROUGHPUT,
+                                    f'writer throughput during exports is {ratio:.0%} of that without')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+"""maintenance_due: new and upgraded databases start from a baseline, not from a due run"""
+import os
+import tempfile
+import unittest
+
+from QuotesBenchmark import quiet
+from QuotesManager import MAINTENANCE_MIN_CHANGES, QuotesManager
+from tests.corpus import SEEDS, build_flat
+
+
+class MaintenanceTests(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.workdir.cleanup)
+
+    def test_new_database_not_due(self):
+        qm = quiet(QuotesManager(os.path.join(self.workdir.name, 'new.db')))
+        self.addCleanup(qm.close)
+        self.assertEqual([], qm.maintenance_due())
+
+    def test_upgraded_database_not_due_until_changed(self):
+        for seed in SEEDS:
+            with self.subTest(seed=seed):
+                qm = build_flat(os.path.join(self.workdir.name, f'upgraded-{seed}.db'), seed)
+                with qm._connect() as conn:
+                    conn.execute('DROP TABLE maintenance_log')
+                    conn.execute('PRAGMA user_version = 3')
+                qm.close()
+                upgraded = quiet(QuotesManager(qm.db_name))
+                self.addCleanup(upgraded.close)
+                self.assertEqual([], upgraded.maintenance_due())
+                upgraded.add_quotes_batch([(f'Churn {seed} {n}.', 'Churner', 'Churn', '', '', None)
+                                           for n in range(MAINTENANCE_MIN_CHANGES)])
+                self.assertIn(f'{MAINTENANCE_MIN_CHANGES} quotes changed since the last ANALYZE',
+                              upgraded.maintenance_due())
+
+
+if __name__ == '__main__':
+    unittest.main()
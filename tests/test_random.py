@@ -0,0 +1,61 @@
+"""fetch_random_quote: only existing quotes of the category, uniform over ids with gaps"""
+import os
+import random
+import tempfile
+import unittest
+from collections import Counter
+
+from QuotesBenchmark import build_corpus, quiet
+from tests.corpus import SEEDS, build_flat
+
+
+class RandomQuoteTests(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.workdir.cleanup)
+
+    def test_picks_exist_and_match_category(self):
+        for seed in SEEDS:
+            with self.subTest(seed=seed):
+                random.seed(seed)    # _pick_random_id uses the module generator
+                rng = random.Random(seed)
+                qm = build_flat(os.path.join(self.workdir.name, f'picks-{seed}.db'), seed)
+                with qm._connect() as conn:
+                    # Gaps in the ids, as deletes leave them
+                    conn.execute('DELETE FROM quotes WHERE id % 7 = 3')
+                    by_category = {}
+                    for quote_id, category in conn.execute('SELECT id, category FROM quotes'):
+                        by_category.setdefault(category, set()).add(quote_id)
+                stray = []
+                for category in [None] + rng.sample(sorted(by_category), 5):
+                    allowed = set().union(*by_category.values()) if category is None else by_category[category]
+                    for _ in range(200):
+                        quote = qm.fetch_random_quote(category)
+                        if quote is None or quote[0] not in allowed or (category and quote[3] != category):
+                            stray.append((category, quote and quote[0]))
+                self.assertEqual([], stray[:3])
+                self.assertIsNone(qm.fetch_random_quote('No such category'))
+                qm.close()
+
+    def test_uniform_over_ids_with_gaps(self):
+        for seed in SEEDS:
+            with self.subTest(seed=seed):
+                random.seed(seed)
+                rng = random.Random(seed)
+                qm = quiet(build_corpus(os.path.join(self.workdir.name, f'uniform-{seed}.db'), 50, seed))
+                with qm._connect() as conn:
+                    for quote_id in rng.sample(range(1, 51), 20):
+                        qm._delete(conn.cursor(), quote_id)
+                    remaining = [row[0] for row in conn.execute('SELECT id FROM quotes')]
+                picks = 6000
+                counts = Counter(qm.fetch_random_quote()[0] for _ in range(picks))
+                qm.close()
+                mean = picks / len(remaining)
+                chi_square = sum((counts[quote_id] - mean) ** 2 / mean for quote_id in remaining)
+                self.assertLessEqual(set(counts), set(remaining))
+                # 29 degrees of freedom: 58.3 is the 0.1% critical value
+                self.assertLess(chi_square, 58.3)
+
+
+if __name__ == '__main__':
+    unittest.main()
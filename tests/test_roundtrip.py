@@ -0,0 +1,70 @@
+"""Round trips: export then import gives back the same quotes; the change feed rebuilds a replica"""
+import os
+import random
+import tempfile
+import unittest
+
+from QuotesBenchmark import quiet
+from QuotesManager import QuotesManager
+from tests.corpus import SEEDS, build_flat, first_difference, silent
+
+FIELDS = 'quote_text, author, category, tags, source, year'
+# View counters are not in the change log
+LOGGED = 'id, quote_text, author, category, tags, source, year, favorite, date_added'
+
+
+class RoundTripTests(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.workdir.cleanup)
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.workdir.name, name)
+
+    def rows(self, qm: QuotesManager, columns: str, order: str) -> list:
+        with qm._connect() as conn:
+            return conn.execute(f'SELECT {columns} FROM quotes ORDER BY {order}').fetchall()
+
+    def test_export_then_import(self):
+        for seed in SEEDS:
+            with self.subTest(seed=seed):
+                source = build_flat(self.path(f'source-{seed}.db'), seed)
+                expected = self.rows(source, FIELDS, 'quote_text')
+                for format in ('json', 'csv', 'qcol'):
+                    export = self.path(f'roundtrip-{seed}.{format}')
+                    source.write_export(format, export)
+                    copy = quiet(QuotesManager(self.path(f'roundtrip-{seed}-{format}.db')))
+                    with silent():
+                        copy.import_file(export)
+                    actual = self.rows(copy, FIELDS, 'quote_text')
+                    copy.close()
+                    self.assertEqual(expected, actual, f'{format}: {first_difference(expected, actual)}')
+                source.close()
+
+    def test_change_feed_rebuilds_replica(self):
+        for seed in SEEDS:
+            with self.subTest(seed=seed):
+                rng = random.Random(seed)
+                source = build_flat(self.path(f'feed-{seed}.db'), seed)
+                with source._connect() as conn:
+                    ids = [row[0] for row in conn.execute('SELECT id FROM quotes')]
+                    cursor = conn.cursor()
+                    for quote_id in rng.sample(ids, 30):
+                        source._delete(cursor, quote_id)
+                    for quote_id in rng.sample(ids, 30):
+                        source._set_favorite(cursor, quote_id, 'toggle')
+                with silent():
+                    for n in range(20):
+                        source.add_quote(f'Added after the import ({n}).', rng.choice(['Zeno', 'Seneca']), 'Feed')
+                    source.export_changes(0, self.path(f'changes-{seed}.ndjson'))
+                replica = quiet(QuotesManager(self.path(f'replica-{seed}.db')))
+                with open(self.path(f'changes-{seed}.ndjson'), encoding='utf-8') as f:
+                    replica.apply_changes(f)
+                expected, actual = self.rows(source, LOGGED, 'id'), self.rows(replica, LOGGED, 'id')
+                replica.close()
+                source.close()
+                self.assertEqual(expected, actual, first_difference(expected, actual))
+
+
+if __name__ == '__main__':
+    unittest.main()
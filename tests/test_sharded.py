@@ -0,0 +1,46 @@
+"""ShardedQuotesManager: writes through the shards' public methods, and close() leaves nothing open"""
+import os
+import random
+import sqlite3
+import tempfile
+import unittest
+
+from ShardedQuotesManager import ShardedQuotesManager
+from tests.corpus import SEEDS
+
+
+class ShardedTests(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.workdir.cleanup)
+
+    def test_writes_then_close(self):
+        for seed in SEEDS:
+            for partition in ('hash', 'category'):
+                with self.subTest(seed=seed, partition=partition):
+                    rng = random.Random(seed)
+                    sqm = ShardedQuotesManager(os.path.join(self.workdir.name, f'{partition}-{seed}'),
+                                               shards=3, partition=partition)
+                    rows = [(f'Sharded quote {seed} {n}.', f'Author {rng.randrange(5)}', f'Topic {rng.randrange(4)}',
+                             '', '', None) for n in range(200)]
+                    self.assertEqual((200, 0), sqm.add_quotes_batch(rows))
+                    quote_id = sqm.add_quote(f'One more ({seed}).', 'Seneca', 'Time')
+                    self.assertIsNone(sqm.add_quote(rows[0][0], 'Seneca', 'Elsewhere'))
+                    self.assertEqual(1, sqm.set_favorite(quote_id, 'add'))
+                    self.assertEqual((quote_id, f'One more ({seed}).', 'Seneca', 'Time', 1), sqm.get_quote(quote_id))
+                    self.assertEqual(201, len(sqm.search_quotes(str(seed), 'text')))
+                    self.assertTrue(sqm.delete_quote(quote_id))
+                    self.assertFalse(sqm.delete_quote(quote_id))
+                    self.assertEqual(200, sum(sqm.shard_sizes()))
+
+                    connections = [conn for shard in sqm.shards for conn in shard._connections]
+                    sqm.close()
+                    self.assertEqual([], [conn for shard in sqm.shards for conn in shard._connections])
+                    for conn in connections:
+                        # The fan-out threads' connections are closed too
+                        with self.assertRaises(sqlite3.ProgrammingError):
+                            conn.execute('SELECT 1')
+
+
+if __name__ == '__main__':
+    unittest.main()
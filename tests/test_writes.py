@@ -0,0 +1,205 @@
+"""Writes: caches kept current, bulk operations undone exactly, snapshots isolated from commits"""
+import os
+import random
+import shutil
+import tempfile
+import time
+import unittest
+
+from QuotesBenchmark import quiet
+from QuotesManager import QuotesManager
+from tests.corpus import SEEDS, build_flat, first_difference, silent
+from tests.test_layouts import completion_mismatches
+
+
+class WriteTests(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.workdir.cleanup)
+
+    def flat(self, seed: int, name: str = 'flat') -> QuotesManager:
+        qm = build_flat(os.path.join(self.workdir.name, f'{name}-{seed}.db'), seed)
+        self.addCleanup(qm.close)
+        return qm
+
+    def normalized(self, seed: int) -> QuotesManager:
+        flat = self.flat(seed, 'unnormalized')
+        flat.close()    # the last connection to close moves the WAL into the file before it is copied
+        db_name = os.path.join(self.workdir.name, f'normalized-{seed}.db')
+        shutil.copy(flat.db_name, db_name)
+        qm = quiet(QuotesManager(db_name))
+        qm.normalize_schema()
+        self.addCleanup(qm.close)
+        return qm
+
+    def rows(self, qm: QuotesManager) -> list:
+        with qm._connect() as conn:
+            return conn.execute('SELECT * FROM quotes ORDER BY id').fetchall()
+
+    def test_complete_stays_exact_across_writes(self):
+        for seed in SEEDS:
+            with self.subTest(seed=seed):
+                rng = random.Random(seed)
+                qm = self.flat(seed)
+                qm.complete('author', '')    # build the index, so the writes below must keep it current
+                with silent():
+                    for n in range(50):
+                        qm.add_quote(f'Autocomplete probe {n}.', rng.choice(['Zeno', 'zeta', 'Author 3']),
+                                     rng.choice(['Probe', 'Time']), 'probe, zz top')
+                with qm._connect() as conn:
+                    ids = [row[0] for row in conn.execute('SELECT id FROM quotes')]
+                    for quote_id in rng.sample(ids, 50):
+                        qm._delete(conn.cursor(), quote_id)
+                self.assertEqual([], completion_mismatches(qm, rng))
+
+    def test_sketches_follow_writes(self):
+        # Single adds are counted at once; only renames and deletes drift, favorites do not
+        for seed in SEEDS:
+            for layout in ('flat', 'normalized'):
+                with self.subTest(seed=seed, layout=layout):
+                    rng = random.Random(seed)
+                    qm = getattr(self, layout)(seed)
+                    sketches = qm.refresh_sketches()
+                    total = sketches.total
+                    with qm._connect() as conn:
+                        ids = [row[0] for row in conn.execute('SELECT id FROM quotes')]
+                        for quote_id in rng.sample(ids, 30):
+                            qm._set_favorite(conn.cursor(), quote_id, 'toggle')
+                    with silent():
+                        quote_id = qm.add_quote(f'Sketched on arrival ({seed}).', 'Sketch Probe', 'Probe')
+                    self.assertEqual((total + 1, quote_id), (sketches.total, sketches.max_id))
+                    self.assertGreaterEqual(sketches.heavy['author'].estimate('Sketch Probe'), 1)
+                    renamed = qm.bulk_update('set_category', 'Renamed', ids=rng.sample(ids, 20))
+                    stats = qm.approximate_statistics()
+                    self.assertIs(sketches, qm._sketches, 'the sketches were rebuilt')
+                    self.assertEqual((total + 1, renamed), (stats['total'], stats['drift']))
+
+    def test_embeddings_follow_writes(self):
+        # Once semantic search is in use, added quotes are embedded as they commit
+        for seed in SEEDS:
+            with self.subTest(seed=seed):
+                qm = self.flat(seed)
+                qm.build_embeddings('hash')
+                qm.semantic_search('time and patience', 3)
+                with silent():
+                    quote_id = qm.add_quote(f'Embedded on arrival ({seed}).', 'Embed Probe', 'Probe')
+                qm.add_quotes_batch([(f'Embedded in a batch ({seed}, {n}).', 'Embed Probe', 'Probe', '', '', None)
+                                     for n in range(5)])
+                with qm._connect() as conn:
+                    change_seq = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'quote_changes'").fetchone()
+                    state = conn.execute('SELECT change_seq FROM embedding_state').fetchone()
+                    embedded = conn.execute('SELECT COUNT(*) FROM quote_embeddings WHERE quote_id >= ?',
+                                            (quote_id,)).fetchone()[0]
+                self.assertEqual(change_seq, state)
+                self.assertEqual(6, embedded)
+                self.assertIn(quote_id, qm._vectors.positions)
+                self.assertEqual(0, qm.build_embeddings())
+
+    def test_schema_upgrade_keeps_old_updates_as_drift(self):
+        # Version 3 logged every update as 'U'; what it logged may have been a rename
+        for seed in SEEDS:
+            with self.subTest(seed=seed):
+                qm = self.flat(seed)
+                with qm._connect() as conn:
+                    conn.execute('DROP TRIGGER trg_quotes_update')
+                    conn.execute('''
+                        CREATE TRIGGER trg_quotes_update
+                        AFTER UPDATE OF quote_text, author, category, tags, source, year, favorite ON quotes
+                        BEGIN
+                            INSERT INTO quote_changes (quote_id, op) VALUES (NEW.id, 'U');
+                        END
+                    ''')
+                    conn.execute("UPDATE quotes SET category = 'Renamed' WHERE id % 17 = 0")
+                    conn.execute('PRAGMA user_version = 3')
+                    logged = conn.execute("SELECT COUNT(*) FROM quote_changes WHERE op = 'U'").fetchone()[0]
+                qm.close()
+                upgraded = quiet(QuotesManager(qm.db_name))
+                self.addCleanup(upgraded.close)
+                with upgraded._connect() as conn:
+                    self.assertEqual({'N': logged}, dict(conn.execute(
+                        "SELECT op, COUNT(*) FROM quote_changes WHERE op != 'I' GROUP BY op").fetchall()))
+                    favorites = conn.execute('UPDATE quotes SET favorite = 1 - favorite WHERE id % 19 = 0').rowcount
+                    authors = conn.execute("UPDATE quotes SET author = 'Renamed' WHERE id % 23 = 0").rowcount
+                    self.assertEqual({'N': logged + authors, 'U': favorites}, dict(conn.execute(
+                        "SELECT op, COUNT(*) FROM quote_changes WHERE op != 'I' GROUP BY op").fetchall()))
+
+    def test_bulk_undo_restores_every_row(self):
+        for seed in SEEDS:
+            with self.subTest(seed=seed):
+                rng = random.Random(seed)
+                qm = self.flat(seed)
+                before = self.rows(qm)
+                category = rng.choice(sorted({row[3] for row in before}))
+                operations = [('set_category', 'Verified', {'category': category}),
+                              ('add_tag', 'checked', {'search': 'time', 'search_in': 'text'}),
+                              ('delete', None, {'favorite': True})]
+                changed = sum(qm.bulk_update(action, value, **filters) for action, value, filters in operations)
+                undone = sum(qm.undo_bulk() for _ in operations)
+                after = self.rows(qm)
+                self.assertEqual(before, after, first_difference(before, after))
+                self.assertEqual(changed, undone)
+
+    def test_undo_delete_counts_only_restored_quotes(self):
+        # A deleted quote added again keeps its new row, and is not counted as restored
+        for seed in SEEDS:
+            for layout in ('flat', 'normalized'):
+                with self.subTest(seed=seed, layout=layout):
+                    qm = getattr(self, layout)(seed)
+                    with qm._connect() as conn:
+                        text, author, category = conn.execute('SELECT quote_text, author, category FROM quotes '
+                                                              'WHERE favorite = 1 ORDER BY id').fetchone()
+                    deleted = qm.bulk_update('delete', favorite=True)
+                    with silent():
+                        self.assertIsNotNone(qm.add_quote(text, author, category))
+                    self.assertEqual(deleted - 1, qm.undo_bulk())
+                    with qm._connect() as conn:
+                        favorites = conn.execute('SELECT COUNT(*) FROM quotes WHERE favorite = 1').fetchone()[0]
+                    self.assertEqual(deleted - 1, favorites)
+
+    def test_bulk_undo_keeps_later_edits(self):
+        # Later edits to another column, or to the same column again, survive undoing an older operation
+        for seed in SEEDS:
+            for layout in ('flat', 'normalized'):
+                with self.subTest(seed=seed, layout=layout):
+                    qm = getattr(self, layout)(seed)
+                    with qm._connect() as conn:
+                        category, = conn.execute("SELECT category FROM quotes WHERE tags = '' GROUP BY category "
+                                                 "HAVING COUNT(*) >= 4 ORDER BY category").fetchone()
+                        ids = [row[0] for row in conn.execute("SELECT id FROM quotes WHERE category = ? AND tags = '' "
+                                                              "ORDER BY id", (category,))]
+                    qm.bulk_update('set_category', 'Verified', ids=ids)
+                    qm.bulk_update('set_author', 'Verifier', ids=ids[:2])
+                    qm.bulk_update('add_tag', 'checked', ids=ids[:3])
+                    with qm._connect() as conn:
+                        conn.execute("UPDATE quotes SET category = 'Edited' WHERE id = ?", (ids[-1],))
+                    operation_id = qm.list_bulk_operations(3)[-1][0]
+                    restored = [qm.undo_bulk(operation_id)] + [qm.undo_bulk() for _ in range(2)]
+                    with qm._connect() as conn:
+                        categories = conn.execute(f"SELECT category FROM quotes WHERE id IN "
+                                                  f"({','.join('?' * len(ids))}) ORDER BY id", ids).fetchall()
+                    self.assertEqual([len(ids) - 1, 3, 2], restored)
+                    self.assertEqual([(category,)] * (len(ids) - 1) + [('Edited',)], categories)
+
+    def test_snapshot_isolated_from_commits(self):
+        # A report sees none of the writes committed while it runs, and does not hold them up
+        for seed in SEEDS:
+            with self.subTest(seed=seed):
+                qm = self.flat(seed)
+                writer = quiet(QuotesManager(qm.db_name))
+                added = [(f'Committed during a snapshot ({i}).', 'Snapshot', 'Verified', '', '', None)
+                         for i in range(100)]
+                with qm.snapshot() as cursor:
+                    before = qm._query_statistics(cursor)
+                    start = time.perf_counter()
+                    writer.add_quotes_batch(added)
+                    elapsed = time.perf_counter() - start
+                    during = qm._query_statistics(cursor)
+                after = qm.collect_statistics()
+                writer.close()
+                self.assertEqual(before, during)
+                self.assertEqual(before['total'] + len(added), after['total'])
+                self.assertLess(elapsed, 1, 'the commit waited for the snapshot')
+
+
+if __name__ == '__main__':
+    unittest.main()